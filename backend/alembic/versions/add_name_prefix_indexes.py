@@ -0,0 +1,65 @@
+"""add name prefix indexes for autocomplete
+
+Revision ID: f2c6a9d3b8e4
+Revises: e5b8c1d4f7a2
+Create Date: 2026-10-19 09:00:00.000000
+
+GET /search/autocomplete matches name prefixes on lower(name):
+
+    lower(name) ~>=~ 'tac' AND lower(name) ~<~ 'tac\U0010ffff'
+
+text_pattern_ops compares bytes regardless of the database collation, so these
+range conditions are btree index scans even under generic (prepared) plans, where
+`LIKE $1 || '%'` cannot use an index.
+- ix_restaurants_lower_name_pattern: restaurants.lower(name)
+- ix_lists_user_lower_name_pattern: lists (user_id, lower(name)); the existing
+  unique idx_lists_user_id_lower_name_unique uses the default operator class and
+  cannot serve these ranges
+Indexes are built CONCURRENTLY so saves are not blocked while they build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6a9d3b8e4'
+down_revision: Union[str, None] = 'e5b8c1d4f7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_restaurants_lower_name_pattern',
+            'restaurants',
+            [sa.text('lower(name) text_pattern_ops')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_lists_user_lower_name_pattern',
+            'lists',
+            ['user_id', sa.text('lower(name) text_pattern_ops')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_lists_user_lower_name_pattern',
+            table_name='lists',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_restaurants_lower_name_pattern',
+            table_name='restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
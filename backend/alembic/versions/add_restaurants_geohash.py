@@ -0,0 +1,113 @@
+"""add geohash column and index to restaurants
+
+Revision ID: d7a3b5c9e1f2
+Revises: c4e8a2f6b913
+Create Date: 2026-10-18 16:00:00.000000
+
+Spatial lookups on stock Postgres (no PostGIS):
+- geohash_encode(lat, lng, chars): IMMUTABLE PL/pgSQL geohash encoder, kept
+  identical to app/core/geohash.py:encode()
+- restaurants.geohash: 12-char geohash, a STORED generated column so every insert
+  path (worker, bulk loads, COPY) fills it. C collation makes prefix range scans
+  (geohash >= 'dr5r' AND geohash < 'dr5r~') plain btree scans.
+- ix_restaurants_geohash, built CONCURRENTLY
+
+Adding a stored generated column rewrites restaurants under an ACCESS EXCLUSIVE
+lock; run during a quiet period on large tables.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3b5c9e1f2'
+down_revision: Union[str, None] = 'c4e8a2f6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+GEOHASH_ENCODE = """
+CREATE OR REPLACE FUNCTION geohash_encode(lat double precision, lng double precision, chars integer)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+DECLARE
+    alphabet constant text := '0123456789bcdefghjkmnpqrstuvwxyz';
+    lat_lo double precision := -90;
+    lat_hi double precision := 90;
+    lng_lo double precision := -180;
+    lng_hi double precision := 180;
+    mid double precision;
+    result text := '';
+    ch integer := 0;
+    bits integer := 0;
+    even boolean := true;
+BEGIN
+    WHILE length(result) < chars LOOP
+        IF even THEN
+            mid := (lng_lo + lng_hi) / 2;
+            IF lng >= mid THEN
+                ch := ch * 2 + 1;
+                lng_lo := mid;
+            ELSE
+                ch := ch * 2;
+                lng_hi := mid;
+            END IF;
+        ELSE
+            mid := (lat_lo + lat_hi) / 2;
+            IF lat >= mid THEN
+                ch := ch * 2 + 1;
+                lat_lo := mid;
+            ELSE
+                ch := ch * 2;
+                lat_hi := mid;
+            END IF;
+        END IF;
+        even := NOT even;
+        bits := bits + 1;
+        IF bits = 5 THEN
+            result := result || substr(alphabet, ch + 1, 1);
+            bits := 0;
+            ch := 0;
+        END IF;
+    END LOOP;
+    RETURN result;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute(GEOHASH_ENCODE)
+    op.add_column(
+        'restaurants',
+        sa.Column(
+            'geohash',
+            sa.String(length=12, collation='C'),
+            sa.Computed('geohash_encode(latitude, longitude, 12)', persisted=True),
+            nullable=True,
+        ),
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_restaurants_geohash',
+            'restaurants',
+            ['geohash'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_restaurants_geohash',
+            table_name='restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('restaurants', 'geohash')
+    op.execute('DROP FUNCTION IF EXISTS geohash_encode(double precision, double precision, integer)')
@@ -0,0 +1,47 @@
+"""add save_events (user_id, id) index
+
+Revision ID: a4d8e2f6b1c3
+Revises: f2c6a9d3b8e4
+Create Date: 2026-10-19 12:00:00.000000
+
+save_events had no index on user_id, so reading one user's events scanned the
+whole table. The account export (app/core/account_export.py) reads them in
+keyset pages:
+
+    WHERE user_id = :u AND id > :after ORDER BY id LIMIT :n
+
+which ix_save_events_user_id_id serves as one index range scan per page.
+Built CONCURRENTLY so saves are not blocked while it builds.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e2f6b1c3'
+down_revision: Union[str, None] = 'f2c6a9d3b8e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_save_events_user_id_id',
+            'save_events',
+            ['user_id', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_save_events_user_id_id',
+            table_name='save_events',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
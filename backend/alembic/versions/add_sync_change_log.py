@@ -0,0 +1,62 @@
+"""add sync change log and updated_at columns
+
+Revision ID: 8c1f4a7e2d95
+Revises: 3b9d6e2f7a41
+Create Date: 2026-10-18 12:00:00.000000
+
+Backs GET /sync?since=<token>:
+- sync_sequences: per-user sequence, bumped inside each mutating transaction
+- sync_changes: (user_id, seq, entity_type, entity_id, op) log, including tombstones
+- updated_at on lists and user_restaurants (notes already has it)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4a7e2d95'
+down_revision: Union[str, None] = '3b9d6e2f7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows get their created_at as the initial updated_at
+    op.add_column('lists', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE lists SET updated_at = created_at')
+    op.alter_column('lists', 'updated_at', nullable=False)
+
+    op.add_column('user_restaurants', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE user_restaurants SET updated_at = created_at')
+    op.alter_column('user_restaurants', 'updated_at', nullable=False)
+
+    op.create_table('sync_sequences',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('seq', sa.BigInteger(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    op.create_table('sync_changes',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('entity_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('entity_id', sa.UUID(), nullable=False),
+        sa.Column('op', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_changes_user_id_seq', 'sync_changes', ['user_id', 'seq'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_changes_user_id_seq', table_name='sync_changes')
+    op.drop_table('sync_changes')
+    op.drop_table('sync_sequences')
+    op.drop_column('user_restaurants', 'updated_at')
+    op.drop_column('lists', 'updated_at')
@@ -0,0 +1,32 @@
+"""add sync_sequences.min_seq for sync change log retention
+
+Revision ID: c3f9a1e7d4b6
+Revises: b7e1c4a9d2f5
+Create Date: 2026-10-19 18:00:00.000000
+
+sync_changes rows older than SYNC_CHANGE_RETENTION_DAYS are pruned periodically
+(app.core.sync_log.prune). Each user's min_seq records the highest pruned seq:
+GET /sync answers a token below it with a full snapshot, since changes after
+the token may be gone.
+
+A constant default, so adding the column does not rewrite sync_sequences.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a1e7d4b6'
+down_revision: Union[str, None] = 'b7e1c4a9d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sync_sequences', sa.Column('min_seq', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('sync_sequences', 'min_seq')
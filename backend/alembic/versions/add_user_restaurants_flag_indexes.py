@@ -0,0 +1,66 @@
+"""add partial indexes for favorite and visited user_restaurants
+
+Revision ID: c4e8a2f6b913
+Revises: 8c1f4a7e2d95
+Create Date: 2026-10-18 14:00:00.000000
+
+Completes the user_restaurants access-path indexes:
+- (user_id, list_id, created_at, id)                    3b9d6e2f7a41, list pages
+- (user_id, created_at, id) WHERE list_id IS NULL       3b9d6e2f7a41, Unsorted bucket
+- (user_id, created_at, id) WHERE is_favorite           this revision
+- (user_id, created_at, id) WHERE is_visited            this revision
+
+The flag indexes only hold the ~10-30% of rows that are flagged, so "my favorites"
+and "places I've been" queries read a small index instead of filtering the user's
+whole library. Built CONCURRENTLY to avoid blocking writes.
+
+Compare plans with and without these indexes: python -m benchmarks.user_restaurants_indexes
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2f6b913'
+down_revision: Union[str, None] = '8c1f4a7e2d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_restaurants_favorites',
+            'user_restaurants',
+            ['user_id', 'created_at', 'id'],
+            postgresql_where=sa.text('is_favorite'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_user_restaurants_visited',
+            'user_restaurants',
+            ['user_id', 'created_at', 'id'],
+            postgresql_where=sa.text('is_visited'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_restaurants_visited',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_user_restaurants_favorites',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
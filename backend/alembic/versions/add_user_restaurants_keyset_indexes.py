@@ -0,0 +1,61 @@
+"""add user_restaurants keyset pagination indexes
+
+Revision ID: 3b9d6e2f7a41
+Revises: f8c3d2e1a4b7
+Create Date: 2026-10-18 10:00:00.000000
+
+Supports keyset pagination of /home and /lists/{id}/restaurants:
+- newest:    WHERE user_id = ? AND list_id = ? ORDER BY created_at DESC, id DESC
+- favorites: same filter, ORDER BY is_favorite DESC, created_at DESC, id DESC
+
+Both are served as a backward index range scan that stops after LIMIT rows.
+The planner does not treat `list_id IS NULL` as pinning list_id to a single value,
+so these indexes cannot provide the ORDER BY for the Unsorted bucket (/home);
+partial indexes WHERE list_id IS NULL cover that case (e1c7a3f9b5d2).
+Indexes are built CONCURRENTLY so saves are not blocked while they build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d6e2f7a41'
+down_revision: Union[str, None] = 'f8c3d2e1a4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_restaurants_user_list_created_id',
+            'user_restaurants',
+            ['user_id', 'list_id', 'created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_user_restaurants_user_list_fav_created_id',
+            'user_restaurants',
+            ['user_id', 'list_id', 'is_favorite', 'created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_restaurants_user_list_fav_created_id',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_user_restaurants_user_list_created_id',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,190 @@
+"""add trigger-maintained search_vector to user_restaurants
+
+Revision ID: e5b8c1d4f7a2
+Revises: d7a3b5c9e1f2
+Create Date: 2026-10-18 19:00:00.000000
+
+GET /search (see app/api/v1/endpoints/search.py) matches one document per saved
+restaurant, so its cost is bounded by the user's own library rather than by how
+common a word is across every user's restaurants:
+
+    user_restaurants.search_vector =
+        restaurant name (weight A) || city (B) || list name (C) || the user's note (D)
+
+All parts use the 'simple' config: names are proper nouns in any language, and
+search terms are prefix matches, which covers most of what stemming would for notes.
+
+Triggers keep the column current:
+- user_restaurants BEFORE INSERT / UPDATE OF restaurant_id, list_id (this also
+  catches lists being deleted, since ON DELETE SET NULL updates list_id)
+- lists AFTER UPDATE OF name
+- notes AFTER INSERT / UPDATE OF content / DELETE
+- restaurants AFTER UPDATE OF name, city. Restaurants are never renamed by the app
+  today. Without an index on user_restaurants.restaurant_id alone, this one scans.
+
+The GIN index serves selective terms. Common terms are filtered from the user's
+rows via the user_id indexes.
+
+When the pg_trgm extension is available, it is also enabled and a trigram GIN
+index is built on restaurants.name, for the endpoint's typo-tolerant fallback.
+The endpoint checks for the extension at runtime.
+
+The column and triggers are added in one short transaction. Existing rows are
+then backfilled outside it, BACKFILL_BATCH_ROWS at a time in id order, each batch
+its own transaction, so user_restaurants is never locked for the whole backfill;
+rows written meanwhile are filled by the triggers. The GIN index is built
+CONCURRENTLY after the backfill.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8c1d4f7a2'
+down_revision: Union[str, None] = 'd7a3b5c9e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_ROWS = 1000
+
+SEARCH_DOCUMENT = """
+CREATE OR REPLACE FUNCTION user_restaurant_search_vector(p_user_id uuid, p_restaurant_id uuid, p_list_id uuid)
+RETURNS tsvector
+LANGUAGE sql VOLATILE
+AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(r.name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(r.city, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce((SELECT l.name FROM lists l WHERE l.id = p_list_id), '')), 'C')
+        || setweight(to_tsvector('simple', coalesce((
+               SELECT n.content FROM notes n
+               WHERE n.user_id = p_user_id AND n.restaurant_id = p_restaurant_id
+           ), '')), 'D')
+    FROM restaurants r
+    WHERE r.id = p_restaurant_id
+$$
+"""
+
+TRIGGER_FUNCTIONS = {
+    'user_restaurants_search_vector_set': """
+        BEGIN
+            NEW.search_vector := user_restaurant_search_vector(NEW.user_id, NEW.restaurant_id, NEW.list_id);
+            RETURN NEW;
+        END;
+    """,
+    'lists_search_vector_refresh': """
+        BEGIN
+            UPDATE user_restaurants
+            SET search_vector = user_restaurant_search_vector(user_id, restaurant_id, list_id)
+            WHERE user_id = NEW.user_id AND list_id = NEW.id;
+            RETURN NULL;
+        END;
+    """,
+    'notes_search_vector_refresh': """
+        DECLARE
+            note notes%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                note := OLD;
+            ELSE
+                note := NEW;
+            END IF;
+            UPDATE user_restaurants
+            SET search_vector = user_restaurant_search_vector(user_id, restaurant_id, list_id)
+            WHERE user_id = note.user_id AND restaurant_id = note.restaurant_id;
+            RETURN NULL;
+        END;
+    """,
+    'restaurants_search_vector_refresh': """
+        BEGIN
+            UPDATE user_restaurants
+            SET search_vector = user_restaurant_search_vector(user_id, restaurant_id, list_id)
+            WHERE restaurant_id = NEW.id;
+            RETURN NULL;
+        END;
+    """,
+}
+
+TRIGGERS = [
+    ('user_restaurants_search_vector', 'user_restaurants',
+     'BEFORE INSERT OR UPDATE OF restaurant_id, list_id', 'user_restaurants_search_vector_set', ''),
+    ('lists_search_vector', 'lists',
+     'AFTER UPDATE OF name', 'lists_search_vector_refresh', 'WHEN (OLD.name IS DISTINCT FROM NEW.name)'),
+    ('notes_search_vector', 'notes',
+     'AFTER INSERT OR UPDATE OF content OR DELETE', 'notes_search_vector_refresh', ''),
+    ('restaurants_search_vector', 'restaurants',
+     'AFTER UPDATE OF name, city', 'restaurants_search_vector_refresh',
+     'WHEN (OLD.name IS DISTINCT FROM NEW.name OR OLD.city IS DISTINCT FROM NEW.city)'),
+]
+
+
+def upgrade() -> None:
+    op.add_column('user_restaurants', sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR(), nullable=True))
+    op.execute(SEARCH_DOCUMENT)
+    for name, body in TRIGGER_FUNCTIONS.items():
+        op.execute(f'CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $${body}$$')
+    for name, table, events, function, when in TRIGGERS:
+        op.execute(f'CREATE TRIGGER {name} {events} ON {table} FOR EACH ROW {when} EXECUTE FUNCTION {function}()')
+
+    # Commits the DDL above; each statement below is its own transaction
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = None
+        while True:
+            ids = bind.execute(
+                sa.text(
+                    'SELECT id FROM user_restaurants '
+                    'WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid) '
+                    'ORDER BY id LIMIT :limit'
+                ),
+                {'last_id': last_id, 'limit': BACKFILL_BATCH_ROWS},
+            ).scalars().all()
+            if not ids:
+                break
+            bind.execute(
+                sa.text(
+                    'UPDATE user_restaurants '
+                    'SET search_vector = user_restaurant_search_vector(user_id, restaurant_id, list_id) '
+                    'WHERE id = ANY(CAST(:ids AS uuid[])) AND search_vector IS NULL'
+                ),
+                {'ids': [str(i) for i in ids]},
+            )
+            last_id = str(ids[-1])
+
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        op.create_index(
+            'ix_user_restaurants_search_vector',
+            'user_restaurants',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        has_trgm = op.get_bind().execute(
+            sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar_one_or_none()
+        if has_trgm:
+            op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            op.execute(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_restaurants_name_trgm '
+                'ON restaurants USING gin (name gin_trgm_ops)'
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_restaurants_name_trgm')
+        op.drop_index(
+            'ix_user_restaurants_search_vector',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    for name, table, _, _, _ in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+    for name in TRIGGER_FUNCTIONS:
+        op.execute(f'DROP FUNCTION IF EXISTS {name}()')
+    op.execute('DROP FUNCTION IF EXISTS user_restaurant_search_vector(uuid, uuid, uuid)')
+    op.drop_column('user_restaurants', 'search_vector')
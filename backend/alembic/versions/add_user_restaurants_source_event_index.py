@@ -0,0 +1,44 @@
+"""add user_restaurants source_event_id index
+
+Revision ID: b7e1c4a9d2f5
+Revises: a4d8e2f6b1c3
+Create Date: 2026-10-19 14:00:00.000000
+
+user_restaurants.source_event_id references save_events ON DELETE RESTRICT but
+was not indexed, so every deleted save_event (one by one in the users cascade, or
+in the batches of app/core/account_deletion.py) ran its RESTRICT check as a
+sequential scan of user_restaurants.
+Built CONCURRENTLY so saves are not blocked while it builds.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1c4a9d2f5'
+down_revision: Union[str, None] = 'a4d8e2f6b1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_restaurants_source_event_id',
+            'user_restaurants',
+            ['source_event_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_restaurants_source_event_id',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
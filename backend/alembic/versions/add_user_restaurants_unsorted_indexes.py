@@ -0,0 +1,64 @@
+"""add user_restaurants Unsorted keyset indexes
+
+Revision ID: e1c7a3f9b5d2
+Revises: d8b2e6f4a1c7
+Create Date: 2026-10-19 21:00:00.000000
+
+Keyset pages of the Unsorted bucket (/home: WHERE user_id = ? AND list_id IS NULL)
+fell back to Seq Scan + Sort: the planner does not treat IS NULL as pinning
+list_id, so the (user_id, list_id, ...) indexes of 3b9d6e2f7a41 cannot provide
+the ORDER BY. Partial indexes over the Unsorted rows can:
+- newest:    (user_id, created_at, id) WHERE list_id IS NULL
+- favorites: (user_id, is_favorite, created_at, id) WHERE list_id IS NULL
+
+These were briefly part of 3b9d6e2f7a41; databases migrated then already have
+them, hence IF NOT EXISTS. Built CONCURRENTLY so saves are not blocked.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1c7a3f9b5d2'
+down_revision: Union[str, None] = 'd8b2e6f4a1c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_restaurants_unsorted_created_id',
+            'user_restaurants',
+            ['user_id', 'created_at', 'id'],
+            postgresql_where=sa.text('list_id IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_user_restaurants_unsorted_fav_created_id',
+            'user_restaurants',
+            ['user_id', 'is_favorite', 'created_at', 'id'],
+            postgresql_where=sa.text('list_id IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_restaurants_unsorted_fav_created_id',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_user_restaurants_unsorted_created_id',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
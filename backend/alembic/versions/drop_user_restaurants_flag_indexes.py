@@ -0,0 +1,61 @@
+"""drop the unused favorite and visited partial indexes
+
+Revision ID: d8b2e6f4a1c7
+Revises: c3f9a1e7d4b6
+Create Date: 2026-10-19 20:00:00.000000
+
+c4e8a2f6b913 added (user_id, created_at, id) WHERE is_favorite / WHERE is_visited
+for favorites and visited views, but no query reads them: /favorites and
+/visited are gone (410, flags come with /home), and list summaries count flags
+with count(...) FILTER over the user's rows. Meanwhile each index made every
+favorite or visited toggle a non-HOT update that writes every user_restaurants
+index. Dropped CONCURRENTLY; the downgrade rebuilds them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b2e6f4a1c7'
+down_revision: Union[str, None] = 'c3f9a1e7d4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_restaurants_visited',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_user_restaurants_favorites',
+            table_name='user_restaurants',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_restaurants_favorites',
+            'user_restaurants',
+            ['user_id', 'created_at', 'id'],
+            postgresql_where=sa.text('is_favorite'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_user_restaurants_visited',
+            'user_restaurants',
+            ['user_id', 'created_at', 'id'],
+            postgresql_where=sa.text('is_visited'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
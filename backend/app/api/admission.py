@@ -0,0 +1,98 @@
+"""
+Admission Middleware
+
+Decides, before any endpoint code runs, whether a request is admitted:
+
+    1. backpressure
+           save requests while the extraction queue is deeper than
+           ADMISSION_MAX_QUEUE_DEPTH, and every API request while recent database
+           pool checkouts waited longer than ADMISSION_MAX_POOL_WAIT_MS on average
+           -> 503 with Retry-After: ADMISSION_RETRY_AFTER_SECONDS
+    2. concurrency per route class (read / write / save / export), per process
+           -> 503 with Retry-After: ADMISSION_RETRY_AFTER_SECONDS
+
+Rejections are fast and cheap, so clients back off instead of piling more work
+onto a saturated queue or pool. Only /api routes are controlled; /health and docs
+always pass.
+
+The per-user rate limit is not applied here but in deps.get_current_user, once
+the token's signature is verified: keyed on an unverified `sub`, anyone could
+spend another user's bucket with forged tokens and lock them out.
+
+A pure ASGI middleware rather than BaseHTTPMiddleware, so a streamed response
+(exports) holds its concurrency slot until its last byte is sent.
+"""
+
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import admission
+from app.core.config import settings
+from app.core.redis import get_async_redis
+from app.errors import ErrorMessages
+
+API_PREFIX = "/api/"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """read | write | save | export for API routes, None for routes that are never limited."""
+    if not path.startswith(API_PREFIX):
+        return None
+    if "/export" in path:
+        return "export"
+    if method == "POST" and path.rstrip("/").endswith("/save-events"):
+        return "save"
+    return "read" if method in READ_METHODS else "write"
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": admission.retry_after_header(retry_after)},
+    )
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiters = {
+            "read": admission.ConcurrencyLimiter(settings.ADMISSION_MAX_CONCURRENT_READS),
+            "write": admission.ConcurrencyLimiter(settings.ADMISSION_MAX_CONCURRENT_WRITES),
+            "save": admission.ConcurrencyLimiter(settings.ADMISSION_MAX_CONCURRENT_SAVES),
+            "export": admission.ConcurrencyLimiter(settings.ADMISSION_MAX_CONCURRENT_EXPORTS),
+        }
+
+    async def _rejection(self, kind: str) -> Optional[JSONResponse]:
+        retry_after = settings.ADMISSION_RETRY_AFTER_SECONDS
+        if kind == "save":
+            depth = await admission.extraction_queue.get(get_async_redis())
+            if depth > settings.ADMISSION_MAX_QUEUE_DEPTH:
+                return _reject(503, ErrorMessages.SERVER_OVERLOADED, retry_after)
+        if admission.pool_wait.mean_ms() > settings.ADMISSION_MAX_POOL_WAIT_MS:
+            return _reject(503, ErrorMessages.SERVER_OVERLOADED, retry_after)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        kind = route_class(scope["method"], scope["path"])
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = await self._rejection(kind)
+        limiter = self.limiters[kind]
+        if response is None and not limiter.try_acquire():
+            response = _reject(503, ErrorMessages.SERVER_OVERLOADED, settings.ADMISSION_RETRY_AFTER_SECONDS)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
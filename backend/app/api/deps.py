@@ -5,6 +5,17 @@ Provides get_current_user() dependency that:
 1. Extracts JWT from Authorization: Bearer header
 2. Verifies the token using Clerk's JWKS
 3. Finds or creates the user in our database
+
+Verified users are then rate limited per clerk_user_id (RATE_LIMIT_PER_SECOND,
+RATE_LIMIT_BURST; 429 with Retry-After), after the signature check so a forged
+token cannot spend another user's bucket.
+
+get_current_subject() does the same checks but stops at the verified
+clerk_user_id, for endpoints that must not create an account.
+
+Resolved users are kept in a short-lived per-process cache keyed by clerk_user_id,
+so an authenticated request normally costs no database round trip for auth.
+Account deletion drops a user from every process's cache (app.core.user_invalidation).
 """
 
 from typing import Generator
@@ -13,8 +24,12 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core import admission, metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_async_redis
 from app.core.security import verify_clerk_token
-from app.db.base import get_session
+from app.db.base import async_session, get_session
 from app.models.user import User
 from app.errors import ErrorMessages
 
@@ -26,6 +41,17 @@ logger = logging.getLogger(__name__)
 # Use HTTPBearer instead of OAuth2PasswordBearer since we're not using password flow anymore
 security = HTTPBearer()
 
+# clerk_user_id -> User column values
+user_cache = TTLCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+# clerk_user_id -> token bucket
+rate_limit = admission.make_token_bucket(get_async_redis())
+
+
+def _cache_user(user: User) -> User:
+    user_cache.set(user.clerk_user_id, user.model_dump())
+    return user
+
 
 async def get_db() -> AsyncSession:
     """Get database session."""
@@ -33,23 +59,21 @@ async def get_db() -> AsyncSession:
         yield session
 
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
+def get_session_factory():
     """
-    Get the current authenticated user from a Clerk session token.
-    
-    This dependency:
-    1. Extracts the JWT from the Authorization: Bearer header
-    2. Verifies the token using Clerk's JWKS (RS256)
-    3. Looks up the user by clerk_user_id
-    4. If not found, auto-creates the user (first-time login)
-    5. Returns the user object
-    
-    Raises:
-        HTTPException 401: If token is missing, invalid, or expired
+    Open sessions outside the request's: for response bodies generated after the
+    endpoint returns, which must not depend on when get_db is torn down.
     """
+    return async_session
+
+
+def get_redis():
+    """Get the shared asyncio Redis client."""
+    return get_async_redis()
+
+
+async def _verified_payload(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Verify a Clerk session token and take from its subject's rate limit."""
     token = credentials.credentials
     logger.debug(f"Received token: {token[:50]}...")
     
@@ -95,14 +119,71 @@ async def get_current_user(
             detail=ErrorMessages.AUTH_MISSING_SUBJECT,
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    if settings.ADMISSION_ENABLED:
+        wait = await rate_limit.take(clerk_user_id)
+        if wait is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=ErrorMessages.RATE_LIMITED,
+                headers={"Retry-After": admission.retry_after_header(wait)},
+            )
+
+    return payload
+
+
+async def get_current_subject(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
+    """
+    The verified clerk_user_id, without resolving (or creating) its User.
+
+    For endpoints that must work after the account is gone, such as polling
+    an account deletion.
+
+    Raises:
+        HTTPException 401: If token is missing, invalid, or expired
+        HTTPException 429: If the user is over their request rate
+    """
+    payload = await _verified_payload(credentials)
+    return payload["sub"]
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """
+    Get the current authenticated user from a Clerk session token.
+    
+    This dependency:
+    1. Extracts the JWT from the Authorization: Bearer header
+    2. Verifies the token using Clerk's JWKS (RS256)
+    3. Looks up the user by clerk_user_id
+    4. If not found, auto-creates the user (first-time login)
+    5. Returns the user object
     
+    Raises:
+        HTTPException 401: If token is missing, invalid, or expired
+        HTTPException 429: If the user is over their request rate
+    """
+    payload = await _verified_payload(credentials)
+    clerk_user_id = payload["sub"]
+
+    # Fast path: user resolved recently by this process
+    cached = user_cache.get(clerk_user_id)
+    if cached is not None:
+        metrics.auth_cache_hit.inc()
+        return User(**cached)
+    metrics.auth_cache_miss.inc()
+
     # Look up user by clerk_user_id
     stmt = select(User).where(User.clerk_user_id == clerk_user_id)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     
     if user:
-        return user
+        return _cache_user(user)
     
     # User not found - this is a first-time user
     # Auto-create the user record (find-or-create pattern per spec Step 5)
@@ -132,7 +213,7 @@ async def get_current_user(
         db.add(existing_user)
         await db.commit()
         await db.refresh(existing_user)
-        return existing_user
+        return _cache_user(existing_user)
     
     # Create new user
     new_user = User(
@@ -145,4 +226,4 @@ async def get_current_user(
     await db.commit()
     await db.refresh(new_user)
     
-    return new_user
+    return _cache_user(new_user)
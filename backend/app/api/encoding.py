@@ -0,0 +1,187 @@
+"""
+Response Encodings
+
+Collection endpoints (/home, /lists, /lists/{id}/restaurants, /sync) pick their wire
+format from the Accept header:
+
+    application/json                              default, same shape as the schemas
+    application/msgpack                           same shape, MessagePack
+    application/vnd.reelmapper.columnar+json      columnar shape, JSON
+    application/vnd.reelmapper.columnar+msgpack   columnar shape, MessagePack
+
+The columnar shape turns every top-level array of objects into an object of arrays
+(one per field), so field names are sent once per collection instead of once per
+row. Nested restaurants are moved into a shared `restaurant_table` (also columnar)
+and each saved restaurant's `restaurant` column holds row indexes into it:
+
+    {
+      "restaurant_table": {"id": [...], "name": [...], "latitude": [...], ...},
+      "unsorted_restaurants": {"id": [...], "restaurant": [0, 1, ...], "is_favorite": [...], ...},
+      "lists": {"id": [...], "name": [...], ...},
+      "next_cursor": null
+    }
+
+UUIDs and datetimes are strings in every format, exactly as in the JSON output.
+Responses carry Vary: Accept so caches keep the representations apart.
+
+See benchmarks/response_encoding.py for size and encode time.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional, Type
+from uuid import UUID
+
+import msgpack
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+COLUMNAR_JSON = "application/vnd.reelmapper.columnar+json"
+COLUMNAR_MSGPACK = "application/vnd.reelmapper.columnar+msgpack"
+
+# Older clients and libraries still send the unregistered x- type
+_ALIASES = {"application/x-msgpack": MSGPACK}
+_SUPPORTED = (JSON, MSGPACK, COLUMNAR_JSON, COLUMNAR_MSGPACK)
+
+# For route decorators: documents the alternative media types in OpenAPI
+ENCODED_RESPONSES = {
+    200: {
+        "content": {
+            MSGPACK: {},
+            COLUMNAR_JSON: {},
+            COLUMNAR_MSGPACK: {},
+        }
+    }
+}
+
+
+def _default(value: Any) -> Any:
+    # asyncpg returns its own UUID subclass, which orjson only serializes as exact uuid.UUID
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson, for content that is already plain data."""
+
+    media_type = JSON
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+class MsgpackResponse(Response):
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        # A default= hook would run in Python for every UUID and datetime; letting
+        # orjson turn them into strings first is several times faster overall
+        plain = orjson.loads(orjson.dumps(content, default=_default))
+        return msgpack.packb(plain, use_bin_type=True)
+
+
+@dataclass(frozen=True)
+class Encoding:
+    media_type: str
+
+    @property
+    def columnar(self) -> bool:
+        return self.media_type in (COLUMNAR_JSON, COLUMNAR_MSGPACK)
+
+    @property
+    def msgpack(self) -> bool:
+        return self.media_type in (MSGPACK, COLUMNAR_MSGPACK)
+
+
+def negotiate(accept: Optional[str]) -> Encoding:
+    """
+    Pick the preferred supported media type from an Accept header.
+
+    Highest q wins, ties go to the order the client listed them; anything
+    unsupported, */* or a missing header means JSON.
+    """
+    if not accept:
+        return Encoding(JSON)
+
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        media_type = _ALIASES.get(media_type.lower(), media_type.lower())
+        if media_type not in _SUPPORTED:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            candidates.append((-q, position, media_type))
+
+    return Encoding(min(candidates)[2] if candidates else JSON)
+
+
+def get_encoding(request: Request) -> Encoding:
+    """Dependency: the response encoding negotiated for this request."""
+    return negotiate(request.headers.get("accept"))
+
+
+def _columns(rows: list[dict], restaurant_table: dict, restaurant_index: dict) -> dict:
+    if not rows:
+        return {}
+    columns = {key: [row[key] for row in rows] for key in rows[0]}
+    restaurants = columns.get("restaurant")
+    if restaurants and isinstance(restaurants[0], dict):
+        indexes = []
+        for restaurant in restaurants:
+            restaurant_id = restaurant["id"]
+            index = restaurant_index.get(restaurant_id)
+            if index is None:
+                index = restaurant_index[restaurant_id] = len(restaurant_index)
+                for field, value in restaurant.items():
+                    restaurant_table.setdefault(field, []).append(value)
+            indexes.append(index)
+        columns["restaurant"] = indexes
+    return columns
+
+
+def to_columnar(content: dict) -> dict:
+    """Convert a response body to the columnar shape described in the module docstring."""
+    restaurant_table: dict[str, list] = {}
+    restaurant_index: dict[Any, int] = {}
+    converted = {}
+    for key, value in content.items():
+        if isinstance(value, list) and all(isinstance(row, dict) for row in value):
+            converted[key] = _columns(value, restaurant_table, restaurant_index)
+        else:
+            converted[key] = value
+    converted["restaurant_table"] = restaurant_table
+    return converted
+
+
+def encoded_response(
+    content: Any,
+    encoding: Encoding,
+    headers: Optional[dict] = None,
+    model: Optional[Type[BaseModel]] = None,
+) -> Response:
+    """
+    Encode plain response data in the negotiated format.
+
+    Pass `model` when content holds ORM objects: it is validated and dumped through
+    that schema first (the fast-path endpoints pass plain dicts and skip this).
+    """
+    if model is not None:
+        content = model.model_validate(content).model_dump()
+    if encoding.columnar:
+        content = to_columnar(content)
+
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if encoding.msgpack:
+        return MsgpackResponse(content, headers=headers, media_type=encoding.media_type)
+    return FastJSONResponse(content, headers=headers, media_type=encoding.media_type)
@@ -0,0 +1,27 @@
+"""
+ETag Helpers
+
+Shared by endpoints that answer conditional GETs (If-None-Match -> 304).
+"""
+
+from typing import Optional
+
+
+def make_etag(value: str, weak: bool = False) -> str:
+    """Quote a validator as an ETag header value."""
+    return f'W/"{value}"' if weak else f'"{value}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against our ETag.
+
+    Uses weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored, and "*" matches
+    any current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    ours = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == ours for tag in if_none_match.split(","))
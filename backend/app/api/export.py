@@ -0,0 +1,168 @@
+"""
+List Export
+
+GET /lists/{id}/export streams a list's restaurants as GeoJSON, KML or CSV for map
+tools (Google My Maps, Google Earth, spreadsheets). Exports are generated, never
+buffered:
+
+    1. the rows come from a server-side cursor (AsyncSession.stream), fetched
+       EXPORT_BATCH_ROWS at a time
+    2. each batch is encoded to one chunk and yielded to a StreamingResponse
+
+so memory stays constant whatever the list size, and the first bytes go out as soon
+as the first batch is read. The cursor runs on a session the generator opens and
+closes itself, since the body is produced after the endpoint has returned, when
+(depending on the FastAPI version) the request's session may already be closed.
+Rows are user_restaurant_rows_stmt() rows (see app.api.projection).
+"""
+
+import csv
+import io
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Iterable
+from urllib.parse import quote, urlencode
+from xml.sax.saxutils import escape, quoteattr
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class ExportFormat(str, Enum):
+    GEOJSON = "geojson"
+    KML = "kml"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.GEOJSON: "application/geo+json",
+    ExportFormat.KML: "application/vnd.google-earth.kml+xml",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+KML_NAMESPACES = 'xmlns="http://www.opengis.net/kml/2.2" xmlns:atom="http://www.w3.org/2005/Atom"'
+
+CSV_COLUMNS = [
+    "name", "city", "latitude", "longitude", "price_range", "is_favorite", "is_visited",
+    "saved_at", "google_place_id", "google_maps_url",
+]
+
+
+def google_maps_url(row: Any) -> str:
+    """Google Maps link for a restaurant: its place if known, else its coordinates."""
+    params = {"api": "1", "query": f"{row.latitude},{row.longitude}"}
+    if row.google_place_id:
+        params["query_place_id"] = row.google_place_id
+    return "https://www.google.com/maps/search/?" + urlencode(params)
+
+
+def csv_safe(value: str) -> str:
+    """
+    A text cell a spreadsheet won't evaluate. Names come from captions, so a leading
+    =, +, -, @ (or a tab / carriage return before one) is neutralised with a quote.
+    """
+    if value and value[0] in "=+-@\t\r":
+        return "'" + value
+    return value
+
+
+def export_filename(list_name: str, fmt: ExportFormat) -> str:
+    """Content-Disposition value for a list export (RFC 6266 / 5987 for non-ASCII names)."""
+    name = f"{list_name}.{fmt.value}"
+    ascii_name = name.encode("ascii", "replace").decode().replace('"', "'").replace("?", "_")
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(name)}"
+
+
+# ----------------------------------------------------------------------------
+# Encoders: header, one chunk per batch of rows, footer
+# ----------------------------------------------------------------------------
+
+def _geojson_feature(row: Any) -> bytes:
+    return orjson.dumps({
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [row.longitude, row.latitude]},
+        "properties": {
+            "name": row.restaurant_name,
+            "city": row.city,
+            "price_range": row.price_range,
+            "is_favorite": row.is_favorite,
+            "is_visited": row.is_visited,
+            "saved_at": row.created_at,
+            "google_place_id": row.google_place_id,
+            "google_maps_url": google_maps_url(row),
+        },
+    })
+
+
+def _kml_placemark(row: Any) -> str:
+    url = google_maps_url(row)
+    # The link twice: atom:link for tools that read it, and in the description,
+    # which is what Google Earth and My Maps show
+    description = " · ".join(part for part in (row.city, row.price_range, url) if part)
+    return (
+        f"<Placemark><name>{escape(row.restaurant_name)}</name>"
+        f"<atom:link href={quoteattr(url)}/>"
+        f"<description>{escape(description)}</description>"
+        f"<Point><coordinates>{row.longitude},{row.latitude},0</coordinates></Point></Placemark>\n"
+    )
+
+
+def _csv_rows(rows: Iterable[Any]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            csv_safe(row.restaurant_name), csv_safe(row.city), row.latitude, row.longitude,
+            csv_safe(row.price_range or ""), row.is_favorite, row.is_visited, row.created_at.isoformat(),
+            csv_safe(row.google_place_id or ""), google_maps_url(row),
+        ])
+    return buffer.getvalue().encode()
+
+
+def _csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+async def export_chunks(
+    list_name: str,
+    fmt: ExportFormat,
+    batches: AsyncIterator[Iterable[Any]],
+) -> AsyncIterator[bytes]:
+    """Encode batches of user_restaurant_rows_stmt() rows as one export, chunk by chunk."""
+    if fmt == ExportFormat.GEOJSON:
+        yield b'{"type":"FeatureCollection","name":' + orjson.dumps(list_name) + b',"features":[\n'
+        first = True
+        async for rows in batches:
+            features = b",\n".join(_geojson_feature(row) for row in rows)
+            if features:
+                yield features if first else b",\n" + features
+                first = False
+        yield b"\n]}\n"
+    elif fmt == ExportFormat.KML:
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f"<kml {KML_NAMESPACES}><Document>"
+            f"<name>{escape(list_name)}</name>\n"
+        ).encode()
+        async for rows in batches:
+            yield "".join(_kml_placemark(row) for row in rows).encode()
+        yield b"</Document></kml>\n"
+    else:
+        yield _csv_header()
+        async for rows in batches:
+            yield _csv_rows(rows)
+
+
+async def streamed_batches(open_session: Callable[[], AsyncSession], stmt: Any) -> AsyncIterator[list[Any]]:
+    """
+    Run stmt on a server-side cursor, in a session of its own from open_session, and
+    yield its rows in batches of the statement's yield_per execution option.
+    """
+    async with open_session() as db:
+        result = await db.stream(stmt)
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
@@ -0,0 +1,185 @@
+"""
+Keyset Pagination
+
+Collection endpoints (/home, /lists/{id}/restaurants) page through UserRestaurant rows
+with an opaque cursor instead of OFFSET. The cursor is the sort key of the last row on
+the previous page, so every page is a bounded index range scan no matter how deep the
+client has scrolled:
+
+    newest     ORDER BY created_at DESC, id DESC
+    favorites  ORDER BY is_favorite DESC, created_at DESC, id DESC
+    name       ORDER BY restaurants.name ASC, id ASC
+
+Cursors are urlsafe-base64 JSON of {"s": sort, "k": [key values]} and are only valid
+for the sort order that produced them.
+
+Pagination is opt-in for now: with no `limit` (and PAGE_SIZE_DEFAULT unset) the whole
+collection is returned in sort order, which is what current app builds expect.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+
+from app.core.config import settings
+from app.errors import ErrorMessages
+from app.models.restaurant import Restaurant
+from app.models.save_event import UserRestaurant
+
+
+class RestaurantSort(str, Enum):
+    NEWEST = "newest"
+    NAME = "name"
+    FAVORITES = "favorites"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _sort_columns(sort: RestaurantSort) -> list:
+    if sort == RestaurantSort.NAME:
+        return [Restaurant.name, UserRestaurant.id]
+    if sort == RestaurantSort.FAVORITES:
+        return [UserRestaurant.is_favorite, UserRestaurant.created_at, UserRestaurant.id]
+    return [UserRestaurant.created_at, UserRestaurant.id]
+
+
+def _sort_keys(sort: RestaurantSort) -> list[str]:
+    """Names of the sort columns in projection.user_restaurant_rows_stmt() rows."""
+    if sort == RestaurantSort.NAME:
+        return ["restaurant_name", "id"]
+    if sort == RestaurantSort.FAVORITES:
+        return ["is_favorite", "created_at", "id"]
+    return ["created_at", "id"]
+
+
+def _is_descending(sort: RestaurantSort) -> bool:
+    return sort != RestaurantSort.NAME
+
+
+def encode_cursor(sort: RestaurantSort, keys: Sequence[Any]) -> str:
+    """Encode the sort key of a row into an opaque cursor."""
+    values = []
+    for key in keys:
+        if isinstance(key, datetime):
+            values.append(key.isoformat())
+        elif isinstance(key, UUID):
+            values.append(str(key))
+        else:
+            values.append(key)
+    raw = json.dumps({"s": sort.value, "k": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: RestaurantSort) -> list:
+    """
+    Decode a cursor back into typed sort key values.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or was issued for a different sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort.value:
+            raise InvalidCursor("Cursor was issued for a different sort order")
+        keys = data["k"]
+        if sort == RestaurantSort.NAME:
+            name, row_id = keys
+            if not isinstance(name, str):
+                raise InvalidCursor("Malformed cursor")
+            return [name, UUID(row_id)]
+        if sort == RestaurantSort.FAVORITES:
+            is_favorite, created_at, row_id = keys
+            if not isinstance(is_favorite, bool):
+                raise InvalidCursor("Malformed cursor")
+            return [is_favorite, datetime.fromisoformat(created_at), UUID(row_id)]
+        created_at, row_id = keys
+        return [datetime.fromisoformat(created_at), UUID(row_id)]
+    except InvalidCursor:
+        raise
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+
+def cursor_keys(sort: RestaurantSort, row: Any) -> list:
+    """Extract the sort key of a row from projection.user_restaurant_rows_stmt()."""
+    if sort == RestaurantSort.NAME:
+        return [row.restaurant_name, row.id]
+    if sort == RestaurantSort.FAVORITES:
+        return [row.is_favorite, row.created_at, row.id]
+    return [row.created_at, row.id]
+
+
+class PageParams:
+    """
+    Query parameters shared by paginated collection endpoints.
+
+    Use as a dependency: `page: PageParams = Depends()`.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+        limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+        sort: RestaurantSort = Query(RestaurantSort.NEWEST),
+    ):
+        self.sort = sort
+        self.limit = limit or settings.PAGE_SIZE_DEFAULT
+        self.after: Optional[list] = None
+        if cursor:
+            try:
+                self.after = decode_cursor(cursor, sort)
+            except InvalidCursor:
+                raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_INVALID_CURSOR)
+
+    def apply(self, stmt):
+        """
+        Add keyset predicate, ORDER BY and LIMIT to a select over UserRestaurant
+        joined to Restaurant (see projection.user_restaurant_rows_stmt()).
+
+        Fetches one extra row so `page()` can tell whether another page exists.
+        """
+        columns = _sort_columns(self.sort)
+        if self.after is not None:
+            if _is_descending(self.sort):
+                stmt = stmt.where(tuple_(*columns) < tuple_(*self.after))
+            else:
+                stmt = stmt.where(tuple_(*columns) > tuple_(*self.after))
+
+        if _is_descending(self.sort):
+            stmt = stmt.order_by(*[column.desc() for column in columns])
+        else:
+            stmt = stmt.order_by(*[column.asc() for column in columns])
+
+        if self.limit is not None:
+            stmt = stmt.limit(self.limit + 1)
+        return stmt
+
+    def order_subquery(self, subquery) -> list:
+        """
+        ORDER BY clauses for an outer query over a subquery built with apply().
+
+        A subquery's ORDER BY doesn't carry over to the enclosing query (e.g. when it
+        is joined LATERAL), so the outer query must sort the page again.
+        """
+        columns = [subquery.c[name] for name in _sort_keys(self.sort)]
+        if _is_descending(self.sort):
+            return [column.desc() for column in columns]
+        return [column.asc() for column in columns]
+
+    def page(self, rows: Sequence[Any]) -> tuple[list, Optional[str]]:
+        """Trim the look-ahead row and build next_cursor from the last row kept."""
+        rows = list(rows)
+        if self.limit is None or len(rows) <= self.limit:
+            return rows, None
+        rows = rows[: self.limit]
+        return rows, encode_cursor(self.sort, cursor_keys(self.sort, rows[-1]))
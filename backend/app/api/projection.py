@@ -0,0 +1,107 @@
+"""
+Row Projection Fast Path
+
+/home and /lists/{id}/restaurants can return thousands of saved restaurants. Loading
+them as ORM objects (plus a selectinload round trip for Restaurant) and validating
+each one through UserRestaurantRead costs far more than the query itself. These
+endpoints instead:
+
+    1. select only the columns UserRestaurantRead needs, with one JOIN
+    2. build the response dicts straight from the rows
+    3. skip response-model validation and encode them directly (app.api.encoding)
+
+The rows come from our own schema, so the shape is guaranteed by the query. Keep
+user_restaurant_rows_stmt() and user_restaurant_dict() in sync with
+schemas.UserRestaurantRead. The endpoints keep response_model for the OpenAPI docs.
+
+See benchmarks/row_projection.py for the numbers.
+"""
+
+from typing import Any, Iterable
+from uuid import UUID
+
+from sqlmodel import select
+
+from app.models.restaurant import Restaurant
+from app.models.save_event import UserRestaurant
+
+
+def user_restaurant_rows_stmt(user_id: UUID):
+    """
+    Select the UserRestaurantRead columns for a user's saved restaurants.
+
+    Restaurant is already joined, so PageParams.apply() can order by its name.
+    Add list filters with .where() before applying the page.
+    """
+    return (
+        select(
+            UserRestaurant.id,
+            UserRestaurant.is_favorite,
+            UserRestaurant.is_visited,
+            UserRestaurant.created_at,
+            Restaurant.id.label("restaurant_id"),
+            Restaurant.name.label("restaurant_name"),
+            Restaurant.latitude,
+            Restaurant.longitude,
+            Restaurant.city,
+            Restaurant.price_range,
+            Restaurant.google_place_id,
+        )
+        .select_from(UserRestaurant)
+        .join(Restaurant, Restaurant.id == UserRestaurant.restaurant_id)
+        .where(UserRestaurant.user_id == user_id)
+    )
+
+
+def user_restaurant_rows_returning(dml):
+    """
+    Run an UPDATE on user_restaurants and select the changed rows' UserRestaurantRead
+    columns in the same statement (a data-modifying CTE joined to restaurants).
+    """
+    changed = dml.returning(
+        UserRestaurant.id,
+        UserRestaurant.restaurant_id,
+        UserRestaurant.is_favorite,
+        UserRestaurant.is_visited,
+        UserRestaurant.created_at,
+    ).cte("changed")
+    return (
+        select(
+            changed.c.id,
+            changed.c.is_favorite,
+            changed.c.is_visited,
+            changed.c.created_at,
+            Restaurant.id.label("restaurant_id"),
+            Restaurant.name.label("restaurant_name"),
+            Restaurant.latitude,
+            Restaurant.longitude,
+            Restaurant.city,
+            Restaurant.price_range,
+            Restaurant.google_place_id,
+        )
+        .select_from(changed)
+        .join(Restaurant, Restaurant.id == changed.c.restaurant_id)
+    )
+
+
+def user_restaurant_dict(row: Any) -> dict:
+    """Shape one row of user_restaurant_rows_stmt() like UserRestaurantRead."""
+    return {
+        "id": row.id,
+        "restaurant": {
+            "id": row.restaurant_id,
+            "name": row.restaurant_name,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "city": row.city,
+            "price_range": row.price_range,
+            "google_place_id": row.google_place_id,
+        },
+        "is_favorite": row.is_favorite,
+        "is_visited": row.is_visited,
+        "created_at": row.created_at,
+    }
+
+
+def user_restaurant_dicts(rows: Iterable[Any]) -> list[dict]:
+    return [user_restaurant_dict(row) for row in rows]
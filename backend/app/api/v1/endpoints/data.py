@@ -1,47 +1,79 @@
-from typing import Any, List as PyList
-from fastapi import APIRouter, Depends, HTTPException, Body
+import hashlib
+import uuid
+from typing import Any, List as PyList, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, col
-from sqlalchemy.orm import selectinload
 
 from app.api import deps
+from app.api.etag import make_etag, etag_matches
+from app.api.pagination import PageParams
+from app.api.encoding import ENCODED_RESPONSES, Encoding, encoded_response, get_encoding
+from app.api.projection import user_restaurant_dicts, user_restaurant_rows_stmt
+from app.api.v1.endpoints.lists import fetch_list_summaries
+from app.core import account_deletion, account_export, data_version, user_invalidation
 from app import schemas
 from app.models.list import List
 from app.models.save_event import UserRestaurant
 from app.models.restaurant import Restaurant
+from app.models.user import User
+from app.worker import delete_account, export_account
 from app.errors import ErrorMessages
 
 router = APIRouter()
 
-@router.get("/home", response_model=schemas.HomeResponse)
+@router.get("/home", response_model=schemas.HomeResponse, responses=ENCODED_RESPONSES)
 async def get_home_data(
+    request: Request,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
+    page: PageParams = Depends(),
+    encoding: Encoding = Depends(get_encoding),
+    if_none_match: Optional[str] = Header(None),
 ) -> Any:
     """
     Get homepage data: User's lists and unsorted restaurants.
+
+    Unsorted restaurants are keyset-paginated (?limit=&cursor=&sort=); lists are
+    always returned in full.
+
+    The ETag is the user's data version plus a hash of the query string and the
+    negotiated media type (see app.api.encoding). A matching If-None-Match is
+    answered with 304 before any database query runs.
     """
-    # 1. Fetch Lists
-    stmt_lists = select(List).where(List.user_id == current_user.id)
-    result_lists = await db.execute(stmt_lists)
-    lists = result_lists.scalars().all()
-
-    # 2. Fetch Unsorted Restaurants (UserRestaurant where list_id is None)
-    # Need to load the related Restaurant object
-    stmt_unsorted = (
-        select(UserRestaurant)
-        .where(UserRestaurant.user_id == current_user.id)
-        .where(UserRestaurant.list_id == None)
-        .options(selectinload(UserRestaurant.restaurant)) # Assuming relationship needed in model?
-    )
-    
+    headers = {}
+    version = await data_version.get_version(redis_client, current_user.id)
+    if version is not None:
+        query_hash = hashlib.sha1(f"{request.query_params}|{encoding.media_type}".encode()).hexdigest()[:8]
+        etag = make_etag(f"{version}-{query_hash}", weak=True)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+    # 1. Fetch Lists with counts and previews (one aggregate query)
+    lists = await fetch_list_summaries(db, current_user.id)
+
+    # 2. Fetch Unsorted Restaurants (UserRestaurant where list_id is None),
+    # projected with their Restaurant in one JOIN
+    stmt_unsorted = user_restaurant_rows_stmt(current_user.id).where(UserRestaurant.list_id == None)
+    stmt_unsorted = page.apply(stmt_unsorted)
+
     result_unsorted = await db.execute(stmt_unsorted)
-    unsorted = result_unsorted.scalars().all()
+    unsorted, next_cursor = page.page(result_unsorted.all())
 
-    return {
-        "lists": lists,
-        "unsorted_restaurants": unsorted
-    }
+    # Trusted rows: skip response_model validation (see app.api.projection)
+    return encoded_response(
+        {
+            "lists": lists,
+            "unsorted_restaurants": user_restaurant_dicts(unsorted),
+            "next_cursor": next_cursor,
+        },
+        encoding,
+        headers=headers,
+    )
 
 
 @router.get("/favorites")
@@ -53,4 +85,127 @@ async def get_favorites_deprecated():
 @router.get("/visited")
 async def get_visited_deprecated():
     """Deprecated: visited status is now returned as flags on /home endpoint."""
-    raise HTTPException(status_code=410, detail=ErrorMessages.ENDPOINT_VISITED_GONE)
\ No newline at end of file
+    raise HTTPException(status_code=410, detail=ErrorMessages.ENDPOINT_VISITED_GONE)
+
+
+def _export_read(export_id: uuid.UUID, job: dict) -> dict:
+    return {
+        "id": export_id,
+        "format": job["format"],
+        "status": job["status"],
+        "table": job.get("table") or None,
+        "rows": int(job.get("rows") or 0),
+        "error": job.get("error") or None,
+    }
+
+
+@router.post("/account/export", response_model=schemas.AccountExportRead, status_code=202)
+async def create_account_export(
+    format: account_export.ExportFormat = Query(account_export.ExportFormat.NDJSON),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Start an export of all of the user's data (?format=ndjson|zip).
+
+    Poll GET /account/export/{id} for progress, then download it from
+    GET /account/export/{id}/download.
+    """
+    export_id = uuid.uuid4()
+    await account_export.create_job(redis_client, export_id, current_user.id, format)
+    export_account.delay(str(export_id), str(current_user.id), format.value)
+    return {"id": export_id, "format": format.value, "status": account_export.ExportStatus.PENDING.value}
+
+
+@router.get("/account/export/{export_id}", response_model=schemas.AccountExportRead)
+async def get_account_export(
+    export_id: uuid.UUID,
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get an account export's status and progress.
+    """
+    job = await account_export.read_job(redis_client, export_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_EXPORT_NOT_FOUND)
+    return _export_read(export_id, job)
+
+
+@router.get("/account/export/{export_id}/download", response_class=FileResponse)
+async def download_account_export(
+    export_id: uuid.UUID,
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Download a complete account export (streamed from the export store).
+    """
+    job = await account_export.read_job(redis_client, export_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_EXPORT_NOT_FOUND)
+    if job["status"] != account_export.ExportStatus.COMPLETE.value:
+        raise HTTPException(status_code=409, detail=ErrorMessages.RESOURCE_EXPORT_NOT_READY)
+
+    fmt = account_export.ExportFormat(job["format"])
+    key = account_export.object_key(current_user.id, export_id, fmt)
+    store = account_export.get_store()
+    if not store.exists(key):
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_EXPORT_NOT_FOUND)
+    return FileResponse(
+        store.path(key),
+        media_type=account_export.MEDIA_TYPES[fmt],
+        filename=f"reel-mapper-export.{fmt.value}",
+    )
+
+
+@router.delete("/account", response_model=schemas.AccountDeletionRead, status_code=202)
+async def request_account_deletion(
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Delete the user's account and all of their data.
+
+    The account is detached from its Clerk identity (and its email released) at
+    once, so signing in again starts a fresh account; its rows are then deleted in
+    the background in bounded batches (see app.core.account_deletion). Progress is
+    at GET /account/deletion/{user_id}.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(clerk_user_id=None, email=f"deleted-{current_user.id}@deleted.invalid")
+    )
+    await db.commit()
+    deps.user_cache.delete(current_user.clerk_user_id)
+    await user_invalidation.publish(redis_client, current_user.clerk_user_id)
+
+    await account_deletion.create_job(redis_client, current_user.id, current_user.clerk_user_id)
+    delete_account.delay(str(current_user.id))
+    return {"user_id": current_user.id, "status": "pending"}
+
+
+@router.get("/account/deletion/{user_id}", response_model=schemas.AccountDeletionRead)
+async def read_account_deletion(
+    user_id: uuid.UUID,
+    redis_client: Any = Depends(deps.get_redis),
+    clerk_user_id: str = Depends(deps.get_current_subject),
+) -> Any:
+    """
+    Progress of an account deletion requested by this identity.
+
+    Authenticates without resolving a User, since the account is already detached
+    (and polling must not create a new one). Kept for ACCOUNT_DELETE_TTL_SECONDS.
+    """
+    job = await account_deletion.read_job(redis_client, user_id, clerk_user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_DELETION_NOT_FOUND)
+    return {
+        "user_id": user_id,
+        "status": job.get("status", "pending"),
+        "table": job.get("table") or None,
+        "rows": int(job.get("rows") or 0),
+        "error": job.get("error") or None,
+    }
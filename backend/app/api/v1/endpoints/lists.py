@@ -1,27 +1,128 @@
 import logging
+from datetime import datetime
 from typing import Any
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
+from sqlalchemy import func, delete, exists, true, update, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlmodel import select
-from sqlalchemy.orm import selectinload
 
 logger = logging.getLogger(__name__)
 
 from app.api import deps
+from app.api.pagination import PageParams
+from app.api.encoding import ENCODED_RESPONSES, Encoding, encoded_response, get_encoding
+from app.api.export import ExportFormat, MEDIA_TYPES, export_chunks, export_filename, streamed_batches
+from app.api.projection import (
+    user_restaurant_dict,
+    user_restaurant_dicts,
+    user_restaurant_rows_returning,
+    user_restaurant_rows_stmt,
+)
+from app.core import data_version, sync_log
+from app.core.config import settings
 from app import schemas
 from app.models.list import List
+from app.models.restaurant import Restaurant
 from app.models.save_event import UserRestaurant
+from app.models.sync import SyncEntityType, SyncOp
 from app.errors import ErrorMessages
 
 router = APIRouter()
 
+
+def list_summaries_stmt(user_id: UUID):
+    """
+    One statement returning every list of a user with its counts and previews.
+
+    Each list row joins two LATERAL subqueries over user_restaurants, both driven by
+    the (user_id, list_id, ...) indexes: an aggregate for the counts and a LIMIT-ed
+    newest-first scan for the previews, folded into a JSON array.
+    """
+    counts = (
+        select(
+            func.count(UserRestaurant.id).label("restaurant_count"),
+            func.count(UserRestaurant.id).filter(UserRestaurant.is_favorite).label("favorite_count"),
+            func.count(UserRestaurant.id).filter(UserRestaurant.is_visited).label("visited_count"),
+        )
+        .where(UserRestaurant.user_id == List.user_id)
+        .where(UserRestaurant.list_id == List.id)
+        .lateral("counts")
+    )
+
+    newest = (
+        select(
+            Restaurant.id,
+            Restaurant.name,
+            Restaurant.city,
+            UserRestaurant.created_at.label("saved_at"),
+            UserRestaurant.id.label("user_restaurant_id"),
+        )
+        .select_from(UserRestaurant)
+        .join(Restaurant, Restaurant.id == UserRestaurant.restaurant_id)
+        .where(UserRestaurant.user_id == List.user_id)
+        .where(UserRestaurant.list_id == List.id)
+        .order_by(UserRestaurant.created_at.desc(), UserRestaurant.id.desc())
+        .limit(settings.LIST_PREVIEW_COUNT)
+        .correlate(List)
+        .subquery("newest")
+    )
+    preview_json = func.json_agg(
+        aggregate_order_by(
+            func.json_build_object("id", newest.c.id, "name", newest.c.name, "city", newest.c.city),
+            newest.c.saved_at.desc(),
+            newest.c.user_restaurant_id.desc(),
+        )
+    )
+    previews = (
+        # json_build_array(), not cast("[]", JSON): the JSON type would bind "[]" as a JSON string
+        select(func.coalesce(preview_json, func.json_build_array(), type_=JSON).label("previews"))
+        .lateral("preview_rows")
+    )
+
+    return (
+        select(
+            List.id,
+            List.name,
+            List.created_at,
+            counts.c.restaurant_count,
+            counts.c.favorite_count,
+            counts.c.visited_count,
+            previews.c.previews,
+        )
+        .select_from(List)
+        .join(counts, true())
+        .join(previews, true())
+        .where(List.user_id == user_id)
+        .order_by(List.created_at, List.id)
+    )
+
+
+async def fetch_list_summaries(db: AsyncSession, user_id: UUID) -> list[dict]:
+    result = await db.execute(list_summaries_stmt(user_id))
+    return [dict(row._mapping) for row in result.all()]
+
+
+@router.get("/", response_model=schemas.ListsResponse, responses=ENCODED_RESPONSES)
+async def get_lists(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Any = Depends(deps.get_current_user),
+    encoding: Encoding = Depends(get_encoding),
+) -> Any:
+    """
+    Get all of the user's lists with restaurant/favorite/visited counts and previews.
+    """
+    return encoded_response({"lists": await fetch_list_summaries(db, current_user.id)}, encoding)
+
+
 @router.post("/", response_model=schemas.ListRead, status_code=201)
 async def create_list(
     *,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     list_in: schemas.ListCreate,
     current_user: Any = Depends(deps.get_current_user),
 ) -> Any:
@@ -48,6 +149,7 @@ async def create_list(
 
     try:
         db.add(new_list)
+        await sync_log.record_changes(db, current_user.id, [(SyncEntityType.LIST, new_list.id, SyncOp.UPSERT)])
         await db.commit()
         await db.refresh(new_list)
     except IntegrityError:
@@ -57,74 +159,128 @@ async def create_list(
             detail="List with this name already exists"
         )
 
+    await data_version.bump(redis_client, current_user.id)
     return new_list
 
-@router.get("/{list_id}/restaurants", response_model=schemas.ListRestaurantsResponse)
+@router.get("/{list_id}/restaurants", response_model=schemas.ListRestaurantsResponse, responses=ENCODED_RESPONSES)
 async def get_list_restaurants(
     list_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
     current_user: Any = Depends(deps.get_current_user),
+    page: PageParams = Depends(),
+    encoding: Encoding = Depends(get_encoding),
 ) -> Any:
     """
-    Get all restaurants in a specific list.
+    Get the restaurants in a specific list, keyset-paginated (?limit=&cursor=&sort=).
     """
-    # First verify the list belongs to the user
-    stmt_list = select(List).where(List.id == list_id).where(List.user_id == current_user.id)
-    result_list = await db.execute(stmt_list)
-    list_item = result_list.scalar_one_or_none()
+    # Ownership and the page in one statement: the user's list row LEFT JOINed to the
+    # page of its restaurants. No row -> not the user's list; one row with NULL page
+    # columns -> the list is empty.
+    page_rows = page.apply(
+        user_restaurant_rows_stmt(current_user.id).where(UserRestaurant.list_id == list_id)
+    ).subquery("page_rows")
+    stmt = (
+        select(List.id.label("owned_list_id"), *page_rows.c)
+        .select_from(List)
+        .outerjoin(page_rows, true())
+        .where(List.id == list_id)
+        .where(List.user_id == current_user.id)
+        .order_by(*page.order_subquery(page_rows))
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
 
-    if not list_item:
+    if not rows:
         raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_LIST_NOT_FOUND)
 
-    # Fetch all UserRestaurant records for this list
-    stmt = (
-        select(UserRestaurant)
-        .where(UserRestaurant.user_id == current_user.id)
-        .where(UserRestaurant.list_id == list_id)
-        .options(selectinload(UserRestaurant.restaurant))
+    restaurants, next_cursor = page.page([row for row in rows if row.id is not None])
+
+    # Trusted rows: skip response_model validation (see app.api.projection)
+    return encoded_response(
+        {"restaurants": user_restaurant_dicts(restaurants), "next_cursor": next_cursor}, encoding
     )
 
-    result = await db.execute(stmt)
-    restaurants = result.scalars().all()
+@router.get(
+    "/{list_id}/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}},
+)
+async def export_list(
+    list_id: UUID,
+    format: ExportFormat = Query(ExportFormat.GEOJSON),
+    db: AsyncSession = Depends(deps.get_db),
+    open_session: Any = Depends(deps.get_session_factory),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Download a list's restaurants as GeoJSON, KML or CSV (?format=), oldest save first.
 
-    return {"restaurants": restaurants}
+    The export is streamed from a server-side cursor (see app.api.export), so it
+    starts immediately and uses constant memory whatever the list size.
+    """
+    result = await db.execute(
+        select(List.name).where(List.id == list_id).where(List.user_id == current_user.id)
+    )
+    list_name = result.scalar_one_or_none()
+    if list_name is None:
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_LIST_NOT_FOUND)
+    # Release its connection now; the export streams on a session of its own
+    await db.close()
+
+    stmt = (
+        user_restaurant_rows_stmt(current_user.id)
+        .where(UserRestaurant.list_id == list_id)
+        .order_by(UserRestaurant.created_at, UserRestaurant.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_ROWS)
+    )
+    return StreamingResponse(
+        export_chunks(list_name, format, streamed_batches(open_session, stmt)),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": export_filename(list_name, format)},
+    )
 
 @router.post("/{list_id}/restaurants", response_model=schemas.UserRestaurantRead)
 async def add_restaurant_to_list(
     list_id: UUID,
     request: schemas.AddRestaurantToListRequest,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
 ) -> Any:
     """
     Add a restaurant to a list by updating the UserRestaurant's list_id.
     """
-    # Verify the target list belongs to the current user
-    stmt_list = select(List).where(List.id == list_id, List.user_id == current_user.id)
-    result_list = await db.execute(stmt_list)
-    if not result_list.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_LIST_NOT_FOUND)
-
-    # Find the UserRestaurant record
-    stmt = select(UserRestaurant).where(UserRestaurant.user_id == current_user.id).where(UserRestaurant.restaurant_id == request.restaurant_id)
+    # One statement: the ownership check is a CTE the UPDATE depends on, the result
+    # LEFT JOINs from it so a foreign list and an unsaved restaurant differ, and the
+    # sync log is written alongside
+    owned = select(List.id).where(List.id == list_id).where(List.user_id == current_user.id).cte("owned")
+    moved = user_restaurant_rows_returning(
+        update(UserRestaurant)
+        .where(UserRestaurant.user_id == current_user.id)
+        .where(UserRestaurant.restaurant_id == request.restaurant_id)
+        .where(exists(owned.select()))
+        .values(list_id=list_id, updated_at=datetime.utcnow())
+    ).cte("moved")
+    stmt = select(owned.c.id.label("owned_list_id"), *moved.c).select_from(owned).outerjoin(moved, true())
+    stmt = sync_log.log_returned(stmt, moved, current_user.id, SyncEntityType.USER_RESTAURANT, SyncOp.UPSERT)
     result = await db.execute(stmt)
-    user_rest = result.scalar_one_or_none()
+    moved = result.one_or_none()
 
-    if not user_rest:
+    if not moved:
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_LIST_NOT_FOUND)
+    if moved.id is None:
         raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_RESTAURANT_NOT_SAVED)
 
-    # Update list_id
-    user_rest.list_id = list_id
-    db.add(user_rest)
     await db.commit()
-    await db.refresh(user_rest)
-    return user_rest
+    await data_version.bump(redis_client, current_user.id)
+    return user_restaurant_dict(moved)
 
 
 @router.delete("/{list_id}", status_code=204)
 async def delete_list(
     list_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
 ) -> None:
     """
@@ -133,18 +289,42 @@ async def delete_list(
     Database CASCADE behavior automatically:
     - SET NULL on UserRestaurant.list_id (restaurants move to Unsorted)
     - SET NULL on SaveEvent.target_list_id (preserve history)
-    """
-    stmt = select(List).where(List.id == list_id, List.user_id == current_user.id)
-    result = await db.execute(stmt)
-    list_item = result.scalar_one_or_none()
 
-    if not list_item:
-        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_LIST_NOT_FOUND)
+    The cascade bypasses the application, so the list's restaurants are moved to
+    Unsorted explicitly first, which tells us which rows to log for /sync.
+
+    The list's ownership is enforced by the DELETE itself; for a list the user
+    doesn't own, nothing is deleted and the moves are rolled back.
 
+    Locks are taken in the order every other mutation takes them, user_restaurants
+    rows first and the user's sync sequence last, so a concurrent toggle or move
+    of the same restaurant can't deadlock with the delete.
+    """
     try:
-        await db.delete(list_item)
-        await db.commit()
-        logger.info(f"Deleted list {list_id} for user {current_user.id}")
+        moved = await db.execute(
+            update(UserRestaurant)
+            .where(UserRestaurant.user_id == current_user.id)
+            .where(UserRestaurant.list_id == list_id)
+            .values(list_id=None, updated_at=datetime.utcnow())
+            .returning(UserRestaurant.id)
+            .execution_options(synchronize_session=False)
+        )
+        moved_ids = moved.scalars().all()
+        stmt = (
+            delete(List)
+            .where(List.id == list_id)
+            .where(List.user_id == current_user.id)
+            .returning(List.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        deleted_id = result.scalar_one_or_none()
+        if deleted_id:
+            changes = [(SyncEntityType.LIST, list_id, SyncOp.DELETE)]
+            changes += [(SyncEntityType.USER_RESTAURANT, ur_id, SyncOp.UPSERT) for ur_id in moved_ids]
+            await sync_log.record_changes(db, current_user.id, changes)
+            await db.commit()
+            logger.info(f"Deleted list {list_id} for user {current_user.id}")
     except Exception as e:
         await db.rollback()
         logger.error(f"Failed to delete list {list_id}: {e}", exc_info=True)
@@ -153,4 +333,9 @@ async def delete_list(
             detail=ErrorMessages.SERVER_DELETE_FAILED,
         )
 
+    if not deleted_id:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_LIST_NOT_FOUND)
+
+    await data_version.bump(redis_client, current_user.id)
     return None
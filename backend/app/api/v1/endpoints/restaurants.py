@@ -1,22 +1,42 @@
-from typing import Any
+import hashlib
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Body
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Query, Response
+from sqlalchemy import and_, any_, bindparam, not_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from sqlmodel import select
 
 from app.api import deps
+from app.api.encoding import JSON, FastJSONResponse
+from app.api.etag import etag_matches, make_etag
+from app.core import data_version, restaurant_cache, sync_log
+from app.core.config import settings
 from app import schemas
+from app.models.list import List
 from app.models.restaurant import Restaurant
 from app.models.save_event import UserRestaurant
 from app.models.note import Note
+from app.models.sync import SyncEntityType, SyncOp
 from app.errors import ErrorMessages
 
 router = APIRouter()
 
+
+class RestaurantInclude(str, Enum):
+    USER = "user"  # the user's flags, list and note (see restaurant_detail_stmt)
+
+
 async def _toggle_user_restaurant_flag(
     restaurant_id: UUID,
     field_name: str,
     db: AsyncSession,
+    redis_client: Any,
     current_user: Any
 ) -> dict:
     """
@@ -26,6 +46,7 @@ async def _toggle_user_restaurant_flag(
         restaurant_id: UUID of the restaurant
         field_name: Name of the boolean field to toggle ("is_favorite" or "is_visited")
         db: Database session
+        redis_client: Redis client for the user's data version
         current_user: Current authenticated user
 
     Returns:
@@ -34,51 +55,228 @@ async def _toggle_user_restaurant_flag(
     Raises:
         HTTPException: 404 if restaurant not saved by user
     """
-    # Query for existing UserRestaurant
-    stmt = (
-        select(UserRestaurant)
+    # Flip the flag in one statement: concurrent toggles serialize on the row lock,
+    # so a double-tap can't lose an update. The sync log is written by the same
+    # statement.
+    column = getattr(UserRestaurant, field_name)
+    toggled = (
+        update(UserRestaurant)
         .where(UserRestaurant.restaurant_id == restaurant_id)
         .where(UserRestaurant.user_id == current_user.id)
+        .values({column: not_(column), UserRestaurant.updated_at: datetime.utcnow()})
+        .returning(UserRestaurant.id, column)
+        .cte("toggled")
+    )
+    stmt = sync_log.log_returned(
+        select(toggled.c[field_name]), toggled, current_user.id, SyncEntityType.USER_RESTAURANT, SyncOp.UPSERT
     )
     result = await db.execute(stmt)
-    existing = result.scalar_one_or_none()
+    updated = result.one_or_none()
 
-    if not existing:
+    if not updated:
         # Restaurant not saved by user - cannot toggle flags
         raise HTTPException(
             status_code=404,
             detail="Restaurant not saved by user"
         )
 
-    # Toggle the field using getattr/setattr for dynamic field access
-    current_value = getattr(existing, field_name)
-    new_value = not current_value
-    setattr(existing, field_name, new_value)
-
-    db.add(existing)
+    new_value = updated[0]
     await db.commit()
-    await db.refresh(existing)
+    await data_version.bump(redis_client, current_user.id)
 
     # Return response with field name and new value
     return {field_name: new_value}
 
-@router.get("/{restaurant_id}", response_model=schemas.RestaurantRead)
+def restaurant_detail_stmt(restaurant_id: UUID, user_id: UUID):
+    """
+    One row: the restaurant LEFT JOINed to the user's save of it (and that save's
+    list) and to the user's note on it. NULL user_restaurant_id -> not saved;
+    NULL note_id -> no note.
+    """
+    return (
+        select(
+            Restaurant.id,
+            Restaurant.name,
+            Restaurant.latitude,
+            Restaurant.longitude,
+            Restaurant.city,
+            Restaurant.price_range,
+            Restaurant.google_place_id,
+            UserRestaurant.id.label("user_restaurant_id"),
+            UserRestaurant.is_favorite,
+            UserRestaurant.is_visited,
+            UserRestaurant.list_id,
+            UserRestaurant.created_at.label("saved_at"),
+            List.name.label("list_name"),
+            Note.id.label("note_id"),
+            Note.content.label("note_content"),
+            Note.created_at.label("note_created_at"),
+            Note.updated_at.label("note_updated_at"),
+        )
+        .select_from(Restaurant)
+        .outerjoin(
+            UserRestaurant,
+            and_(UserRestaurant.restaurant_id == Restaurant.id, UserRestaurant.user_id == user_id),
+        )
+        .outerjoin(List, List.id == UserRestaurant.list_id)
+        .outerjoin(Note, and_(Note.restaurant_id == Restaurant.id, Note.user_id == user_id))
+        .where(Restaurant.id == restaurant_id)
+    )
+
+
+def restaurant_detail_dict(row: Any, user_id: UUID) -> dict:
+    """Build the RestaurantDetailRead dict for a restaurant_detail_stmt() row."""
+    saved = row.user_restaurant_id is not None
+    note = None
+    if row.note_id is not None:
+        note = {
+            "id": row.note_id,
+            "user_id": user_id,
+            "restaurant_id": row.id,
+            "content": row.note_content,
+            "created_at": row.note_created_at,
+            "updated_at": row.note_updated_at,
+        }
+    return {
+        "id": row.id,
+        "name": row.name,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "city": row.city,
+        "price_range": row.price_range,
+        "google_place_id": row.google_place_id,
+        "user": {
+            "saved": saved,
+            "user_restaurant_id": row.user_restaurant_id,
+            "is_favorite": bool(row.is_favorite),
+            "is_visited": bool(row.is_visited),
+            "list_id": row.list_id,
+            "list_name": row.list_name,
+            "saved_at": row.saved_at,
+            "note": note,
+        },
+    }
+
+
+async def _restaurant_batch(ids: list[UUID], db: AsyncSession, redis_client: Any) -> bytes:
+    """
+    RestaurantBatchResponse JSON for ids: cached bodies first, then one
+    WHERE id = ANY(:ids) query for the rest (whose bodies are cached in turn).
+    The cached bodies are spliced into the response as-is, without re-parsing.
+    """
+    # Preserve request order, ignore repeats
+    restaurant_ids = list(dict.fromkeys(ids))
+    if len(restaurant_ids) > settings.RESTAURANT_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_TOO_MANY_IDS)
+
+    found = await restaurant_cache.get_many(redis_client, restaurant_ids)
+    misses = [restaurant_id for restaurant_id in restaurant_ids if restaurant_id not in found]
+    if misses:
+        # One array parameter, so the prepared statement is reused whatever the batch size
+        ids_param = bindparam("ids", misses, type_=ARRAY(PG_UUID(as_uuid=True)))
+        result = await db.execute(select(Restaurant).where(Restaurant.id == any_(ids_param)))
+        loaded = {
+            restaurant.id: schemas.RestaurantRead.model_validate(restaurant).model_dump_json()
+            for restaurant in result.scalars().all()
+        }
+        await restaurant_cache.put_many(redis_client, loaded)
+        found.update(loaded)
+
+    restaurants = ",".join(found[restaurant_id] for restaurant_id in restaurant_ids if restaurant_id in found)
+    missing = orjson.dumps([restaurant_id for restaurant_id in restaurant_ids if restaurant_id not in found])
+    return b'{"restaurants":[' + restaurants.encode() + b'],"missing":' + missing + b"}"
+
+
+@router.get("", response_model=schemas.RestaurantBatchResponse)
+@router.get("/", response_model=schemas.RestaurantBatchResponse, include_in_schema=False)
+async def get_restaurants(
+    ids: list[UUID] = Query(..., max_length=settings.RESTAURANT_BATCH_MAX_IDS),
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get several restaurants' canonical details in one call (?ids=...&ids=...).
+
+    Results follow request order; ids with no restaurant are returned in `missing`.
+    Use POST /batch when the ids don't fit in a URL.
+    """
+    body = await _restaurant_batch(ids, db, redis_client)
+    return Response(
+        content=body,
+        media_type=JSON,
+        headers={"Cache-Control": f"public, max-age={settings.RESTAURANT_MAX_AGE_SECONDS}"},
+    )
+
+
+@router.post("/batch", response_model=schemas.RestaurantBatchResponse)
+async def get_restaurants_batch(
+    batch_in: schemas.RestaurantBatchRequest,
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    GET /restaurants?ids= with the ids in the body, for long lists.
+    """
+    body = await _restaurant_batch(batch_in.ids, db, redis_client)
+    return Response(content=body, media_type=JSON)
+
+
+@router.get("/{restaurant_id}", response_model=schemas.RestaurantDetailRead)
 async def get_restaurant(
     restaurant_id: UUID,
+    include: Optional[RestaurantInclude] = Query(None),
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
+    if_none_match: Optional[str] = Header(None),
 ) -> Any:
-    stmt = select(Restaurant).where(Restaurant.id == restaurant_id)
-    result = await db.execute(stmt)
-    restaurant = result.scalar_one_or_none()
-    if not restaurant:
-        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_RESTAURANT_NOT_FOUND)
-    return restaurant
+    """
+    Get a restaurant's canonical details.
+
+    Read through app.core.restaurant_cache, so Postgres is only queried on a miss.
+    Restaurants are shared by every user, so the response is cacheable by clients
+    and intermediaries (Cache-Control: public); the strong ETag is a hash of the
+    body and changes exactly when the restaurant does.
+
+    ?include=user adds the user's save (flags, list) and note for the detail
+    screen, all from one query. That response is per-user and bypasses the cache.
+    """
+    if include == RestaurantInclude.USER:
+        result = await db.execute(restaurant_detail_stmt(restaurant_id, current_user.id))
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_RESTAURANT_NOT_FOUND)
+        # Trusted row: skip response_model validation (see app.api.projection)
+        return FastJSONResponse(
+            restaurant_detail_dict(row, current_user.id),
+            headers={"Cache-Control": "private, no-cache"},
+        )
+
+    body = await restaurant_cache.get(redis_client, restaurant_id)
+    if body is None:
+        stmt = select(Restaurant).where(Restaurant.id == restaurant_id)
+        result = await db.execute(stmt)
+        restaurant = result.scalar_one_or_none()
+        if not restaurant:
+            raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_RESTAURANT_NOT_FOUND)
+        body = schemas.RestaurantRead.model_validate(restaurant).model_dump_json()
+        await restaurant_cache.put(redis_client, restaurant_id, body)
+
+    headers = {
+        "ETag": make_etag(hashlib.sha1(body.encode()).hexdigest()[:16]),
+        "Cache-Control": f"public, max-age={settings.RESTAURANT_MAX_AGE_SECONDS}",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=JSON, headers=headers)
 
 @router.post("/{restaurant_id}/favorite", response_model=schemas.FavoriteResponse)
 async def toggle_favorite(
     restaurant_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
 ) -> Any:
     """Toggle favorite status for a restaurant."""
@@ -86,6 +284,7 @@ async def toggle_favorite(
         restaurant_id=restaurant_id,
         field_name="is_favorite",
         db=db,
+        redis_client=redis_client,
         current_user=current_user
     )
 
@@ -93,6 +292,7 @@ async def toggle_favorite(
 async def toggle_visited(
     restaurant_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
 ) -> Any:
     """Toggle visited status for a restaurant."""
@@ -100,6 +300,7 @@ async def toggle_visited(
         restaurant_id=restaurant_id,
         field_name="is_visited",
         db=db,
+        redis_client=redis_client,
         current_user=current_user
     )
 
@@ -108,30 +309,39 @@ async def save_notes(
     restaurant_id: UUID,
     note_data: schemas.NoteUpdate = Body(...),
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
 ) -> Any:
-    # 1. Check if note exists
-    stmt = (
-        select(Note)
-        .where(Note.user_id == current_user.id)
-        .where(Note.restaurant_id == restaurant_id)
-    )
-    result = await db.execute(stmt)
-    existing_note = result.scalar_one_or_none()
-    
-    if existing_note:
-        existing_note.content = note_data.content
-        db.add(existing_note)
-        await db.commit()
-        await db.refresh(existing_note)
-        return existing_note
-    else:
-        new_note = Note(
+    """
+    Create or replace the user's note for a restaurant.
+
+    One INSERT ... ON CONFLICT (user_id, restaurant_id) DO UPDATE, so two devices
+    saving at once can't both insert; the sync log is written by the same statement.
+    """
+    now = datetime.utcnow()
+    saved = (
+        pg_insert(Note)
+        .values(
+            id=uuid.uuid4(),
             user_id=current_user.id,
             restaurant_id=restaurant_id,
-            content=note_data.content
+            content=note_data.content,
+            created_at=now,
+            updated_at=now,
+        )
+        .on_conflict_do_update(
+            index_elements=[Note.user_id, Note.restaurant_id],
+            set_={"content": note_data.content, "updated_at": now},
         )
-        db.add(new_note)
-        await db.commit()
-        await db.refresh(new_note)
-        return new_note
+        .returning(*Note.__table__.c)
+        .cte("saved")
+    )
+    stmt = sync_log.log_returned(
+        select(aliased(Note, saved)), saved, current_user.id, SyncEntityType.NOTE, SyncOp.UPSERT
+    )
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    note = result.scalar_one()
+
+    await db.commit()
+    await data_version.bump(redis_client, current_user.id)
+    return note
@@ -1,10 +1,15 @@
-from typing import Any
-from fastapi import APIRouter, Depends
+from typing import Any, List as PyList
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
 from app.api import deps
 from app import schemas
+from app.core import status_cache
+from app.core.config import settings
 from app.models.save_event import SaveEvent, SaveEventStatus
 from app.worker import extract_info
+from app.errors import ErrorMessages
 
 router = APIRouter()
 
@@ -12,6 +17,7 @@ router = APIRouter()
 async def create_save_event(
     *,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     save_event_in: schemas.SaveEventCreate,
     current_user: Any = Depends(deps.get_current_user),
 ) -> Any:
@@ -31,7 +37,84 @@ async def create_save_event(
     await db.commit()
     await db.refresh(save_event)
 
-    # 2. Enqueue Job
+    # 2. Seed the status cache before the worker can pick the job up
+    await status_cache.write_status_async(redis_client, save_event)
+
+    # 3. Enqueue Job
     extract_info.delay(str(save_event.id))
-    
+
     return save_event
+
+
+async def _lookup_statuses(
+    save_event_ids: PyList[UUID],
+    db: AsyncSession,
+    redis_client: Any,
+    current_user: Any,
+) -> dict:
+    """
+    Resolve statuses from the Redis cache, falling back to Postgres only for misses.
+
+    Returns:
+        Dict keyed by SaveEvent id for every id owned by the current user.
+    """
+    found = await status_cache.read_statuses(redis_client, save_event_ids, current_user.id)
+
+    misses = [save_event_id for save_event_id in save_event_ids if save_event_id not in found]
+    if misses:
+        stmt = (
+            select(SaveEvent.id, SaveEvent.status, SaveEvent.error_message)
+            .where(SaveEvent.user_id == current_user.id)
+            .where(SaveEvent.id.in_(misses))
+        )
+        result = await db.execute(stmt)
+        for row in result.all():
+            found[row.id] = {"status": row.status, "error_message": row.error_message}
+
+    return found
+
+
+@router.get("/status", response_model=schemas.SaveEventStatusBatchResponse)
+async def get_save_event_statuses(
+    ids: PyList[UUID] = Query(...),
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get the status of several save events in one call (?ids=...&ids=...).
+
+    Ids that don't exist or belong to another user are returned in `missing`.
+    """
+    # Preserve request order, ignore repeats
+    save_event_ids = list(dict.fromkeys(ids))
+    if len(save_event_ids) > settings.SAVE_EVENT_STATUS_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_TOO_MANY_IDS)
+
+    found = await _lookup_statuses(save_event_ids, db, redis_client, current_user)
+
+    return {
+        "statuses": [
+            {"id": save_event_id, **found[save_event_id]}
+            for save_event_id in save_event_ids
+            if save_event_id in found
+        ],
+        "missing": [save_event_id for save_event_id in save_event_ids if save_event_id not in found],
+    }
+
+
+@router.get("/{save_event_id}", response_model=schemas.SaveEventStatusRead)
+async def get_save_event_status(
+    save_event_id: UUID,
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get the processing status of a single save event.
+    """
+    found = await _lookup_statuses([save_event_id], db, redis_client, current_user)
+    if save_event_id not in found:
+        raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_SAVE_EVENT_NOT_FOUND)
+
+    return {"id": save_event_id, **found[save_event_id]}
@@ -0,0 +1,364 @@
+"""
+Library Search
+
+GET /search?q=  ranked search over the user's saved restaurants, matching the
+restaurant's name and city, the name of the list it is in, and the user's note.
+
+Each saved restaurant has one search document, user_restaurants.search_vector,
+kept current by triggers (see the add_user_restaurants_search_vector migration):
+
+    name (weight A) || city (B) || list name (C) || note (D)
+
+Every search term is a prefix (`taco` matches "Tacos El Gordo") and all terms must
+match somewhere in the document; ts_rank weighs name hits above city, list and note
+hits. Results are keyset-paginated on (rank, id), and cursors are only valid for
+the query that produced them.
+
+When nothing matches and pg_trgm is installed, the first page falls back to
+trigram word similarity on restaurant names, so "katz delikatessen" still finds
+Katz's Delicatessen. Those results come back with fuzzy=true and no next page.
+
+GET /search/autocomplete?q=  typeahead: the user's restaurant and list names that
+start with q (case-insensitive), alphabetically. It runs on every keystroke, so it
+is answered from a per-process PrefixIndex of the user's names, built on the first
+keystroke and stamped with the user's data version (app/core/data_version.py).
+Every write bumps that version, so a stale index is noticed with one Redis GET and
+rebuilt, whichever worker made the change. Without Redis, or for libraries above
+AUTOCOMPLETE_INDEX_MAX_NAMES, the same lookups run as text_pattern_ops index range
+scans (see the add_name_prefix_indexes migration).
+
+See benchmarks/search.py and benchmarks/autocomplete.py.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, literal, literal_column, select, text, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.api.encoding import ENCODED_RESPONSES, Encoding, encoded_response, get_encoding
+from app.api.pagination import InvalidCursor
+from app.api.projection import user_restaurant_dict, user_restaurant_rows_stmt
+from app.core import data_version
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.prefix_index import PREFIX_END, PrefixIndex, normalize_prefix
+from app import schemas
+from app.models.list import List
+from app.models.restaurant import Restaurant
+from app.models.save_event import UserRestaurant
+from app.errors import ErrorMessages
+
+router = APIRouter()
+
+MAX_TERMS = 8
+
+# Trigger-maintained, not mapped on UserRestaurant so ORM loads don't fetch it
+SEARCH_VECTOR = literal_column("user_restaurants.search_vector", TSVECTOR)
+
+# Weight labels of each part of the search document
+SOURCE_WEIGHTS = (("restaurant", "{a,b}"), ("list", "{c}"), ("note", "{d}"))
+
+_trigram_available: Optional[bool] = None
+
+
+def prefix_tsquery_text(q: str, operator: str = "&") -> Optional[str]:
+    """
+    Turn free text into to_tsquery() input: every word a prefix match, joined by
+    `operator` ("&": all required, "|": any). None when q has no searchable words.
+
+    Only letters and digits survive, so the result can't contain tsquery operators.
+    """
+    terms = re.findall(r"[^\W_]+", q.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return f" {operator} ".join(f"{term}:*" for term in terms)
+
+
+async def _has_trigram(db: AsyncSession) -> bool:
+    """Whether pg_trgm is installed; checked once per process."""
+    global _trigram_available
+    if _trigram_available is None:
+        result = await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+        _trigram_available = result.scalar_one_or_none() is not None
+    return _trigram_available
+
+
+def _query_hash(q: str) -> str:
+    return hashlib.sha1(q.encode()).hexdigest()[:8]
+
+
+def encode_search_cursor(q: str, rank: float, row_id: UUID) -> str:
+    raw = json.dumps({"s": "relevance", "q": _query_hash(q), "k": [rank, str(row_id)]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str, q: str) -> tuple[float, UUID]:
+    """
+    Raises:
+        InvalidCursor: If the cursor is malformed or was issued for a different query
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != "relevance" or data["q"] != _query_hash(q):
+            raise InvalidCursor("Cursor was issued for a different query")
+        rank, row_id = data["k"]
+        if not isinstance(rank, (int, float)) or isinstance(rank, bool):
+            raise InvalidCursor("Malformed cursor")
+        return float(rank), UUID(row_id)
+    except InvalidCursor:
+        raise
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+
+def search_stmt(user_id: UUID, q: str, limit: int, after: Optional[tuple[float, UUID]] = None):
+    """
+    Select a user's saved restaurants matching q, best first, as
+    user_restaurant_rows_stmt() rows plus rank, list_name and one `<source>_matched`
+    flag per part of the document. Fetches limit + 1 rows so the caller can tell
+    whether another page exists.
+    """
+    query = func.to_tsquery("simple", prefix_tsquery_text(q))
+    any_term = func.to_tsquery("simple", prefix_tsquery_text(q, "|"))
+    rank = func.ts_rank(SEARCH_VECTOR, query)
+    rank_col = rank.label("rank")
+
+    stmt = (
+        user_restaurant_rows_stmt(user_id)
+        .outerjoin(List, List.id == UserRestaurant.list_id)
+        .add_columns(
+            rank_col,
+            List.name.label("list_name"),
+            *[
+                func.ts_filter(SEARCH_VECTOR, literal_column(f"'{weights}'::\"char\"[]"))
+                .bool_op("@@")(any_term)
+                .label(f"{source}_matched")
+                for source, weights in SOURCE_WEIGHTS
+            ],
+        )
+        .where(SEARCH_VECTOR.bool_op("@@")(query))
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(rank, UserRestaurant.id) < tuple_(*after))
+    return stmt.order_by(rank_col.desc(), UserRestaurant.id.desc()).limit(limit + 1)
+
+
+def fuzzy_search_stmt(user_id: UUID, q: str, limit: int):
+    """
+    Typo-tolerant fallback (needs pg_trgm): saved restaurants whose name contains a
+    word similar to q, most similar first. Same row shape as search_stmt().
+    """
+    similarity = func.word_similarity(literal(q), Restaurant.name)
+    rank_col = similarity.label("rank")
+    return (
+        user_restaurant_rows_stmt(user_id)
+        .outerjoin(List, List.id == UserRestaurant.list_id)
+        .add_columns(
+            rank_col,
+            List.name.label("list_name"),
+            literal(True).label("restaurant_matched"),
+            literal(False).label("list_matched"),
+            literal(False).label("note_matched"),
+        )
+        # name %> q  <=>  word_similarity(q, name) > pg_trgm.word_similarity_threshold
+        .where(Restaurant.name.op("%>", is_comparison=True)(literal(q)))
+        .order_by(rank_col.desc(), UserRestaurant.id.desc())
+        .limit(limit)
+    )
+
+
+def search_result_dict(row: Any) -> dict:
+    item = user_restaurant_dict(row)
+    item["rank"] = row.rank
+    item["list_name"] = row.list_name
+    item["matched"] = [source for source, _ in SOURCE_WEIGHTS if getattr(row, f"{source}_matched")]
+    return item
+
+
+@router.get("/search", response_model=schemas.SearchResponse, responses=ENCODED_RESPONSES)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(settings.SEARCH_LIMIT_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Any = Depends(deps.get_current_user),
+    encoding: Encoding = Depends(get_encoding),
+) -> Any:
+    """
+    Search the user's saved restaurants by name, city, list name and note text.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_search_cursor(cursor, q)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_INVALID_CURSOR)
+
+    if prefix_tsquery_text(q) is None:
+        return encoded_response({"results": [], "next_cursor": None, "fuzzy": False}, encoding)
+
+    result = await db.execute(search_stmt(current_user.id, q, limit, after))
+    rows = result.all()
+
+    next_cursor = None
+    fuzzy = False
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(q, rows[-1].rank, rows[-1].id)
+    elif not rows and after is None and settings.SEARCH_FUZZY and await _has_trigram(db):
+        result = await db.execute(fuzzy_search_stmt(current_user.id, q, limit))
+        rows = result.all()
+        fuzzy = True
+
+    # Trusted rows: skip response_model validation (see app.api.projection)
+    return encoded_response(
+        {"results": [search_result_dict(row) for row in rows], "next_cursor": next_cursor, "fuzzy": fuzzy},
+        encoding,
+    )
+
+
+# ----------------------------------------------------------------------------
+# Autocomplete
+# ----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class NameIndex:
+    """A user's names as of data version `version`."""
+
+    version: int
+    restaurants: PrefixIndex  # values: (user_restaurant id, restaurant id, name)
+    lists: PrefixIndex  # values: (list id, name)
+
+    def __len__(self) -> int:
+        return len(self.restaurants) + len(self.lists)
+
+
+def _names_held(entry: tuple[int, Optional[NameIndex]]) -> int:
+    # A too-big marker still takes a slot
+    return max(1, len(entry[1] or ()))
+
+
+# user_id -> (data version, NameIndex or None if the library is too big to keep),
+# bounded by the total number of names held
+name_index_cache = TTLCache(
+    maxsize=settings.AUTOCOMPLETE_CACHE_SIZE,
+    ttl_seconds=settings.AUTOCOMPLETE_CACHE_TTL_SECONDS,
+    max_weight=settings.AUTOCOMPLETE_CACHE_MAX_NAMES,
+    weigher=_names_held,
+)
+
+
+def _starts_with(key, prefix: str) -> list:
+    # text_pattern_ops operators, so ix_*_lower_name_pattern can serve them as a range scan
+    return [
+        key.op("~>=~", is_comparison=True)(prefix),
+        key.op("~<~", is_comparison=True)(prefix + PREFIX_END),
+    ]
+
+
+def restaurant_names_stmt(user_id: UUID, prefix: Optional[str] = None, limit: Optional[int] = None):
+    """
+    (id, restaurant_id, name, key) of a user's saved restaurants, optionally only
+    those whose key (lower(name)) starts with prefix, in PrefixIndex order.
+    """
+    key = func.lower(Restaurant.name)
+    stmt = (
+        select(UserRestaurant.id, Restaurant.id.label("restaurant_id"), Restaurant.name, key.label("key"))
+        .select_from(UserRestaurant)
+        .join(Restaurant, Restaurant.id == UserRestaurant.restaurant_id)
+        .where(UserRestaurant.user_id == user_id)
+        .order_by(key.collate("C"), UserRestaurant.id)
+    )
+    if prefix is not None:
+        stmt = stmt.where(*_starts_with(key, prefix))
+    return stmt if limit is None else stmt.limit(limit)
+
+
+def list_names_stmt(user_id: UUID, prefix: Optional[str] = None, limit: Optional[int] = None):
+    """(id, name, key) of a user's lists; see restaurant_names_stmt()."""
+    key = func.lower(List.name)
+    stmt = (
+        select(List.id, List.name, key.label("key"))
+        .where(List.user_id == user_id)
+        .order_by(key.collate("C"), List.id)
+    )
+    if prefix is not None:
+        stmt = stmt.where(*_starts_with(key, prefix))
+    return stmt if limit is None else stmt.limit(limit)
+
+
+async def _name_index(db: AsyncSession, redis_client: Any, user_id: UUID) -> Optional[NameIndex]:
+    """
+    The user's NameIndex, (re)built if missing or older than their data version.
+    None when it can't be used: Redis is unavailable (no version to check it
+    against) or the user has more than AUTOCOMPLETE_INDEX_MAX_NAMES names.
+    """
+    version = await data_version.get_version(redis_client, user_id)
+    if version is None:
+        return None
+    cached = name_index_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # The version is read before the names, so a write landing in between leaves
+    # newer names under an older version, which the next keystroke replaces
+    max_names = settings.AUTOCOMPLETE_INDEX_MAX_NAMES
+    restaurant_rows = (await db.execute(restaurant_names_stmt(user_id, limit=max_names + 1))).all()
+    list_rows = (await db.execute(list_names_stmt(user_id, limit=max_names + 1))).all()
+    index = None
+    if len(restaurant_rows) + len(list_rows) <= max_names:
+        index = NameIndex(
+            version=version,
+            restaurants=PrefixIndex((row.key, (row.id, row.restaurant_id, row.name)) for row in restaurant_rows),
+            lists=PrefixIndex((row.key, (row.id, row.name)) for row in list_rows),
+        )
+    name_index_cache.set(user_id, (version, index))
+    return index
+
+
+@router.get("/search/autocomplete", response_model=schemas.AutocompleteResponse, responses=ENCODED_RESPONSES)
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.AUTOCOMPLETE_LIMIT_DEFAULT, ge=1, le=settings.AUTOCOMPLETE_LIMIT_MAX),
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+    encoding: Encoding = Depends(get_encoding),
+) -> Any:
+    """
+    Restaurant and list names starting with q, up to `limit` of each.
+    """
+    prefix = normalize_prefix(q)
+    if not prefix:
+        return encoded_response({"restaurants": [], "lists": []}, encoding)
+
+    index = await _name_index(db, redis_client, current_user.id)
+    if index is not None:
+        restaurants = index.restaurants.match(prefix, limit)
+        lists = index.lists.match(prefix, limit)
+    else:
+        result = await db.execute(restaurant_names_stmt(current_user.id, prefix, limit))
+        restaurants = [(row.id, row.restaurant_id, row.name) for row in result.all()]
+        result = await db.execute(list_names_stmt(current_user.id, prefix, limit))
+        lists = [(row.id, row.name) for row in result.all()]
+
+    return encoded_response(
+        {
+            "restaurants": [
+                {"id": id, "restaurant_id": restaurant_id, "name": name} for id, restaurant_id, name in restaurants
+            ],
+            "lists": [{"id": id, "name": name} for id, name in lists],
+        },
+        encoding,
+    )
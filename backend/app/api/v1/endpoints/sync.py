@@ -0,0 +1,148 @@
+"""
+Delta Sync
+
+GET /sync                 full snapshot + token
+GET /sync?since=<token>   only what changed after the token, with tombstones
+
+Tokens are the user's sync sequence number (see app/core/sync_log.py). A delta
+reads the change log past the token, keeps the latest op per entity, and loads
+the current rows of upserted entities by primary key. A token older than the
+log's retention window (below the user's min_seq) gets a full snapshot.
+"""
+
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+
+from app.api import deps
+from app.api.encoding import ENCODED_RESPONSES, Encoding, encoded_response, get_encoding
+from app import schemas
+from app.models.list import List
+from app.models.note import Note
+from app.models.save_event import UserRestaurant
+from app.models.sync import SyncChange, SyncEntityType, SyncOp, SyncSequence
+from app.errors import ErrorMessages
+
+router = APIRouter()
+
+_MODELS = {
+    SyncEntityType.LIST.value: List,
+    SyncEntityType.USER_RESTAURANT.value: UserRestaurant,
+    SyncEntityType.NOTE.value: Note,
+}
+
+
+def _parse_token(token: str) -> int:
+    if not token.isdigit():
+        raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_INVALID_SYNC_TOKEN)
+    return int(token)
+
+
+def _load_stmt(entity_type: str, user_id: Any):
+    model = _MODELS[entity_type]
+    stmt = select(model).where(model.user_id == user_id)
+    if model is UserRestaurant:
+        stmt = stmt.options(selectinload(UserRestaurant.restaurant))
+    return stmt
+
+
+async def _sequence(db: AsyncSession, user_id: Any) -> tuple[int, int]:
+    """The user's (seq, min_seq); (0, 0) before their first change."""
+    result = await db.execute(
+        select(SyncSequence.seq, SyncSequence.min_seq).where(SyncSequence.user_id == user_id)
+    )
+    row = result.first()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+async def _snapshot(db: AsyncSession, user_id: Any) -> dict:
+    # Read the token first: anything committed while we read the tables will be
+    # delivered again by the next delta, and upserts are idempotent on the client.
+    seq, _ = await _sequence(db, user_id)
+
+    loaded = {}
+    for entity_type in _MODELS:
+        result = await db.execute(_load_stmt(entity_type, user_id))
+        loaded[entity_type] = result.scalars().all()
+
+    return {
+        "full": True,
+        "lists": loaded[SyncEntityType.LIST.value],
+        "user_restaurants": loaded[SyncEntityType.USER_RESTAURANT.value],
+        "notes": loaded[SyncEntityType.NOTE.value],
+        "deleted": [],
+        "next_token": str(seq),
+    }
+
+
+@router.get("/sync", response_model=schemas.SyncResponse, responses=ENCODED_RESPONSES)
+async def sync(
+    since: Optional[str] = Query(None, description="next_token from the previous sync"),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Any = Depends(deps.get_current_user),
+    encoding: Encoding = Depends(get_encoding),
+) -> Any:
+    """
+    Get lists, saved restaurants (with flags) and notes changed since a sync token.
+
+    Without `since`, with a token this server never issued, or with one older than
+    the change log's retention window, returns a full snapshot with full=true.
+    """
+    if since is None:
+        return encoded_response(await _snapshot(db, current_user.id), encoding, model=schemas.SyncResponse)
+
+    since_seq = _parse_token(since)
+
+    # Latest op per entity after the token, served by ix_sync_changes_user_id_seq
+    stmt = (
+        select(SyncChange.entity_type, SyncChange.entity_id, SyncChange.op, SyncChange.seq)
+        .where(SyncChange.user_id == current_user.id)
+        .where(SyncChange.seq > since_seq)
+        .distinct(SyncChange.entity_type, SyncChange.entity_id)
+        .order_by(SyncChange.entity_type, SyncChange.entity_id, SyncChange.seq.desc())
+    )
+    result = await db.execute(stmt)
+    changes = result.all()
+
+    # Read after the changes: a prune committed in between only raises min_seq, so
+    # a delta is never served from a log that lost rows past the token
+    seq, min_seq = await _sequence(db, current_user.id)
+    if since_seq < min_seq or (not changes and since_seq > seq):
+        # Token too old for the log, or from the future (e.g. database restored
+        # from backup): start over
+        return encoded_response(await _snapshot(db, current_user.id), encoding, model=schemas.SyncResponse)
+
+    next_seq = max([since_seq] + [change.seq for change in changes])
+
+    upserts = {entity_type: [] for entity_type in _MODELS}
+    deleted = []
+    for change in changes:
+        if change.op == SyncOp.DELETE.value:
+            deleted.append({"entity_type": change.entity_type, "id": change.entity_id})
+        else:
+            upserts[change.entity_type].append(change.entity_id)
+
+    loaded = {}
+    for entity_type, ids in upserts.items():
+        if not ids:
+            loaded[entity_type] = []
+            continue
+        model = _MODELS[entity_type]
+        result = await db.execute(_load_stmt(entity_type, current_user.id).where(model.id.in_(ids)))
+        loaded[entity_type] = result.scalars().all()
+
+        # Gone without a logged delete (e.g. notes removed by a restaurant cascade)
+        found = {row.id for row in loaded[entity_type]}
+        deleted.extend({"entity_type": entity_type, "id": entity_id} for entity_id in ids if entity_id not in found)
+
+    delta = {
+        "full": False,
+        "lists": loaded[SyncEntityType.LIST.value],
+        "user_restaurants": loaded[SyncEntityType.USER_RESTAURANT.value],
+        "notes": loaded[SyncEntityType.NOTE.value],
+        "deleted": deleted,
+        "next_token": str(next_seq),
+    }
+    return encoded_response(delta, encoding, model=schemas.SyncResponse)
@@ -1,33 +1,204 @@
+from datetime import datetime
 from typing import Any
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, delete, exists, func, or_, true, update
 from sqlmodel import select
 
 from app.api import deps
+from app.api.encoding import ENCODED_RESPONSES, Encoding, encoded_response, get_encoding
+from app.api.projection import user_restaurant_dict, user_restaurant_rows_stmt
+from app.core import data_version, geohash, sync_log
+from app.core.config import settings
+from app import schemas
+from app.models.list import List
+from app.models.restaurant import Restaurant
 from app.models.save_event import UserRestaurant
+from app.models.sync import SyncEntityType, SyncOp
 from app.errors import ErrorMessages
 
 router = APIRouter()
 
+# Max geohash range scans used to prune a /clusters viewport
+CLUSTER_RANGE_SCANS = 16
+
+
+def _haversine_meters(latitude: float, longitude: float):
+    """SQL expression: great-circle distance from a point to each Restaurant, in meters."""
+    dlat = func.radians(Restaurant.latitude - latitude) * 0.5
+    dlng = func.radians(Restaurant.longitude - longitude) * 0.5
+    a = (
+        func.power(func.sin(dlat), 2)
+        + func.cos(func.radians(latitude)) * func.cos(func.radians(Restaurant.latitude)) * func.power(func.sin(dlng), 2)
+    )
+    # least() guards asin against rounding just past 1 for antipodal points
+    return 2 * geohash.EARTH_RADIUS_METERS * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def nearby_stmt(user_id: UUID, latitude: float, longitude: float, radius_m: float, limit: int):
+    """
+    Select a user's saved restaurants within radius_m of a point, nearest first, as
+    user_restaurant_rows_stmt() rows plus distance_m.
+
+    Candidates are narrowed in three steps, cheapest first: geohash prefix ranges
+    on ix_restaurants_geohash, then the lat/lng bounding box, then the exact
+    haversine distance. See benchmarks/nearby.py.
+    """
+    min_lat, max_lat, min_lng, max_lng = geohash.bounding_box(latitude, longitude, radius_m)
+    distance = _haversine_meters(latitude, longitude)
+    distance_m = distance.label("distance_m")
+
+    stmt = user_restaurant_rows_stmt(user_id).add_columns(distance_m)
+    prefixes = geohash.covering_prefixes(latitude, longitude, radius_m)
+    if prefixes:
+        stmt = stmt.where(or_(*[
+            and_(Restaurant.geohash >= prefix, Restaurant.geohash < geohash.prefix_upper_bound(prefix))
+            for prefix in prefixes
+        ]))
+    stmt = stmt.where(Restaurant.latitude.between(max(min_lat, -90.0), min(max_lat, 90.0)))
+    lng_ranges = geohash.longitude_ranges(min_lng, max_lng)
+    if lng_ranges:
+        stmt = stmt.where(or_(*[Restaurant.longitude.between(lo, hi) for lo, hi in lng_ranges]))
+    stmt = stmt.where(distance <= radius_m).order_by(distance_m, UserRestaurant.id).limit(limit)
+    return stmt
+
+
+@router.get("/nearby", response_model=schemas.NearbyResponse, responses=ENCODED_RESPONSES)
+async def get_nearby_restaurants(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(..., gt=0, le=settings.NEARBY_MAX_RADIUS_METERS, description="Meters"),
+    limit: int = Query(settings.NEARBY_LIMIT_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Any = Depends(deps.get_current_user),
+    encoding: Encoding = Depends(get_encoding),
+) -> Any:
+    """
+    The user's saved restaurants within `radius` meters of a point, nearest first.
+    """
+    result = await db.execute(nearby_stmt(current_user.id, lat, lng, radius, limit))
+    restaurants = []
+    for row in result.all():
+        item = user_restaurant_dict(row)
+        item["distance_m"] = row.distance_m
+        restaurants.append(item)
+    # Trusted rows: skip response_model validation (see app.api.projection)
+    return encoded_response({"restaurants": restaurants}, encoding)
+
+
+def _parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    """
+    Parse "min_lng,min_lat,max_lng,max_lat". min_lng > max_lng means the box
+    crosses the antimeridian.
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_INVALID_BBOX)
+    if not (
+        -90.0 <= min_lat <= max_lat <= 90.0
+        and -180.0 <= min_lng <= 180.0
+        and -180.0 <= max_lng <= 180.0
+    ):
+        raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_INVALID_BBOX)
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def clusters_stmt(user_id: UUID, bbox: tuple[float, float, float, float], precision: int):
+    """
+    Count a user's saved restaurants inside bbox per geohash cell of the given
+    precision, with each cell's centroid.
+    """
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if min_lng > max_lng:
+        max_lng += 360.0
+    cell = func.substr(Restaurant.geohash, 1, precision).label("geohash")
+    stmt = (
+        select(
+            cell,
+            func.count().label("count"),
+            func.avg(Restaurant.latitude).label("latitude"),
+            func.avg(Restaurant.longitude).label("longitude"),
+        )
+        .select_from(UserRestaurant)
+        .join(Restaurant, Restaurant.id == UserRestaurant.restaurant_id)
+        .where(UserRestaurant.user_id == user_id)
+        .where(Restaurant.latitude.between(min_lat, max_lat))
+    )
+    lng_ranges = geohash.longitude_ranges(min_lng, max_lng)
+    if lng_ranges:
+        stmt = stmt.where(or_(*[Restaurant.longitude.between(lo, hi) for lo, hi in lng_ranges]))
+        # Small viewports: a few index range scans instead of reading the whole library
+        prefixes = geohash.box_prefixes(min_lat, max_lat, lng_ranges, CLUSTER_RANGE_SCANS)
+        if prefixes and len(prefixes[0]) >= 3:
+            stmt = stmt.where(or_(*[
+                and_(Restaurant.geohash >= prefix, Restaurant.geohash < geohash.prefix_upper_bound(prefix))
+                for prefix in prefixes
+            ]))
+    return stmt.group_by(cell).order_by(cell)
+
+
+@router.get("/clusters", response_model=schemas.ClustersResponse, responses=ENCODED_RESPONSES)
+async def get_clusters(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    zoom: int = Query(..., ge=0, le=22, description="Web map zoom level"),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Any = Depends(deps.get_current_user),
+    encoding: Encoding = Depends(get_encoding),
+) -> Any:
+    """
+    Map clusters: the user's saved restaurants in the viewport grouped by geohash
+    cell, with counts and centroids.
+
+    The cell size follows the zoom level (about CLUSTER_CELL_PIXELS wide on screen)
+    and is coarsened until the viewport holds at most CLUSTER_MAX_CELLS cells, so the
+    response size depends on the viewport, not on how many restaurants are saved.
+    """
+    box = _parse_bbox(bbox)
+    min_lng, min_lat, max_lng, max_lat = box
+    lng_span = max_lng - min_lng if min_lng <= max_lng else max_lng + 360.0 - min_lng
+
+    precision = geohash.precision_for_zoom(zoom, settings.CLUSTER_CELL_PIXELS)
+    while precision > 1 and geohash.cells_in_box(max_lat - min_lat, lng_span, precision) > settings.CLUSTER_MAX_CELLS:
+        precision -= 1
+
+    result = await db.execute(clusters_stmt(current_user.id, box, precision))
+    clusters = [
+        {"geohash": row.geohash, "count": row.count, "latitude": row.latitude, "longitude": row.longitude}
+        for row in result.all()
+    ]
+    return encoded_response({"precision": precision, "clusters": clusters}, encoding)
+
+
 @router.delete("/{id}", status_code=204)
 async def delete_user_restaurant(
     id: UUID,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
 ) -> None:
     """
     Delete a saved restaurant.
     """
-    stmt = select(UserRestaurant).where(UserRestaurant.id == id).where(UserRestaurant.user_id == current_user.id)
+    deleted = (
+        delete(UserRestaurant)
+        .where(UserRestaurant.id == id)
+        .where(UserRestaurant.user_id == current_user.id)
+        .returning(UserRestaurant.id)
+        .cte("deleted")
+    )
+    stmt = sync_log.log_returned(
+        select(deleted.c.id), deleted, current_user.id, SyncEntityType.USER_RESTAURANT, SyncOp.DELETE
+    )
     result = await db.execute(stmt)
-    user_rest = result.scalar_one_or_none()
-    
-    if not user_rest:
+    deleted_id = result.scalar_one_or_none()
+
+    if not deleted_id:
         raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_RESTAURANT_NOT_SAVED)
-        
-    await db.delete(user_rest)
+
     await db.commit()
+    await data_version.bump(redis_client, current_user.id)
     return None
 
 
@@ -35,18 +206,167 @@ async def delete_user_restaurant(
 async def delete_user_restaurant_by_rid(
     restaurant_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
     current_user: Any = Depends(deps.get_current_user),
 ) -> None:
     """
     Delete a saved restaurant by restaurant_id.
     """
-    stmt = select(UserRestaurant).where(UserRestaurant.restaurant_id == restaurant_id).where(UserRestaurant.user_id == current_user.id)
+    deleted = (
+        delete(UserRestaurant)
+        .where(UserRestaurant.restaurant_id == restaurant_id)
+        .where(UserRestaurant.user_id == current_user.id)
+        .returning(UserRestaurant.id)
+        .cte("deleted")
+    )
+    stmt = sync_log.log_returned(
+        select(deleted.c.id), deleted, current_user.id, SyncEntityType.USER_RESTAURANT, SyncOp.DELETE
+    )
     result = await db.execute(stmt)
-    user_rest = result.scalar_one_or_none()
-    
-    if not user_rest:
+    deleted_id = result.scalar_one_or_none()
+
+    if not deleted_id:
         raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_RESTAURANT_NOT_SAVED)
-        
-    await db.delete(user_rest)
+
     await db.commit()
+    await data_version.bump(redis_client, current_user.id)
     return None
+
+
+# ----------------------------------------------------------------------------
+# Bulk operations: one set-based statement per request, results per restaurant id
+# ----------------------------------------------------------------------------
+
+def _bulk_ids(restaurant_ids: list[UUID]) -> list[UUID]:
+    # Preserve request order, ignore repeats
+    ids = list(dict.fromkeys(restaurant_ids))
+    if len(ids) > settings.BULK_MAX_IDS:
+        raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_TOO_MANY_IDS)
+    return ids
+
+
+async def _finish_bulk(
+    db: AsyncSession,
+    redis_client: Any,
+    current_user: Any,
+    ids: list[UUID],
+    changed: list[Any],
+    op: SyncOp,
+) -> dict:
+    """Log the changed rows for /sync, commit, and report ok / not_saved per id."""
+    if changed:
+        await sync_log.record_changes(db, current_user.id, [(SyncEntityType.USER_RESTAURANT, row.id, op) for row in changed])
+        await db.commit()
+        await data_version.bump(redis_client, current_user.id)
+
+    changed_ids = {row.restaurant_id for row in changed}
+    return {
+        "results": [
+            {"restaurant_id": rid, "status": "ok" if rid in changed_ids else "not_saved"}
+            for rid in ids
+        ]
+    }
+
+
+@router.post("/bulk/move", response_model=schemas.BulkResponse)
+async def bulk_move(
+    body: schemas.BulkMoveRequest,
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Move saved restaurants into a list, or to Unsorted with list_id null.
+
+    Like POST /lists/{id}/restaurants, the list ownership check is folded into the
+    UPDATE; a list the user doesn't own is a 404 and nothing moves.
+    """
+    ids = _bulk_ids(body.restaurant_ids)
+    if not ids:
+        return {"results": []}
+
+    stmt = (
+        update(UserRestaurant)
+        .where(UserRestaurant.user_id == current_user.id)
+        .where(UserRestaurant.restaurant_id.in_(ids))
+        .values(list_id=body.list_id, updated_at=datetime.utcnow())
+    )
+    if body.list_id is None:
+        result = await db.execute(
+            stmt.returning(UserRestaurant.id, UserRestaurant.restaurant_id).execution_options(synchronize_session=False)
+        )
+        changed = result.all()
+    else:
+        owned = select(List.id).where(List.id == body.list_id).where(List.user_id == current_user.id).cte("owned")
+        moved = (
+            stmt.where(exists(owned.select()))
+            .returning(UserRestaurant.id, UserRestaurant.restaurant_id)
+            .cte("moved")
+        )
+        result = await db.execute(
+            select(owned.c.id.label("owned_list_id"), moved.c.id, moved.c.restaurant_id)
+            .select_from(owned)
+            .outerjoin(moved, true())
+        )
+        rows = result.all()
+        if not rows:
+            raise HTTPException(status_code=404, detail=ErrorMessages.RESOURCE_LIST_NOT_FOUND)
+        changed = [row for row in rows if row.id is not None]
+
+    return await _finish_bulk(db, redis_client, current_user, ids, changed, SyncOp.UPSERT)
+
+
+@router.post("/bulk/flags", response_model=schemas.BulkResponse)
+async def bulk_set_flags(
+    body: schemas.BulkFlagsRequest,
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Set is_favorite and/or is_visited to explicit values on many saved restaurants.
+
+    Explicit values (not toggles) make retries safe.
+    """
+    values = body.model_dump(include={"is_favorite", "is_visited"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail=ErrorMessages.VALIDATION_REQUIRED_FIELD)
+    ids = _bulk_ids(body.restaurant_ids)
+    if not ids:
+        return {"results": []}
+
+    stmt = (
+        update(UserRestaurant)
+        .where(UserRestaurant.user_id == current_user.id)
+        .where(UserRestaurant.restaurant_id.in_(ids))
+        .values(**values, updated_at=datetime.utcnow())
+        .returning(UserRestaurant.id, UserRestaurant.restaurant_id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return await _finish_bulk(db, redis_client, current_user, ids, result.all(), SyncOp.UPSERT)
+
+
+@router.post("/bulk/delete", response_model=schemas.BulkResponse)
+async def bulk_delete(
+    body: schemas.BulkRestaurantIdsRequest,
+    db: AsyncSession = Depends(deps.get_db),
+    redis_client: Any = Depends(deps.get_redis),
+    current_user: Any = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Delete many saved restaurants by restaurant_id.
+    """
+    ids = _bulk_ids(body.restaurant_ids)
+    if not ids:
+        return {"results": []}
+
+    stmt = (
+        delete(UserRestaurant)
+        .where(UserRestaurant.user_id == current_user.id)
+        .where(UserRestaurant.restaurant_id.in_(ids))
+        .returning(UserRestaurant.id, UserRestaurant.restaurant_id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return await _finish_bulk(db, redis_client, current_user, ids, result.all(), SyncOp.DELETE)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, save_events, data, lists, user_restaurants, restaurants
+from app.api.v1.endpoints import auth, save_events, data, lists, user_restaurants, restaurants, sync, search
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -8,3 +8,5 @@ api_router.include_router(data.router, tags=["data"])
 api_router.include_router(lists.router, prefix="/lists", tags=["lists"])
 api_router.include_router(user_restaurants.router, prefix="/user-restaurants", tags=["user-restaurants"])
 api_router.include_router(restaurants.router, prefix="/restaurants", tags=["restaurants"])
+api_router.include_router(sync.router, tags=["sync"])
+api_router.include_router(search.router, tags=["search"])
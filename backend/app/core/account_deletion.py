@@ -0,0 +1,159 @@
+"""
+Account Deletion
+
+Every table holding a user's rows references users ON DELETE CASCADE (see the
+add_cascade_delete_behavior migration), so one DELETE FROM users removes an
+account. For a heavy user that single statement deletes millions of rows in one
+transaction: it holds the row locks and the users row lock throughout, keeps a
+snapshot open that blocks vacuum, and writes all of its WAL in one burst.
+
+DELETE /account instead detaches the account from its Clerk identity and enqueues
+the worker's delete_account task, which calls run_deletion():
+
+    1. delete the user's rows from each table in STEPS order, at most
+       ACCOUNT_DELETE_BATCH_ROWS per transaction, sleeping
+       ACCOUNT_DELETE_PAUSE_SECONDS between batches
+    2. DELETE FROM users, whose cascade now finds (almost) nothing
+    3. remove the user's account exports from the export store
+
+STEPS order matters: user_restaurants go before notes (a note delete refreshes the
+user_restaurant's search document), and before save_events and lists, which they
+reference (RESTRICT / SET NULL). An extract_info job already in flight can still
+save a restaurant after that step, so user_restaurants are deleted again right
+before save_events; anything else written while the job runs is removed by the
+final cascade. Every step is idempotent, so a failed run is retried from the
+start (ACCOUNT_DELETE_MAX_RETRIES, with exponential backoff from
+ACCOUNT_DELETE_RETRY_SECONDS) and picks up where it failed.
+
+Progress is a Redis hash at account_deletion:{user_id}, kept
+ACCOUNT_DELETE_TTL_SECONDS and shown by GET /account/deletion/{user_id}:
+
+    clerk_user_id  the identity that requested it, checked before it is shown
+    status         pending | running | retrying | complete | failed
+    table          the table being deleted from
+    rows           rows deleted so far (by the current attempt)
+    error          empty string when unset
+
+As in app.core.status_cache, Redis errors are logged and swallowed.
+
+See benchmarks/account_deletion.py for lock durations against the single cascade.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+
+from app.core import account_export
+from app.core.config import settings
+from app.models.list import List
+from app.models.note import Note
+from app.models.save_event import SaveEvent, UserRestaurant
+from app.models.sync import SyncChange
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# (model, owner column); each has an index leading with the owner column
+STEPS = [
+    (UserRestaurant, UserRestaurant.user_id),
+    (Note, Note.user_id),
+    # Again: saved by an extract_info job in flight since; would RESTRICT save_events
+    (UserRestaurant, UserRestaurant.user_id),
+    (SaveEvent, SaveEvent.user_id),
+    (List, List.user_id),
+    (SyncChange, SyncChange.user_id),
+]
+
+
+def batch_delete_stmt(model: Any, owner: Any, user_id: UUID, limit: int):
+    """Delete up to `limit` of user_id's rows from model's table."""
+    batch = select(model.id).where(owner == user_id).limit(limit)
+    return delete(model).where(model.id.in_(batch.scalar_subquery()))
+
+
+def run_deletion(
+    engine: Engine,
+    user_id: UUID,
+    progress: Callable[[str, int], None] = lambda table, rows: None,
+) -> int:
+    """
+    Delete user_id's account in bounded batches, calling progress(table, rows_so_far)
+    after every batch. Returns the number of rows deleted.
+    """
+    limit = settings.ACCOUNT_DELETE_BATCH_ROWS
+    deleted = 0
+    for model, owner in STEPS:
+        table = model.__tablename__
+        while True:
+            with engine.begin() as conn:
+                count = conn.execute(batch_delete_stmt(model, owner, user_id, limit)).rowcount
+            deleted += count
+            progress(table, deleted)
+            if count < limit:
+                break
+            time.sleep(settings.ACCOUNT_DELETE_PAUSE_SECONDS)
+
+    # Cascades to sync_sequences and anything written since its table was emptied
+    with engine.begin() as conn:
+        deleted += conn.execute(delete(User).where(User.id == user_id)).rowcount
+    progress(User.__tablename__, deleted)
+
+    # An export still running now publishes after this; the sweep removes it
+    account_export.get_store().delete_user(user_id)
+    return deleted
+
+
+# ----------------------------------------------------------------------------
+# Progress
+# ----------------------------------------------------------------------------
+
+def _key(user_id: Any) -> str:
+    return f"account_deletion:{user_id}"
+
+
+async def create_job(client: aioredis.Redis, user_id: Any, clerk_user_id: str) -> None:
+    """Record a PENDING deletion from the API before the task is enqueued."""
+    key = _key(user_id)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping={
+            "clerk_user_id": clerk_user_id,
+            "status": "pending",
+            "table": "",
+            "rows": 0,
+            "error": "",
+        })
+        pipe.expire(key, settings.ACCOUNT_DELETE_TTL_SECONDS)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to record account deletion {user_id}: {e}")
+
+
+async def read_job(client: aioredis.Redis, user_id: Any, clerk_user_id: str) -> Optional[dict]:
+    """A deletion's state if it exists and was requested by clerk_user_id, else None."""
+    try:
+        job = await client.hgetall(_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read account deletion {user_id}: {e}")
+        return None
+    if not job or job.get("clerk_user_id") != clerk_user_id:
+        return None
+    return job
+
+
+def update_job(client: redis.Redis, user_id: Any, **fields: Any) -> None:
+    """Record a deletion's state from the (synchronous) worker."""
+    key = _key(user_id)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, settings.ACCOUNT_DELETE_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to update account deletion {user_id}: {e}")
@@ -0,0 +1,314 @@
+"""
+Account Export
+
+Data-portability dumps of everything a user owns: their users row, lists,
+user_restaurants (with each restaurant's name and location), notes and
+save_events. POST /account/export records a job and enqueues the worker's
+export_account task, which calls run_export().
+
+Export formats:
+
+    ndjson  one file, one line per row: {"table": "lists", "row": {...}}
+    zip     one NDJSON member per table (lists.ndjson, ...), rows only
+
+Every table is read in keyset order (TABLES), ACCOUNT_EXPORT_PAGE_ROWS rows per
+page, each page in its own short read transaction on a server-side cursor that
+fetches EXPORT_BATCH_ROWS at a time. Rows are written as they arrive, so memory
+stays constant however many rows a user has, and the export never holds a
+transaction (or the snapshot that pins vacuum) open on the primary for longer than
+one page. The dump is therefore not a single snapshot: a row written while the
+export runs may or may not be included, but no row is exported twice.
+
+Files are written to an ExportStore (a local directory standing in for an object
+store) under a temporary name and published atomically when complete. They hold
+personal data, so they are kept no longer than their job: the worker's
+sweep_exports task (run by Celery beat every ACCOUNT_EXPORT_SWEEP_SECONDS) removes
+files older than ACCOUNT_EXPORT_TTL_SECONDS, by which time their job has expired
+and they can no longer be downloaded. Deleting an account removes its exports
+at once.
+
+Job state is a Redis hash at account_export:{id}, kept ACCOUNT_EXPORT_TTL_SECONDS:
+
+    user_id   owner, checked before the job is shown
+    format    ndjson | zip
+    status    pending | running | complete | failed
+    table     the table being exported
+    rows      rows written so far
+    error     empty string when unset
+
+As in app.core.status_cache, Redis errors are logged and swallowed; the worker
+reports progress after every batch.
+"""
+
+import logging
+import os
+import shutil
+import time
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+from uuid import UUID
+
+import orjson
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import Column, select
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.models.list import List
+from app.models.note import Note
+from app.models.restaurant import Restaurant
+from app.models.save_event import SaveEvent, UserRestaurant
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    ZIP = "zip"
+
+
+class ExportStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+
+MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.ZIP: "application/zip"}
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    name: str
+    columns: tuple
+    owner: Column
+    # Unique per user and leading an index after `owner`, so each page is one
+    # index range scan
+    key: Column
+    join: Optional[tuple] = None
+
+
+TABLES = [
+    ExportTable(
+        "users",
+        tuple(c for c in User.__table__.c if c.name != "hashed_password"),
+        owner=User.id,
+        key=User.id,
+    ),
+    ExportTable("lists", tuple(List.__table__.c), owner=List.user_id, key=List.id),
+    # (user_id, restaurant_id) is unique on both of these
+    ExportTable(
+        "user_restaurants",
+        tuple(UserRestaurant.__table__.c) + (
+            Restaurant.name.label("restaurant_name"),
+            Restaurant.city.label("restaurant_city"),
+            Restaurant.latitude.label("restaurant_latitude"),
+            Restaurant.longitude.label("restaurant_longitude"),
+            Restaurant.google_place_id.label("restaurant_google_place_id"),
+        ),
+        owner=UserRestaurant.user_id,
+        key=UserRestaurant.restaurant_id,
+        join=(Restaurant, Restaurant.id == UserRestaurant.restaurant_id),
+    ),
+    ExportTable("notes", tuple(Note.__table__.c), owner=Note.user_id, key=Note.restaurant_id),
+    # ix_save_events_user_id_id
+    ExportTable("save_events", tuple(SaveEvent.__table__.c), owner=SaveEvent.user_id, key=SaveEvent.id),
+]
+
+
+def page_stmt(table: ExportTable, user_id: UUID, after: Any = None, limit: Optional[int] = None):
+    """The next page of a table's rows for user_id, after key value `after`."""
+    stmt = select(*table.columns)
+    if table.join is not None:
+        stmt = stmt.join(*table.join)
+    stmt = stmt.where(table.owner == user_id)
+    if after is not None:
+        stmt = stmt.where(table.key > after)
+    return stmt.order_by(table.key).limit(limit or settings.ACCOUNT_EXPORT_PAGE_ROWS)
+
+
+def iter_rows(engine: Engine, table: ExportTable, user_id: UUID) -> Iterator[list[dict]]:
+    """
+    Yield a table's rows for user_id as batches of dicts, one short transaction
+    per page.
+    """
+    after = None
+    while True:
+        with engine.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True, yield_per=settings.EXPORT_BATCH_ROWS
+            ).execute(page_stmt(table, user_id, after))
+            count = 0
+            for rows in result.partitions():
+                batch = [dict(row._mapping) for row in rows]
+                count += len(batch)
+                after = batch[-1][table.key.name]
+                yield batch
+        if count < settings.ACCOUNT_EXPORT_PAGE_ROWS:
+            return
+
+
+def run_export(
+    engine: Engine,
+    user_id: UUID,
+    fmt: ExportFormat,
+    out: BinaryIO,
+    progress: Callable[[str, int], None] = lambda table, rows: None,
+) -> int:
+    """
+    Write user_id's data to `out` in `fmt`, calling progress(table, rows_so_far)
+    after every batch. Returns the number of rows written.
+    """
+    written = 0
+    archive = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) if fmt == ExportFormat.ZIP else None
+    try:
+        for table in TABLES:
+            progress(table.name, written)
+            if archive is not None:
+                member = archive.open(f"{table.name}.ndjson", "w", force_zip64=True)
+                prefix = b""
+            else:
+                member = out
+                prefix = b'{"table":"' + table.name.encode() + b'","row":'
+            try:
+                for batch in iter_rows(engine, table, user_id):
+                    if archive is not None:
+                        member.write(b"".join(orjson.dumps(row) + b"\n" for row in batch))
+                    else:
+                        member.write(b"".join(prefix + orjson.dumps(row) + b"}\n" for row in batch))
+                    written += len(batch)
+                    progress(table.name, written)
+            finally:
+                if archive is not None:
+                    member.close()
+    finally:
+        if archive is not None:
+            archive.close()
+    return written
+
+
+# ----------------------------------------------------------------------------
+# Storage
+# ----------------------------------------------------------------------------
+
+class ExportStore:
+    """
+    A directory standing in for an object store bucket. Objects are written under a
+    temporary name and renamed into place when complete, so readers never see a
+    partial export.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[BinaryIO]:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.part"
+        try:
+            with open(partial, "wb") as f:
+                yield f
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+
+    def sweep(self, max_age_seconds: float) -> int:
+        """
+        Remove objects (and abandoned partial writes) last written more than
+        max_age_seconds ago, and the directories they leave empty. Returns the
+        number of files removed.
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for directory, _, files in os.walk(self.root, topdown=False):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+            if directory != self.root:
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass  # not empty
+        return removed
+
+    def delete_user(self, user_id: Any) -> None:
+        """Remove every object of a user (object_key puts them under one prefix)."""
+        shutil.rmtree(self.path(str(user_id)), ignore_errors=True)
+
+
+def get_store() -> ExportStore:
+    return ExportStore(settings.ACCOUNT_EXPORT_DIR)
+
+
+def object_key(user_id: Any, export_id: Any, fmt: ExportFormat) -> str:
+    return f"{user_id}/{export_id}.{'ndjson' if fmt == ExportFormat.NDJSON else 'zip'}"
+
+
+# ----------------------------------------------------------------------------
+# Job state
+# ----------------------------------------------------------------------------
+
+def _key(export_id: Any) -> str:
+    return f"account_export:{export_id}"
+
+
+async def create_job(client: aioredis.Redis, export_id: Any, user_id: Any, fmt: ExportFormat) -> None:
+    """Record a new PENDING job from the API before the task is enqueued."""
+    key = _key(export_id)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping={
+            "user_id": str(user_id),
+            "format": fmt.value,
+            "status": ExportStatus.PENDING.value,
+            "table": "",
+            "rows": 0,
+            "error": "",
+        })
+        pipe.expire(key, settings.ACCOUNT_EXPORT_TTL_SECONDS)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to record account export {export_id}: {e}")
+
+
+def update_job(client: redis.Redis, export_id: Any, **fields: Any) -> None:
+    """Update a job's state from the (synchronous) worker."""
+    key = _key(export_id)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping={name: value.value if isinstance(value, Enum) else value for name, value in fields.items()})
+        pipe.expire(key, settings.ACCOUNT_EXPORT_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to update account export {export_id}: {e}")
+
+
+async def read_job(client: aioredis.Redis, export_id: Any, user_id: Any) -> Optional[dict]:
+    """A job's state if it exists and belongs to user_id, else None."""
+    try:
+        job = await client.hgetall(_key(export_id))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read account export {export_id}: {e}")
+        return None
+    if not job or job.get("user_id") != str(user_id):
+        return None
+    return job
@@ -0,0 +1,181 @@
+"""
+Admission Control
+
+The building blocks behind app.api.admission.AdmissionMiddleware and the rate
+limit in deps.get_current_user, which turn requests away early (429 / 503 with
+Retry-After) instead of letting them queue until they time out:
+
+    token buckets        per-user request rate: InMemoryTokenBucket (per process)
+                         or RedisTokenBucket (shared by every API process)
+    ConcurrencyLimiter   requests in flight per route class, per process
+    pool_wait            recent database pool checkout waits (app.db.base feeds it)
+    extraction queue     Celery backlog of extract_info jobs, read with LLEN
+
+Every check fails open: if Redis is unreachable, requests are admitted as if the
+limit had not been reached, and the failure is logged.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Optional, Protocol
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket(Protocol):
+    async def take(self, key: str) -> Optional[float]:
+        """Spend one token from key's bucket. None if admitted, else seconds until a token is available."""
+
+
+class InMemoryTokenBucket:
+    """Buckets in this process only; N API processes admit up to N times the rate."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        # key -> (tokens, updated_at). An idle bucket is full again after burst / rate
+        # seconds, so it can be forgotten then.
+        self._buckets = TTLCache(maxsize=max_keys, ttl_seconds=burst / rate)
+        self._lock = threading.Lock()
+
+    async def take(self, key: str) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key) or (self.burst, now)
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens < 1:
+                self._buckets.set(key, (tokens, now))
+                return (1 - tokens) / self.rate
+            self._buckets.set(key, (tokens - 1, now))
+            return None
+
+
+# KEYS[1] bucket hash; ARGV rate, burst. Uses the Redis clock so API hosts with
+# skewed clocks share one consistent bucket.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """Buckets shared by every API process, updated atomically by a Lua script."""
+
+    def __init__(self, client: aioredis.Redis, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._script = client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str) -> Optional[float]:
+        try:
+            wait = float(await self._script(keys=[f"rate_limit:{key}"], args=[self.rate, self.burst]))
+        except redis.RedisError as e:
+            logger.warning(f"Rate limit check failed for {key}: {e}")
+            return None
+        return wait or None
+
+
+class ConcurrencyLimiter:
+    """Admit at most `limit` requests of one route class at a time; never queue."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+class WaitTracker:
+    """Mean of the waits observed in the last window_seconds (0 when there were none)."""
+
+    def __init__(self, window_seconds: float, max_samples: int = 1000):
+        self.window_seconds = window_seconds
+        self._samples: deque = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def observe(self, wait_ms: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), wait_ms))
+
+    def mean_ms(self) -> float:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            if not self._samples:
+                return 0.0
+            return sum(wait for _, wait in self._samples) / len(self._samples)
+
+
+# Fed by the database pool (see app.db.base). Because old samples age out, shedding
+# stops by itself once new checkouts are fast again.
+pool_wait = WaitTracker(window_seconds=settings.ADMISSION_POOL_WAIT_WINDOW_SECONDS)
+
+
+class QueueDepth:
+    """Length of a Celery queue on the Redis broker, re-read at most every max_age_seconds."""
+
+    def __init__(self, queue: str, max_age_seconds: float):
+        self.queue = queue
+        self.max_age_seconds = max_age_seconds
+        self._depth = 0
+        self._read_at = float("-inf")
+
+    async def get(self, client: aioredis.Redis) -> int:
+        now = time.monotonic()
+        if now - self._read_at >= self.max_age_seconds:
+            # Set first so concurrent requests don't all issue the LLEN
+            self._read_at = now
+            try:
+                self._depth = await client.llen(self.queue)
+            except redis.RedisError as e:
+                logger.warning(f"Failed to read the depth of queue {self.queue}: {e}")
+                self._depth = 0
+        return self._depth
+
+
+# extract_info jobs go to Celery's default queue
+extraction_queue = QueueDepth("celery", max_age_seconds=settings.ADMISSION_QUEUE_CHECK_SECONDS)
+
+
+def make_token_bucket(client: Any) -> TokenBucket:
+    """The per-user token bucket for settings.RATE_LIMIT_BACKEND ("memory" or "redis")."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucket(client, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+    return InMemoryTokenBucket(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+
+
+def retry_after_header(seconds: float) -> str:
+    """A Retry-After value: whole seconds, at least 1."""
+    return str(max(1, math.ceil(seconds)))
@@ -8,6 +8,120 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: str = "redis://localhost:6379/0"
     ENVIRONMENT: str = "development"
+
+    # Save event status cache (see app/core/status_cache.py)
+    SAVE_EVENT_STATUS_TTL_SECONDS: int = 300  # after COMPLETE / FAILED
+    SAVE_EVENT_STATUS_INFLIGHT_TTL_SECONDS: int = 900  # safety net for PENDING / PROCESSING
+    SAVE_EVENT_STATUS_BATCH_LIMIT: int = 100
+
+    # Max restaurant ids per /user-restaurants/bulk/* request
+    BULK_MAX_IDS: int = 500
+
+    # Keyset pagination for restaurant collections (see app/api/pagination.py)
+    # PAGE_SIZE_DEFAULT=None keeps collections unpaginated unless the client sends ?limit=
+    PAGE_SIZE_DEFAULT: Optional[int] = None
+    PAGE_SIZE_MAX: int = 200
+
+    # GET /user-restaurants/nearby (see app/core/geohash.py)
+    NEARBY_MAX_RADIUS_METERS: int = 50000
+    NEARBY_LIMIT_DEFAULT: int = 50
+
+    # GET /user-restaurants/clusters: target cluster cell width on screen, and a cap
+    # on cells per viewport (precision is coarsened until the viewport fits)
+    CLUSTER_CELL_PIXELS: int = 64
+    CLUSTER_MAX_CELLS: int = 1024
+
+    # GET /search (see app/api/v1/endpoints/search.py)
+    SEARCH_LIMIT_DEFAULT: int = 20
+    # Typo-tolerant fallback on restaurant names; also needs the pg_trgm extension
+    SEARCH_FUZZY: bool = True
+
+    # GET /search/autocomplete: per-process cache of each user's names, kept only
+    # for libraries up to AUTOCOMPLETE_INDEX_MAX_NAMES (bigger ones query the indexes,
+    # and any write reloads the whole library). The cache holds at most
+    # AUTOCOMPLETE_CACHE_MAX_NAMES names in all, least recently used evicted first
+    # (about 0.4 KB each, so ~80 MB per process at the default)
+    AUTOCOMPLETE_LIMIT_DEFAULT: int = 8
+    AUTOCOMPLETE_LIMIT_MAX: int = 50
+    AUTOCOMPLETE_CACHE_SIZE: int = 1000
+    AUTOCOMPLETE_CACHE_MAX_NAMES: int = 200000
+    AUTOCOMPLETE_CACHE_TTL_SECONDS: int = 600
+    AUTOCOMPLETE_INDEX_MAX_NAMES: int = 3000
+
+    # GET /restaurants/{id}: read-through cache tiers (see app/core/restaurant_cache.py)
+    # and how long clients and shared caches may reuse a response without revalidating
+    RESTAURANT_CACHE_SIZE: int = 10000
+    RESTAURANT_CACHE_LOCAL_TTL_SECONDS: int = 30
+    RESTAURANT_CACHE_TTL_SECONDS: int = 3600
+    RESTAURANT_MAX_AGE_SECONDS: int = 300
+    # Max ids per GET /restaurants?ids= or POST /restaurants/batch
+    RESTAURANT_BATCH_MAX_IDS: int = 300
+
+    # GET /lists/{id}/export: rows fetched from the server-side cursor (and encoded
+    # into one response chunk) at a time (see app/api/export.py)
+    EXPORT_BATCH_ROWS: int = 500
+
+    # Account data exports (see app/core/account_export.py). ACCOUNT_EXPORT_DIR stands
+    # in for the object store bucket; each keyset page is one short read transaction.
+    # Files are swept once older than the job TTL
+    ACCOUNT_EXPORT_DIR: str = "exports"
+    ACCOUNT_EXPORT_PAGE_ROWS: int = 5000
+    ACCOUNT_EXPORT_TTL_SECONDS: int = 86400
+    ACCOUNT_EXPORT_SWEEP_SECONDS: int = 3600
+
+    # Sync change log retention (see app/core/sync_log.py): clients that last synced
+    # before the retention window get a full snapshot
+    SYNC_CHANGE_RETENTION_DAYS: int = 30
+    SYNC_CHANGE_PRUNE_BATCH_ROWS: int = 5000
+    SYNC_CHANGE_PRUNE_SECONDS: int = 3600
+
+    # Batched account deletion (see app/core/account_deletion.py)
+    ACCOUNT_DELETE_BATCH_ROWS: int = 1000
+    ACCOUNT_DELETE_PAUSE_SECONDS: float = 0.05
+    ACCOUNT_DELETE_TTL_SECONDS: int = 86400
+    ACCOUNT_DELETE_MAX_RETRIES: int = 5
+    ACCOUNT_DELETE_RETRY_SECONDS: int = 30
+
+    # Admission control and load shedding (see app/api/admission.py). The per-user
+    # token bucket lives in this process ("memory") or is shared ("redis"); the
+    # concurrency limits are per process
+    ADMISSION_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_PER_SECOND: float = 10
+    RATE_LIMIT_BURST: int = 50
+    ADMISSION_MAX_CONCURRENT_READS: int = 200
+    ADMISSION_MAX_CONCURRENT_WRITES: int = 50
+    ADMISSION_MAX_CONCURRENT_SAVES: int = 20
+    ADMISSION_MAX_CONCURRENT_EXPORTS: int = 4
+    # Extraction jobs waiting in Celery before saves are shed (queue length is
+    # re-read at most every ADMISSION_QUEUE_CHECK_SECONDS)
+    ADMISSION_MAX_QUEUE_DEPTH: int = 1000
+    ADMISSION_QUEUE_CHECK_SECONDS: float = 1.0
+    # Mean pool checkout wait over the window before API requests are shed
+    ADMISSION_MAX_POOL_WAIT_MS: float = 250
+    ADMISSION_POOL_WAIT_WINDOW_SECONDS: float = 5.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # GET /metrics re-counts SaveEvents by status at most this often (shared by
+    # every API process through Redis)
+    METRICS_STATUS_COUNTS_TTL_SECONDS: int = 15
+    # GET /metrics is served only to clients in these networks (comma-separated
+    # CIDRs) and, when METRICS_TOKEN is set, only with Authorization: Bearer <token>.
+    # Behind a reverse proxy every client looks internal: set the token.
+    METRICS_ALLOWED_NETWORKS: str = "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    METRICS_TOKEN: str = ""
+
+    # Restaurants previewed per list in list summaries
+    LIST_PREVIEW_COUNT: int = 3
+
+    # Per-user data version behind the /home ETag (see app/core/data_version.py)
+    USER_DATA_VERSION_TTL_SECONDS: int = 3600
+
+    # Per-process cache of authenticated users (see app/api/deps.py)
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    # Reconnect delay for the cross-process invalidation listener (app/core/user_invalidation.py)
+    AUTH_USER_INVALIDATION_RETRY_SECONDS: float = 1.0
     
     # Clerk Authentication - Set these in your .env file
     CLERK_JWKS_URL: str = ""  # e.g. https://your-instance.clerk.accounts.dev/.well-known/jwks.json
@@ -0,0 +1,75 @@
+"""
+Per-User Data Version
+
+Every mutation of a user's lists, saved restaurants, flags or notes bumps a counter
+in Redis at user_data_version:{user_id} after it commits. GET /home turns the counter
+into an ETag, so a client polling with If-None-Match gets a 304 from one Redis GET
+instead of re-running the home queries.
+
+The counter is seeded from the current time in milliseconds whenever the key is
+missing, so values keep increasing even after the key expires or Redis restarts
+(as long as a user makes fewer than one change per millisecond). The key TTL also
+bounds how long a failed bump can leave a stale ETag in place.
+
+Redis failures never fail a request: reads return None (no ETag, full response) and
+bumps are logged and skipped.
+"""
+
+import logging
+import time
+from typing import Any, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _key(user_id: Any) -> str:
+    return f"user_data_version:{user_id}"
+
+
+def _seed() -> int:
+    return int(time.time() * 1000)
+
+
+async def get_version(client: aioredis.Redis, user_id: Any) -> Optional[int]:
+    """Current data version for a user, or None if Redis is unavailable."""
+    key = _key(user_id)
+    try:
+        value = await client.get(key)
+        if value is None:
+            await client.set(key, _seed(), nx=True, ex=settings.USER_DATA_VERSION_TTL_SECONDS)
+            value = await client.get(key)
+        return int(value) if value is not None else None
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read data version for user {user_id}: {e}")
+        return None
+
+
+async def bump(client: aioredis.Redis, user_id: Any) -> None:
+    """Advance a user's data version. Call after the mutation has committed."""
+    key = _key(user_id)
+    try:
+        pipe = client.pipeline()
+        pipe.set(key, _seed(), nx=True)
+        pipe.incr(key)
+        pipe.expire(key, settings.USER_DATA_VERSION_TTL_SECONDS)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to bump data version for user {user_id}: {e}")
+
+
+def bump_sync(client: redis.Redis, user_id: Any) -> None:
+    """bump() for the synchronous Celery worker."""
+    key = _key(user_id)
+    try:
+        pipe = client.pipeline()
+        pipe.set(key, _seed(), nx=True)
+        pipe.incr(key)
+        pipe.expire(key, settings.USER_DATA_VERSION_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to bump data version for user {user_id}: {e}")
@@ -0,0 +1,187 @@
+"""
+Geohash
+
+restaurants.geohash is a 12-character geohash computed by Postgres from latitude and
+longitude (the geohash_encode() SQL function, see the add_restaurants_geohash
+migration). Every prefix of a geohash names the cell containing the point at that
+precision, and cells sharing a prefix are contiguous in the btree index, so "which
+restaurants are in these cells" is a handful of index range scans.
+
+encode() here must stay bit-for-bit identical to geohash_encode() in SQL: the
+nearby and cluster queries compute prefixes in Python and match them against the
+stored column.
+"""
+
+import math
+
+ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+MAX_PRECISION = 12
+
+# The sphere the haversine distance filter uses; boxes must be computed on the same one
+EARTH_RADIUS_METERS = 6_371_000.0
+METERS_PER_DEGREE_LAT = EARTH_RADIUS_METERS * math.pi / 180.0
+
+
+def encode(latitude: float, longitude: float, precision: int = MAX_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    ch = 0
+    bit = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if longitude >= mid:
+                ch = ch * 2 + 1
+                lng_lo = mid
+            else:
+                ch = ch * 2
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                ch = ch * 2 + 1
+                lat_lo = mid
+            else:
+                ch = ch * 2
+                lat_hi = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(ALPHABET[ch])
+            bit = 0
+            ch = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(height in degrees latitude, width in degrees longitude) of a cell."""
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _wrap_longitude(longitude: float) -> float:
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def bounding_box(latitude: float, longitude: float, radius_m: float) -> tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lng, max_lng) around a circle.
+
+    Exact on the EARTH_RADIUS_METERS sphere: the circle's widest longitude is at its
+    tangent meridians, poleward of the center, not at the center's latitude.
+
+    The box is not clamped: latitudes may pass +-90 (the circle contains a pole) and
+    longitudes may pass +-180 (it crosses the antimeridian); callers check for that.
+    """
+    angle = radius_m / EARTH_RADIUS_METERS
+    dlat = math.degrees(angle)
+    sin_angle = math.sin(angle)
+    cos_lat = math.cos(math.radians(latitude))
+    if angle >= math.pi / 2 or sin_angle >= cos_lat:
+        dlng = 360.0  # the circle contains a pole, so spans every longitude
+    else:
+        dlng = math.degrees(math.asin(sin_angle / cos_lat))
+    return latitude - dlat, latitude + dlat, longitude - dlng, longitude + dlng
+
+
+def covering_prefixes(latitude: float, longitude: float, radius_m: float) -> list[str]:
+    """
+    Geohash prefixes whose cells together cover the circle around a point.
+
+    Picks the finest precision whose cells are at least radius_m tall and wide, so
+    the point's cell and its 8 neighbours contain the whole circle. Returns [] when
+    the circle is too large for any precision or contains a pole (search everything).
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_m)
+    if min_lat < -90.0 or max_lat > 90.0:
+        return []
+    dlat, dlng = max_lat - latitude, max_lng - longitude
+
+    precision = 0
+    for candidate in range(1, MAX_PRECISION + 1):
+        height, width = cell_size(candidate)
+        if height < dlat or width < dlng:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+
+    height, width = cell_size(precision)
+    prefixes = set()
+    for dy in (-1, 0, 1):
+        cell_lat = latitude + dy * height
+        if not -90.0 <= cell_lat <= 90.0:
+            continue
+        for dx in (-1, 0, 1):
+            prefixes.add(encode(cell_lat, _wrap_longitude(longitude + dx * width), precision))
+    return sorted(prefixes)
+
+
+def longitude_ranges(min_lng: float, max_lng: float) -> list[tuple[float, float]]:
+    """
+    Split a bounding box's longitude span at the antimeridian.
+
+    Returns [] when the span covers every longitude (no pruning possible).
+    """
+    if max_lng - min_lng >= 360.0:
+        return []
+    if min_lng < -180.0:
+        return [(min_lng + 360.0, 180.0), (-180.0, max_lng)]
+    if max_lng > 180.0:
+        return [(min_lng, 180.0), (-180.0, max_lng - 360.0)]
+    return [(min_lng, max_lng)]
+
+
+def precision_for_zoom(zoom: int, cell_pixels: int) -> int:
+    """
+    Finest precision whose cells are at least cell_pixels wide on a web map tile
+    (256 px spanning 360 / 2**zoom degrees of longitude).
+    """
+    target_width = 360.0 / 2 ** zoom * cell_pixels / 256.0
+    precision = 1
+    for candidate in range(2, MAX_PRECISION + 1):
+        if cell_size(candidate)[1] < target_width:
+            break
+        precision = candidate
+    return precision
+
+
+def cells_in_box(lat_span: float, lng_span: float, precision: int) -> int:
+    """Upper bound on how many cells of a precision overlap a box of these spans (degrees)."""
+    height, width = cell_size(precision)
+    return (math.ceil(lat_span / height) + 1) * (math.ceil(lng_span / width) + 1)
+
+
+def box_prefixes(min_lat: float, max_lat: float, lng_ranges: list[tuple[float, float]], max_cells: int) -> list[str]:
+    """
+    Geohash prefixes whose cells together cover a box, using the finest precision
+    that needs at most max_cells cells. Returns [] when even precision 1 needs more.
+    """
+    lng_span = sum(hi - lo for lo, hi in lng_ranges)
+    precision = 0
+    for candidate in range(1, MAX_PRECISION + 1):
+        if cells_in_box(max_lat - min_lat, lng_span, candidate) > max_cells:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+
+    height, width = cell_size(precision)
+    lats = [min_lat + k * height for k in range(math.ceil((max_lat - min_lat) / height))] + [max_lat]
+    prefixes = set()
+    for lo, hi in lng_ranges:
+        lngs = [lo + k * width for k in range(math.ceil((hi - lo) / width))] + [hi]
+        for lat in lats:
+            for lng in lngs:
+                prefixes.add(encode(lat, lng, precision))
+    return sorted(prefixes)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Exclusive upper bound for `geohash >= prefix` range scans (C collation)."""
+    # '~' sorts after every geohash character in byte order
+    return prefix + "~"
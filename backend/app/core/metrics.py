@@ -0,0 +1,128 @@
+"""
+Metrics
+
+Prometheus metrics, served in the text exposition format at GET /metrics:
+
+    http_request_duration_seconds     histogram by method, route template and status
+                                      (app.api.metrics.MetricsMiddleware)
+    db_pool_checkout_wait_seconds     histogram of database pool checkout waits
+    db_pool_connections_in_use        connections checked out of the pool
+    auth_user_cache_requests_total    deps.user_cache lookups by result (hit | miss)
+    celery_queue_depth                extraction jobs waiting in the Celery queue
+    save_events                       SaveEvents by status
+
+The first four are recorded by each process as things happen, at the cost of a
+lock and an add. With several uvicorn workers, point PROMETHEUS_MULTIPROC_DIR at
+an empty directory shared by the workers (set before the app is imported, and
+emptied on deploy): each worker then writes its samples to files there, and
+whichever worker serves the scrape reports the sum. Without it, a scrape shows
+only the worker that served it.
+
+The last two are global rather than per worker, so they are read when scraped:
+the queue depth as admission control reads it (one LLEN, cached
+ADMISSION_QUEUE_CHECK_SECONDS), the status counts with one GROUP BY, cached in
+Redis for METRICS_STATUS_COUNTS_TTL_SECONDS so that however many workers serve
+scrapes, the table is counted once per interval. Redis errors are logged and
+swallowed, as elsewhere; each scrape then counts for itself.
+
+GET /metrics is restricted by app.api.metrics.require_metrics_access.
+"""
+
+import logging
+import os
+
+import redis
+import redis.asyncio as aioredis
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.save_event import SaveEvent, SaveEventStatus
+
+logger = logging.getLogger(__name__)
+
+# Finer around the 300ms p95 target
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2.5, 5, 10)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+pool_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool.",
+    buckets=POOL_WAIT_BUCKETS,
+)
+pool_in_use = Gauge(
+    "db_pool_connections_in_use",
+    "Database connections checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+auth_cache_requests = Counter(
+    "auth_user_cache_requests",
+    "Authenticated user lookups in the per-process user cache, by result.",
+    ["result"],
+)
+auth_cache_hit = auth_cache_requests.labels(result="hit")
+auth_cache_miss = auth_cache_requests.labels(result="miss")
+
+
+# ----------------------------------------------------------------------------
+# Scrape-time values
+# ----------------------------------------------------------------------------
+
+STATUS_COUNTS_KEY = "metrics:save_events"
+
+
+async def save_event_counts(db: AsyncSession, client: aioredis.Redis) -> dict[str, int]:
+    """SaveEvents per status (every SaveEventStatus, zero if none), cached briefly in Redis."""
+    try:
+        cached = await client.hgetall(STATUS_COUNTS_KEY)
+        if cached:
+            return {status: int(count) for status, count in cached.items()}
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read cached save event counts: {e}")
+
+    result = await db.execute(select(SaveEvent.status, func.count()).group_by(SaveEvent.status))
+    counts = {status.value: 0 for status in SaveEventStatus}
+    counts.update({status: count for status, count in result.all()})
+    try:
+        pipe = client.pipeline()
+        pipe.hset(STATUS_COUNTS_KEY, mapping=counts)
+        pipe.expire(STATUS_COUNTS_KEY, settings.METRICS_STATUS_COUNTS_TTL_SECONDS)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache save event counts: {e}")
+    return counts
+
+
+class _Snapshot:
+    """A collector for values read once per scrape."""
+
+    def __init__(self, queue_depth: int, status_counts: dict[str, int]):
+        self.queue_depth = queue_depth
+        self.status_counts = status_counts
+
+    def collect(self):
+        yield GaugeMetricFamily("celery_queue_depth", "Extraction jobs waiting in the Celery queue.", value=self.queue_depth)
+        family = GaugeMetricFamily("save_events", "SaveEvents by status.", labels=["status"])
+        for status, count in sorted(self.status_counts.items()):
+            family.add_metric([status], count)
+        yield family
+
+
+def render(queue_depth: int, status_counts: dict[str, int]) -> bytes:
+    """The text exposition of every metric, summed across workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    snapshot = CollectorRegistry()
+    snapshot.register(_Snapshot(queue_depth, status_counts))
+    return generate_latest(registry) + generate_latest(snapshot)
@@ -0,0 +1,45 @@
+"""
+Prefix Index
+
+A sorted, immutable list of (key, value) pairs answering "the first n values whose
+key starts with p" with two binary searches. Used to keep one user's restaurant
+and list names in process memory for autocomplete, where every keystroke is a
+prefix lookup.
+
+Keys must be normalized the way the database normalizes them (Postgres lower(),
+loaded alongside the names) and are compared by code point, which matches the
+byte order of text_pattern_ops on UTF-8: the in-memory and SQL paths return the
+same rows in the same order.
+"""
+
+from bisect import bisect_left
+from typing import Any, Iterable
+
+# Sorts after every character, so [p, p + PREFIX_END) is the range of keys starting with p
+PREFIX_END = "\U0010ffff"
+
+
+def normalize_prefix(q: str) -> str:
+    """Autocomplete input as a key prefix: case-folded, leading whitespace dropped."""
+    return q.lstrip().lower()
+
+
+class PrefixIndex:
+    """Read-only sorted (key, value) pairs; build once, share across requests."""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, items: Iterable[tuple[str, Any]]):
+        # Ties keep input order, so callers control the tie-break (e.g. by id)
+        ordered = sorted(items, key=lambda item: item[0])
+        self._keys = [key for key, _ in ordered]
+        self._values = [value for _, value in ordered]
+
+    def match(self, prefix: str, limit: int) -> list[Any]:
+        """Values whose key starts with prefix, in key order, at most limit of them."""
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + PREFIX_END, lo=start)
+        return self._values[start:min(end, start + limit)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
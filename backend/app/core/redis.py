@@ -0,0 +1,31 @@
+"""
+Redis Clients
+
+The API runs on asyncio and uses redis.asyncio; the Celery worker is synchronous
+and uses the blocking client. Both are created lazily from settings.REDIS_URL
+and reused for the lifetime of the process (redis-py pools connections internally).
+"""
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_async_client: aioredis.Redis | None = None
+_sync_client: redis.Redis | None = None
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Get or create the asyncio Redis client used by API endpoints."""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_client
+
+
+def get_sync_redis() -> redis.Redis:
+    """Get or create the blocking Redis client used by the Celery worker."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _sync_client
@@ -0,0 +1,133 @@
+"""
+Restaurant Detail Cache
+
+Restaurant rows are global and almost never change, so GET /restaurants/{id} is
+served read-through from two tiers, holding the encoded JSON body:
+
+    process LRU (TTLCache)   RESTAURANT_CACHE_LOCAL_TTL_SECONDS, per uvicorn worker
+    Redis restaurant:{id}    RESTAURANT_CACHE_TTL_SECONDS, shared
+
+and only a miss in both reads Postgres (then fills both).
+
+Anything that UPDATEs a restaurant, or merges one restaurant into another, must
+call invalidate() / invalidate_sync() for every id involved after committing. That
+clears Redis and this process's LRU; other workers' LRUs converge within the short
+local TTL. The Redis TTL bounds how long a racing read-through (a fill of values
+read just before the change committed) can outlive an invalidation.
+
+Redis failures never fail a request: reads fall through to Postgres and writes are
+logged and skipped.
+"""
+
+import logging
+from typing import Any, Iterable, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# restaurant_id -> JSON body
+local_cache = TTLCache(
+    maxsize=settings.RESTAURANT_CACHE_SIZE, ttl_seconds=settings.RESTAURANT_CACHE_LOCAL_TTL_SECONDS
+)
+
+
+def _key(restaurant_id: Any) -> str:
+    return f"restaurant:{restaurant_id}"
+
+
+async def get(client: aioredis.Redis, restaurant_id: Any) -> Optional[str]:
+    """Cached JSON body for a restaurant, or None if it must be read from Postgres."""
+    body = local_cache.get(restaurant_id)
+    if body is not None:
+        return body
+    try:
+        body = await client.get(_key(restaurant_id))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read cached Restaurant {restaurant_id}: {e}")
+        return None
+    if body is not None:
+        local_cache.set(restaurant_id, body)
+    return body
+
+
+async def put(client: aioredis.Redis, restaurant_id: Any, body: str) -> None:
+    """Store a restaurant's JSON body in both tiers after reading it from Postgres."""
+    local_cache.set(restaurant_id, body)
+    try:
+        await client.set(_key(restaurant_id), body, ex=settings.RESTAURANT_CACHE_TTL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache Restaurant {restaurant_id}: {e}")
+
+
+async def get_many(client: aioredis.Redis, restaurant_ids: Iterable[Any]) -> dict[Any, str]:
+    """
+    get() for several restaurants: the LRU first, then one MGET for the rest.
+
+    Returns:
+        Dict of JSON bodies keyed by restaurant id, for the ids found in either tier.
+        Ids missing from the result must be read from Postgres.
+    """
+    found = {}
+    remote = []
+    for restaurant_id in restaurant_ids:
+        body = local_cache.get(restaurant_id)
+        if body is not None:
+            found[restaurant_id] = body
+        else:
+            remote.append(restaurant_id)
+    if not remote:
+        return found
+    try:
+        bodies = await client.mget([_key(restaurant_id) for restaurant_id in remote])
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read cached Restaurants: {e}")
+        return found
+    for restaurant_id, body in zip(remote, bodies):
+        if body is not None:
+            local_cache.set(restaurant_id, body)
+            found[restaurant_id] = body
+    return found
+
+
+async def put_many(client: aioredis.Redis, bodies: dict[Any, str]) -> None:
+    """put() for several restaurants, in one pipelined round trip."""
+    if not bodies:
+        return
+    for restaurant_id, body in bodies.items():
+        local_cache.set(restaurant_id, body)
+    try:
+        pipe = client.pipeline()
+        for restaurant_id, body in bodies.items():
+            pipe.set(_key(restaurant_id), body, ex=settings.RESTAURANT_CACHE_TTL_SECONDS)
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache Restaurants: {e}")
+
+
+async def invalidate(client: aioredis.Redis, *restaurant_ids: Any) -> None:
+    """Drop restaurants from both tiers. Call after the update or merge has committed."""
+    if not restaurant_ids:
+        return
+    for restaurant_id in restaurant_ids:
+        local_cache.delete(restaurant_id)
+    try:
+        await client.delete(*[_key(restaurant_id) for restaurant_id in restaurant_ids])
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate cached Restaurants {restaurant_ids}: {e}")
+
+
+def invalidate_sync(client: redis.Redis, *restaurant_ids: Any) -> None:
+    """invalidate() for the synchronous Celery worker."""
+    if not restaurant_ids:
+        return
+    for restaurant_id in restaurant_ids:
+        local_cache.delete(restaurant_id)
+    try:
+        client.delete(*[_key(restaurant_id) for restaurant_id in restaurant_ids])
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate cached Restaurants {restaurant_ids}: {e}")
@@ -0,0 +1,112 @@
+"""
+Save Event Status Cache
+
+Each SaveEvent in flight is mirrored into a Redis hash at save_event:{id}:
+
+    user_id        owner, checked before a cached status is returned
+    status         pending | processing | complete | failed
+    error_message  empty string when unset
+
+The API writes the hash when the event is created (PENDING) and the worker rewrites
+it at every transition (PROCESSING, COMPLETE, FAILED), so status polling is served
+from Redis without querying Postgres. In-flight entries carry a safety TTL; once an
+event reaches a terminal status the hash expires shortly after, since /home reflects
+the result from then on.
+
+Redis is an optimization only: write failures are logged and swallowed, and readers
+fall back to Postgres for any id that is not cached.
+"""
+
+import logging
+from typing import Any, Iterable
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.models.save_event import SaveEvent, SaveEventStatus
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {SaveEventStatus.COMPLETE.value, SaveEventStatus.FAILED.value}
+
+
+def _key(save_event_id: Any) -> str:
+    return f"save_event:{save_event_id}"
+
+
+def _mapping(save_event: SaveEvent) -> dict:
+    return {
+        "user_id": str(save_event.user_id),
+        "status": save_event.status,
+        "error_message": save_event.error_message or "",
+    }
+
+
+def _ttl(status: str) -> int:
+    if status in TERMINAL_STATUSES:
+        return settings.SAVE_EVENT_STATUS_TTL_SECONDS
+    return settings.SAVE_EVENT_STATUS_INFLIGHT_TTL_SECONDS
+
+
+def write_status(client: redis.Redis, save_event: SaveEvent) -> None:
+    """Mirror a SaveEvent's status into Redis from the (synchronous) worker."""
+    key = _key(save_event.id)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping=_mapping(save_event))
+        pipe.expire(key, _ttl(save_event.status))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache status for SaveEvent {save_event.id}: {e}")
+
+
+async def write_status_async(client: aioredis.Redis, save_event: SaveEvent) -> None:
+    """Mirror a SaveEvent's status into Redis from an API endpoint."""
+    key = _key(save_event.id)
+    try:
+        pipe = client.pipeline()
+        pipe.hset(key, mapping=_mapping(save_event))
+        pipe.expire(key, _ttl(save_event.status))
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache status for SaveEvent {save_event.id}: {e}")
+
+
+async def read_statuses(
+    client: aioredis.Redis,
+    save_event_ids: Iterable[UUID],
+    user_id: UUID,
+) -> dict[UUID, dict]:
+    """
+    Look up cached statuses for several SaveEvents in one round trip.
+
+    Returns:
+        Dict keyed by SaveEvent id with {"status", "error_message"} for every id that
+        is cached and owned by user_id. Ids missing from the result must be resolved
+        against Postgres. On Redis errors an empty dict is returned.
+    """
+    ids = list(save_event_ids)
+    if not ids:
+        return {}
+
+    try:
+        pipe = client.pipeline()
+        for save_event_id in ids:
+            pipe.hgetall(_key(save_event_id))
+        rows = await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read cached SaveEvent statuses: {e}")
+        return {}
+
+    owner = str(user_id)
+    hits = {}
+    for save_event_id, row in zip(ids, rows):
+        if not row or row.get("user_id") != owner:
+            continue
+        hits[save_event_id] = {
+            "status": row["status"],
+            "error_message": row.get("error_message") or None,
+        }
+    return hits
@@ -0,0 +1,153 @@
+"""
+Sync Change Log
+
+Every mutation of a user's lists, saved restaurants (including flags) and notes
+appends rows to sync_changes in the same transaction, tagged with the user's next
+sequence number from sync_sequences. GET /sync?since=<seq> then only has to read the
+change log past the client's token, so its cost scales with the amount of change,
+not with the size of the library. Deletes are recorded as tombstones.
+
+Allocating the sequence takes a row lock on the user's sync_sequences row until
+commit, so call these helpers as the last step before commit to keep the lock short.
+Single-entity mutations instead fold the log into their own statement with
+log_returned(), so the mutation and its log cost one round trip.
+
+Retention: prune() (a periodic worker task) deletes changes older than
+SYNC_CHANGE_RETENTION_DAYS in batches, and in the same statement raises each
+affected user's sync_sequences.min_seq to the highest seq it removed. GET /sync
+answers a token below min_seq with a full snapshot, so the log, and a stale
+client's delta, stay bounded by the retention window rather than by history.
+"""
+
+from datetime import datetime
+from typing import Iterable, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, exists, func, insert, literal, select, true, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import CTE, Select
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.sync import SyncChange, SyncEntityType, SyncOp, SyncSequence
+
+Change = Tuple[SyncEntityType, UUID, SyncOp]
+
+
+def _next_seq_stmt(user_id: UUID):
+    stmt = pg_insert(SyncSequence).values(user_id=user_id, seq=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SyncSequence.user_id],
+        set_={"seq": SyncSequence.seq + 1},
+    )
+    return stmt.returning(SyncSequence.seq)
+
+
+def _insert_changes_stmt(user_id: UUID, seq: int, changes: Iterable[Change]):
+    return insert(SyncChange).values([
+        {
+            "user_id": user_id,
+            "seq": seq,
+            "entity_type": entity_type.value,
+            "entity_id": entity_id,
+            "op": op.value,
+        }
+        for entity_type, entity_id, op in changes
+    ])
+
+
+def log_returned(stmt: Select, rows: CTE, user_id: UUID, entity_type: SyncEntityType, op: SyncOp) -> Select:
+    """
+    Add the log writes for a mutation to the statement that selects its result.
+
+    rows is a CTE over the mutation's RETURNING with an `id` column. Two more CTEs
+    bump the user's sequence (only if the mutation changed a row) and insert one
+    change per returned row. The sequence upsert reads the mutation's rows, so the
+    mutation's row locks are taken before the sequence lock, the same order as
+    calling record_changes() after the mutation.
+    """
+    seq = (
+        pg_insert(SyncSequence)
+        .from_select(["user_id", "seq"], select(literal(user_id), literal(1)).where(exists(rows.select())))
+        .on_conflict_do_update(index_elements=[SyncSequence.user_id], set_={"seq": SyncSequence.seq + 1})
+        .returning(SyncSequence.seq)
+        .cte("sync_seq")
+    )
+    changed = select(
+        literal(user_id),
+        seq.c.seq,
+        literal(entity_type.value),
+        rows.c.id,
+        literal(op.value),
+        func.now(),
+    ).select_from(rows).join(seq, true())
+    changes = insert(SyncChange).from_select(
+        ["user_id", "seq", "entity_type", "entity_id", "op", "created_at"], changed
+    )
+    # Data-modifying CTEs run even though nothing selects from this one
+    return stmt.add_cte(changes.cte("sync_change"))
+
+
+async def record_changes(db: AsyncSession, user_id: UUID, changes: Iterable[Change]) -> int:
+    """
+    Append changes for one transaction to the log. Does not commit.
+
+    Returns:
+        The sequence number assigned to this transaction
+    """
+    changes = list(changes)
+    result = await db.execute(_next_seq_stmt(user_id))
+    seq = result.scalar_one()
+    if changes:
+        await db.execute(_insert_changes_stmt(user_id, seq, changes))
+    return seq
+
+
+def record_changes_sync(session: Session, user_id: UUID, changes: Iterable[Change]) -> int:
+    """record_changes() for the synchronous Celery worker."""
+    changes = list(changes)
+    seq = session.execute(_next_seq_stmt(user_id)).scalar_one()
+    if changes:
+        session.execute(_insert_changes_stmt(user_id, seq, changes))
+    return seq
+
+
+def prune_stmt(cutoff: datetime, limit: int):
+    """
+    Delete up to limit changes created before cutoff, oldest first, and raise their
+    users' min_seq past them. Selects the number of changes deleted.
+    """
+    # In id order: the oldest rows sit at the start of the primary key
+    batch = select(SyncChange.id).where(SyncChange.created_at < cutoff).order_by(SyncChange.id).limit(limit)
+    pruned = (
+        delete(SyncChange)
+        .where(SyncChange.id.in_(batch))
+        .returning(SyncChange.user_id, SyncChange.seq)
+        .cte("pruned")
+    )
+    per_user = (
+        select(pruned.c.user_id, func.max(pruned.c.seq).label("seq"))
+        .group_by(pruned.c.user_id)
+        .subquery()
+    )
+    advanced = (
+        update(SyncSequence)
+        .where(SyncSequence.user_id == per_user.c.user_id)
+        .values(min_seq=func.greatest(SyncSequence.min_seq, per_user.c.seq))
+        .cte("advanced")
+    )
+    return select(func.count()).select_from(pruned).add_cte(advanced)
+
+
+def prune(engine: Engine, cutoff: datetime) -> int:
+    """Prune the whole log, one short transaction per batch. Returns changes deleted."""
+    limit = settings.SYNC_CHANGE_PRUNE_BATCH_ROWS
+    deleted = 0
+    while True:
+        with engine.begin() as conn:
+            count = conn.execute(prune_stmt(cutoff, limit)).scalar_one()
+        deleted += count
+        if count < limit:
+            return deleted
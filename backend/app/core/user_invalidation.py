@@ -0,0 +1,52 @@
+"""
+Cross-Process User Cache Invalidation
+
+deps.user_cache is per process, so dropping a user from it only helps the process
+that handled the request. publish() announces a clerk_user_id on a Redis pub/sub
+channel; every API process runs listen() (started in app.main) and drops that
+entry from its own cache.
+
+Pub/sub is fire-and-forget: a process that is disconnected when a message is sent
+never sees it, so listen() clears its whole cache whenever it (re)subscribes.
+Redis errors are logged and swallowed, as in app.core.status_cache; entries still
+expire after AUTH_USER_CACHE_TTL_SECONDS.
+"""
+
+import asyncio
+import logging
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "user_cache:invalidate"
+
+
+async def publish(client: aioredis.Redis, clerk_user_id: str) -> None:
+    """Drop clerk_user_id from every API process's user cache."""
+    try:
+        await client.publish(CHANNEL, clerk_user_id)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish user cache invalidation: {e}")
+
+
+async def listen(client: aioredis.Redis, cache: TTLCache) -> None:
+    """Apply invalidations to cache until cancelled, resubscribing after Redis errors."""
+    while True:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(CHANNEL)
+            # Anything published while we were not subscribed is lost
+            cache.clear()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    cache.delete(message["data"])
+        except redis.RedisError as e:
+            logger.warning(f"User cache invalidation listener failed: {e}")
+        finally:
+            await pubsub.aclose()
+        await asyncio.sleep(settings.AUTH_USER_INVALIDATION_RETRY_SECONDS)
@@ -1,13 +1,39 @@
+import time
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel import SQLModel, create_engine
+from app.core import admission, metrics
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Reports how long each connection checkout waited, for load shedding
+    (app.core.admission) and metrics, and how many connections are in use.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            admission.pool_wait.observe(waited * 1000)
+            metrics.pool_wait.observe(waited)
+        metrics.pool_in_use.inc()
+        return connection
+
+    def _do_return_conn(self, record):
+        metrics.pool_in_use.dec()
+        super()._do_return_conn(record)
+
+
+engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True, poolclass=TimedQueuePool)
+
+async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_session() -> AsyncSession:
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with async_session() as session:
         yield session
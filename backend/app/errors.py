@@ -22,12 +22,17 @@ class ErrorMessages:
     # Authorization Errors
     # ============================================================================
     AUTHZ_RESOURCE_NOT_FOUND = "Resource not found or you don't have access."
+    AUTHZ_METRICS_FORBIDDEN = "Metrics are only served to internal scrapers."
 
     # ============================================================================
     # Validation Errors
     # ============================================================================
     VALIDATION_DUPLICATE_NAME = "A resource with this name already exists."
     VALIDATION_REQUIRED_FIELD = "Required field is missing."
+    VALIDATION_TOO_MANY_IDS = "Too many ids in one request."
+    VALIDATION_INVALID_CURSOR = "Invalid or expired page cursor."
+    VALIDATION_INVALID_SYNC_TOKEN = "Invalid sync token."
+    VALIDATION_INVALID_BBOX = "Invalid bbox. Expected min_lng,min_lat,max_lng,max_lat."
 
     # ============================================================================
     # Resource Errors
@@ -36,12 +41,17 @@ class ErrorMessages:
     RESOURCE_RESTAURANT_NOT_FOUND = "Restaurant not found."
     RESOURCE_RESTAURANT_NOT_SAVED = "Restaurant not saved by user."
     RESOURCE_SAVE_EVENT_NOT_FOUND = "Save event not found."
+    RESOURCE_EXPORT_NOT_FOUND = "Export not found or expired."
+    RESOURCE_EXPORT_NOT_READY = "Export is not complete yet."
+    RESOURCE_DELETION_NOT_FOUND = "Account deletion not found or expired."
 
     # ============================================================================
     # Server Errors
     # ============================================================================
     SERVER_ERROR = "An unexpected error occurred. Please try again."
     SERVER_DELETE_FAILED = "Failed to delete resource. Please try again."
+    SERVER_OVERLOADED = "The server is busy. Please retry shortly."
+    RATE_LIMITED = "Too many requests. Please slow down."
 
     # ============================================================================
     # Deprecated Endpoints
@@ -1,7 +1,31 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.admission import AdmissionMiddleware
+from app.api.deps import get_db, user_cache
+from app.api.metrics import MetricsMiddleware, require_metrics_access
 from app.api.v1.router import api_router
+from app.core import admission, metrics, user_invalidation
+from app.core.redis import get_async_redis
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Drop users from this process's cache when another process says so
+    listener = asyncio.create_task(user_invalidation.listen(get_async_redis(), user_cache))
+    yield
+    listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await listener
 
-app = FastAPI(title="Reel Mapper API")
+
+app = FastAPI(title="Reel Mapper API", lifespan=lifespan)
+app.add_middleware(AdmissionMiddleware)
+# Outermost, so requests shed by admission control are timed too
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router, prefix="/api/v1")
 
@@ -12,3 +36,13 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def read_metrics(db: AsyncSession = Depends(get_db)):
+    """Prometheus metrics (see app/core/metrics.py), for internal scrapers only."""
+    redis_client = get_async_redis()
+    body = metrics.render(
+        await admission.extraction_queue.get(redis_client),
+        await metrics.save_event_counts(db, redis_client),
+    )
+    return Response(body, media_type=CONTENT_TYPE_LATEST)
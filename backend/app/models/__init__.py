@@ -4,3 +4,4 @@ from .restaurant import Restaurant
 from .save_event import UserRestaurant, SaveEvent, SaveEventStatus
 from .list import List
 from .note import Note
+from .sync import SyncSequence, SyncChange, SyncEntityType, SyncOp
@@ -19,3 +19,4 @@ class List(SQLModel, table=True):
 
     name: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
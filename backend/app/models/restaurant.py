@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 from sqlmodel import Field, SQLModel, Index, UniqueConstraint
+from sqlalchemy import Column, Computed, String
 
 class Restaurant(SQLModel, table=True):
     __tablename__ = "restaurants"
@@ -19,3 +20,13 @@ class Restaurant(SQLModel, table=True):
     google_place_id: Optional[str] = Field(default=None, unique=True, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+    # Generated by Postgres from latitude/longitude (see app/core/geohash.py)
+    geohash: Optional[str] = Field(
+        default=None,
+        sa_column=Column(
+            String(12, collation="C"),
+            Computed("geohash_encode(latitude, longitude, 12)", persisted=True),
+            index=True,
+        ),
+    )
+
@@ -2,8 +2,8 @@ import uuid
 from datetime import datetime
 from enum import Enum
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import Field, SQLModel, UniqueConstraint, Relationship
-from sqlalchemy import Column, ForeignKey as SA_ForeignKey
+from sqlmodel import Field, SQLModel, UniqueConstraint, Index, Relationship
+from sqlalchemy import Column, ForeignKey as SA_ForeignKey, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 if TYPE_CHECKING:
@@ -13,6 +13,17 @@ class UserRestaurant(SQLModel, table=True):
     __tablename__ = "user_restaurants"
     __table_args__ = (
         UniqueConstraint("user_id", "restaurant_id"),
+        # Keyset pagination for /home (list_id IS NULL) and /lists/{id}/restaurants
+        Index("ix_user_restaurants_user_list_created_id", "user_id", "list_id", "created_at", "id"),
+        Index("ix_user_restaurants_user_list_fav_created_id", "user_id", "list_id", "is_favorite", "created_at", "id"),
+        # Unsorted bucket: `list_id IS NULL` can't drive ORDER BY through the indexes above
+        Index("ix_user_restaurants_unsorted_created_id", "user_id", "created_at", "id", postgresql_where=text("list_id IS NULL")),
+        Index(
+            "ix_user_restaurants_unsorted_fav_created_id", "user_id", "is_favorite", "created_at", "id",
+            postgresql_where=text("list_id IS NULL"),
+        ),
+        # RESTRICT check when save_events are deleted
+        Index("ix_user_restaurants_source_event_id", "source_event_id"),
     )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -41,6 +52,7 @@ class UserRestaurant(SQLModel, table=True):
     is_favorite: bool = Field(default=False)
     is_visited: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     restaurant: "Restaurant" = Relationship(sa_relationship_kwargs={"lazy": "selectin"})
 
@@ -52,6 +64,10 @@ class SaveEventStatus(str, Enum):
 
 class SaveEvent(SQLModel, table=True):
     __tablename__ = "save_events"
+    __table_args__ = (
+        # A user's events in id order: account export pages and account deletion batches
+        Index("ix_save_events_user_id_id", "user_id", "id"),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
@@ -0,0 +1,49 @@
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from sqlmodel import Field, SQLModel, Index
+from sqlalchemy import Column, BigInteger, ForeignKey as SA_ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+class SyncEntityType(str, Enum):
+    LIST = "list"
+    USER_RESTAURANT = "user_restaurant"
+    NOTE = "note"
+
+class SyncOp(str, Enum):
+    UPSERT = "upsert"
+    DELETE = "delete"
+
+class SyncSequence(SQLModel, table=True):
+    __tablename__ = "sync_sequences"
+    # One row per user. Mutations bump seq inside their own transaction; the row lock
+    # serializes a user's writers, so seq order matches commit order for that user.
+
+    # CASCADE: User deletion removes their sequence
+    user_id: uuid.UUID = Field(
+        sa_column=Column(PG_UUID(as_uuid=True), SA_ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    )
+    seq: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
+    # Highest seq whose change may have been pruned; older tokens get a full snapshot
+    min_seq: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
+
+class SyncChange(SQLModel, table=True):
+    __tablename__ = "sync_changes"
+    __table_args__ = (
+        Index("ix_sync_changes_user_id_seq", "user_id", "seq"),
+    )
+
+    id: Optional[int] = Field(default=None, sa_column=Column(BigInteger, primary_key=True, autoincrement=True))
+
+    # CASCADE: User deletion removes their change log
+    user_id: uuid.UUID = Field(
+        sa_column=Column(PG_UUID(as_uuid=True), SA_ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    )
+
+    seq: int = Field(sa_column=Column(BigInteger, nullable=False))
+    entity_type: str  # SyncEntityType
+    # No FK: deleted entities keep their tombstone
+    entity_id: uuid.UUID
+    op: str  # SyncOp
+    created_at: datetime = Field(default_factory=datetime.utcnow)
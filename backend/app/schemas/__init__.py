@@ -1,13 +1,43 @@
-from .user import UserRead, UserBase
-from .save_event import SaveEventCreate, SaveEventRead
-from .list import ListCreate, ListRead, HomeResponse, ListRestaurantsResponse, AddRestaurantToListRequest
+from .user import UserRead, UserBase, AccountDeletionRead
+from .save_event import SaveEventCreate, SaveEventRead, SaveEventStatusRead, SaveEventStatusBatchResponse
+from .list import (
+    ListCreate,
+    ListRead,
+    ListSummaryRead,
+    ListsResponse,
+    HomeResponse,
+    ListRestaurantsResponse,
+    AddRestaurantToListRequest
+)
 from .restaurant import (
     RestaurantRead, 
+    RestaurantUserDetail,
+    RestaurantDetailRead,
+    RestaurantBatchRequest,
+    RestaurantBatchResponse,
+    RestaurantPreview,
     UserRestaurantRead, 
+    NearbyRestaurantRead,
+    NearbyResponse,
+    ClusterRead,
+    ClustersResponse,
     FavoriteResponse, 
     VisitedResponse, 
     FavoritesListResponse, 
-    VisitedListResponse
+    VisitedListResponse,
+    BulkRestaurantIdsRequest,
+    BulkMoveRequest,
+    BulkFlagsRequest,
+    BulkResultItem,
+    BulkResponse
 )
 from .note import NoteUpdate, NoteRead
-
+from .sync import SyncListRead, SyncUserRestaurantRead, SyncTombstone, SyncResponse
+from .export import AccountExportRead
+from .search import (
+    SearchResultRead,
+    SearchResponse,
+    AutocompleteRestaurant,
+    AutocompleteList,
+    AutocompleteResponse
+)
@@ -0,0 +1,12 @@
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+class AccountExportRead(BaseModel):
+    id: UUID
+    format: str  # "ndjson" | "zip"
+    status: str  # "pending" | "running" | "complete" | "failed"
+    # Progress while running: the table being exported and rows written so far
+    table: Optional[str] = None
+    rows: int = 0
+    error: Optional[str] = None
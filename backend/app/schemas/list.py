@@ -2,7 +2,7 @@ from uuid import UUID
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-from .restaurant import UserRestaurantRead
+from .restaurant import UserRestaurantRead, RestaurantPreview
 
 class ListBase(BaseModel):
     name: str
@@ -13,17 +13,29 @@ class ListCreate(ListBase):
 class ListRead(ListBase):
     id: UUID
     created_at: datetime
-    # We might want to include count of restaurants or top 3, but TDD says lists: [...]
     
     class Config:
         from_attributes = True
 
+class ListSummaryRead(ListRead):
+    restaurant_count: int = 0
+    favorite_count: int = 0
+    visited_count: int = 0
+    # Most recently saved restaurants in the list (LIST_PREVIEW_COUNT)
+    previews: List[RestaurantPreview] = []
+
+class ListsResponse(BaseModel):
+    lists: List[ListSummaryRead]
+
 class HomeResponse(BaseModel):
-    lists: List[ListRead]
+    lists: List[ListSummaryRead]
     unsorted_restaurants: List[UserRestaurantRead]
+    # Cursor for the next page of unsorted_restaurants (None on the last page)
+    next_cursor: Optional[str] = None
 
 class ListRestaurantsResponse(BaseModel):
     restaurants: List[UserRestaurantRead]
+    next_cursor: Optional[str] = None
 
 class AddRestaurantToListRequest(BaseModel):
     restaurant_id: UUID
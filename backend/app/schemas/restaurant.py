@@ -1,7 +1,9 @@
 from uuid import UUID
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from app.core.config import settings
+from .note import NoteRead
 
 class RestaurantBase(BaseModel):
     name: str
@@ -17,6 +19,36 @@ class RestaurantRead(RestaurantBase):
     class Config:
         from_attributes = True
 
+class RestaurantUserDetail(BaseModel):
+    # The current user's side of a restaurant; everything but `note` is empty
+    # unless saved is true (a note can outlive the save)
+    saved: bool
+    user_restaurant_id: Optional[UUID] = None
+    is_favorite: bool = False
+    is_visited: bool = False
+    list_id: Optional[UUID] = None
+    list_name: Optional[str] = None
+    saved_at: Optional[datetime] = None
+    note: Optional[NoteRead] = None
+
+class RestaurantDetailRead(RestaurantRead):
+    # Only with ?include=user
+    user: Optional[RestaurantUserDetail] = None
+
+class RestaurantBatchRequest(BaseModel):
+    # Bounded before the ids are parsed; repeats are dropped afterwards
+    ids: list[UUID] = Field(max_length=settings.RESTAURANT_BATCH_MAX_IDS)
+
+class RestaurantBatchResponse(BaseModel):
+    # In request order (repeats dropped); ids with no restaurant are in `missing`
+    restaurants: list[RestaurantRead]
+    missing: list[UUID]
+
+class RestaurantPreview(BaseModel):
+    id: UUID
+    name: str
+    city: str
+
 class UserRestaurantRead(BaseModel):
     id: UUID
     restaurant: RestaurantRead
@@ -27,6 +59,22 @@ class UserRestaurantRead(BaseModel):
     class Config:
         from_attributes = True
 
+class NearbyRestaurantRead(UserRestaurantRead):
+    distance_m: float
+
+class NearbyResponse(BaseModel):
+    restaurants: list[NearbyRestaurantRead]
+
+class ClusterRead(BaseModel):
+    geohash: str  # cell key: the geohash prefix shared by every restaurant in it
+    count: int
+    latitude: float  # centroid
+    longitude: float
+
+class ClustersResponse(BaseModel):
+    precision: int
+    clusters: list[ClusterRead]
+
 class FavoriteResponse(BaseModel):
     is_favorite: bool
 
@@ -38,3 +86,22 @@ class FavoritesListResponse(BaseModel):
 
 class VisitedListResponse(BaseModel):
     restaurant_ids: list[UUID]
+
+class BulkRestaurantIdsRequest(BaseModel):
+    restaurant_ids: list[UUID]
+
+class BulkMoveRequest(BulkRestaurantIdsRequest):
+    # None moves the restaurants to Unsorted
+    list_id: Optional[UUID] = None
+
+class BulkFlagsRequest(BulkRestaurantIdsRequest):
+    # Fields left out are not changed; at least one must be set
+    is_favorite: Optional[bool] = None
+    is_visited: Optional[bool] = None
+
+class BulkResultItem(BaseModel):
+    restaurant_id: UUID
+    status: str  # "ok" | "not_saved"
+
+class BulkResponse(BaseModel):
+    results: list[BulkResultItem]
@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, HttpUrl
 
 class SaveEventBase(BaseModel):
@@ -16,3 +16,15 @@ class SaveEventRead(SaveEventBase):
     
     class Config:
         from_attributes = True
+
+class SaveEventStatusRead(BaseModel):
+    id: UUID
+    status: str
+    error_message: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class SaveEventStatusBatchResponse(BaseModel):
+    statuses: List[SaveEventStatusRead]
+    missing: List[UUID]
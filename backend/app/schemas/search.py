@@ -0,0 +1,29 @@
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+from .restaurant import UserRestaurantRead
+
+class SearchResultRead(UserRestaurantRead):
+    rank: float
+    list_name: Optional[str] = None
+    # Which of the user's data matched: "restaurant" (name or city), "list", "note"
+    matched: List[str]
+
+class SearchResponse(BaseModel):
+    results: List[SearchResultRead]
+    next_cursor: Optional[str] = None
+    # True when nothing matched exactly and these are typo-tolerant name matches
+    fuzzy: bool = False
+
+class AutocompleteRestaurant(BaseModel):
+    id: UUID  # UserRestaurant id
+    restaurant_id: UUID
+    name: str
+
+class AutocompleteList(BaseModel):
+    id: UUID
+    name: str
+
+class AutocompleteResponse(BaseModel):
+    restaurants: List[AutocompleteRestaurant]
+    lists: List[AutocompleteList]
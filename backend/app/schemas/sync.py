@@ -0,0 +1,28 @@
+from uuid import UUID
+from typing import List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+from .list import ListRead
+from .note import NoteRead
+from .restaurant import UserRestaurantRead
+
+class SyncListRead(ListRead):
+    updated_at: datetime
+
+class SyncUserRestaurantRead(UserRestaurantRead):
+    list_id: Optional[UUID] = None
+    updated_at: datetime
+
+class SyncTombstone(BaseModel):
+    entity_type: str  # "list" | "user_restaurant" | "note"
+    id: UUID
+
+class SyncResponse(BaseModel):
+    # full=True: snapshot of everything, client should replace its local copy
+    # full=False: only entities changed after `since`, plus tombstones for deletions
+    full: bool
+    lists: List[SyncListRead]
+    user_restaurants: List[SyncUserRestaurantRead]
+    notes: List[NoteRead]
+    deleted: List[SyncTombstone]
+    next_token: str
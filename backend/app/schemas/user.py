@@ -13,3 +13,9 @@ class UserRead(UserBase):
     class Config:
         from_attributes = True  # Updated from orm_mode for Pydantic v2
 
+class AccountDeletionRead(BaseModel):
+    user_id: UUID
+    status: str  # pending | running | retrying | complete | failed
+    table: Optional[str] = None  # table being deleted from
+    rows: int = 0  # rows deleted so far
+    error: Optional[str] = None
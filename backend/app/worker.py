@@ -1,12 +1,17 @@
 import os
 import time
 import logging
+import uuid
+from datetime import datetime, timedelta
 from celery import Celery
 from sqlmodel import Session, create_engine, select
 from app.core.config import settings
+from app.core import account_deletion, account_export, data_version, status_cache, sync_log
+from app.core.redis import get_sync_redis
 from app.models.save_event import SaveEvent, SaveEventStatus, UserRestaurant
 from app.models.restaurant import Restaurant
 from app.models.list import List
+from app.models.sync import SyncEntityType, SyncOp
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +23,18 @@ engine = create_engine(SYNC_DATABASE_URL, echo=True)
 
 celery_app = Celery("worker", broker=os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
 
+# Periodic tasks, run by `celery -A app.worker.celery_app beat` (one per deployment)
+celery_app.conf.beat_schedule = {
+    "sweep-account-exports": {
+        "task": "app.worker.sweep_exports",
+        "schedule": settings.ACCOUNT_EXPORT_SWEEP_SECONDS,
+    },
+    "prune-sync-changes": {
+        "task": "app.worker.prune_sync_changes",
+        "schedule": settings.SYNC_CHANGE_PRUNE_SECONDS,
+    },
+}
+
 # celery_app.conf.task_routes = {
 #     "app.worker.extract_info": "main-queue",
 # }
@@ -26,6 +43,10 @@ def get_sync_session():
     with Session(engine) as session:
         yield session
 
+def publish_status(save_event: SaveEvent):
+    """Mirror the committed status into Redis for GET /save-events/{id}."""
+    status_cache.write_status(get_sync_redis(), save_event)
+
 @celery_app.task(acks_late=True)
 def extract_info(save_event_id: str):
     with Session(engine) as session:
@@ -38,24 +59,94 @@ def extract_info(save_event_id: str):
         save_event.status = SaveEventStatus.PROCESSING.value
         session.add(save_event)
         session.commit()
+        publish_status(save_event)
 
-        # 2. Extract Logic (Mock/Regex)
-        raw = save_event.raw_caption or ""
-        # Super basic rule: "Name in City" or just first 2 words
-        # Mocking extraction for now
-        candidate_name = "Joe's Pizza"
-        candidate_city = "New York"
-        
-        if "Sushi" in raw:
-            candidate_name = "Sushi Nakazawa"
-            candidate_city = "Tokyo"
-        
-        # 3. Resolve Restaurant (Job 2 inline or chained)
-        # We chain logically here for simplicity in this agent task
-        restaurant = resolve_restaurant(session, candidate_name, candidate_city)
-        
-        # 4. Finalize (Job 3)
-        finalize_save(session, save_event, restaurant)
+        try:
+            # 2. Extract Logic (Mock/Regex)
+            raw = save_event.raw_caption or ""
+            # Super basic rule: "Name in City" or just first 2 words
+            # Mocking extraction for now
+            candidate_name = "Joe's Pizza"
+            candidate_city = "New York"
+            
+            if "Sushi" in raw:
+                candidate_name = "Sushi Nakazawa"
+                candidate_city = "Tokyo"
+            
+            # 3. Resolve Restaurant (Job 2 inline or chained)
+            # We chain logically here for simplicity in this agent task
+            restaurant = resolve_restaurant(session, candidate_name, candidate_city)
+            
+            # 4. Finalize (Job 3)
+            finalize_save(session, save_event, restaurant)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to process SaveEvent {save_event_id}: {e}", exc_info=True)
+            save_event.status = SaveEventStatus.FAILED.value
+            save_event.error_message = str(e)
+            session.add(save_event)
+            session.commit()
+            publish_status(save_event)
+            raise
+
+@celery_app.task(acks_late=True)
+def export_account(export_id: str, user_id: str, fmt: str):
+    """Write a user's account export to the export store (see app/core/account_export.py)."""
+    client = get_sync_redis()
+    export_format = account_export.ExportFormat(fmt)
+    key = account_export.object_key(user_id, export_id, export_format)
+    account_export.update_job(client, export_id, status=account_export.ExportStatus.RUNNING)
+
+    def progress(table: str, rows: int):
+        account_export.update_job(client, export_id, table=table, rows=rows)
+
+    try:
+        with account_export.get_store().open_write(key) as out:
+            rows = account_export.run_export(engine, uuid.UUID(user_id), export_format, out, progress)
+    except Exception as e:
+        logger.error(f"Failed to export account {user_id} ({export_id}): {e}", exc_info=True)
+        account_export.update_job(client, export_id, status=account_export.ExportStatus.FAILED, error=str(e))
+        raise
+
+    account_export.update_job(client, export_id, status=account_export.ExportStatus.COMPLETE, table="", rows=rows)
+    logger.info(f"Exported {rows} rows for user {user_id} ({export_id})")
+
+@celery_app.task
+def sweep_exports():
+    """Remove account exports whose job has expired (see app/core/account_export.py)."""
+    removed = account_export.get_store().sweep(settings.ACCOUNT_EXPORT_TTL_SECONDS)
+    logger.info(f"Swept {removed} expired account exports")
+
+@celery_app.task
+def prune_sync_changes():
+    """Drop sync changes past the retention window (see app/core/sync_log.py)."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_CHANGE_RETENTION_DAYS)
+    pruned = sync_log.prune(engine, cutoff)
+    logger.info(f"Pruned {pruned} sync changes")
+
+@celery_app.task(bind=True, acks_late=True, max_retries=settings.ACCOUNT_DELETE_MAX_RETRIES)
+def delete_account(self, user_id: str):
+    """Delete an account in bounded batches (see app/core/account_deletion.py). Safe to rerun."""
+    client = get_sync_redis()
+    account_deletion.update_job(client, user_id, status="running", table="", rows=0, error="")
+
+    def progress(table: str, rows: int):
+        account_deletion.update_job(client, user_id, table=table, rows=rows)
+
+    try:
+        rows = account_deletion.run_deletion(engine, uuid.UUID(user_id), progress)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            countdown = settings.ACCOUNT_DELETE_RETRY_SECONDS * 2 ** self.request.retries
+            logger.warning(f"Failed to delete account {user_id}, retrying in {countdown}s: {e}")
+            account_deletion.update_job(client, user_id, status="retrying", error=str(e))
+            raise self.retry(exc=e, countdown=countdown)
+        logger.error(f"Failed to delete account {user_id}: {e}", exc_info=True)
+        account_deletion.update_job(client, user_id, status="failed", error=str(e))
+        raise
+
+    account_deletion.update_job(client, user_id, status="complete", rows=rows, error="")
+    logger.info(f"Deleted account {user_id} ({rows} rows)")
 
 def resolve_restaurant(session: Session, name: str, city: str) -> Restaurant:
     # 1. Check DB for exact match (fuzzy ignored for now)
@@ -96,6 +187,7 @@ def finalize_save(session: Session, save_event: SaveEvent, restaurant: Restauran
         save_event.error_message = "Restaurant already saved"
         session.add(save_event)
         session.commit()
+        publish_status(save_event)
         logger.info(f"Marked SaveEvent {save_event.id} as complete (duplicate)")
         return
 
@@ -111,5 +203,10 @@ def finalize_save(session: Session, save_event: SaveEvent, restaurant: Restauran
     # 2. Update status
     save_event.status = SaveEventStatus.COMPLETE.value
     session.add(save_event)
+    sync_log.record_changes_sync(
+        session, save_event.user_id, [(SyncEntityType.USER_RESTAURANT, user_rest.id, SyncOp.UPSERT)]
+    )
     session.commit()
+    publish_status(save_event)
+    data_version.bump_sync(get_sync_redis(), save_event.user_id)
     logger.debug(f"Finished processing save_event {save_event.id}")
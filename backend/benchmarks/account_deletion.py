@@ -0,0 +1,203 @@
+"""
+Account deletion: one cascading DELETE FROM users vs app.core.account_deletion.
+
+Seeds two identical heavy accounts (--save-events save events, --saved saved
+restaurants each with its own source event, notes on ~30% of them, --lists lists
+and one sync change per save) and deletes one with each strategy, reporting:
+
+- longest transaction: how long row locks (and the snapshot that holds back
+  vacuum) are held at once; for the cascade this is the whole delete
+- WAL written (pg_current_wal_lsn before and after)
+- blocked FK check: the longest a concurrent write for the user waited. A probe
+  thread runs the FK check every insert into a child table makes
+  (SELECT ... FROM users FOR KEY SHARE) every 10ms while the delete runs
+
+Rows are committed (the batched strategy commits per batch) and removed by the
+deletions themselves; the seeded restaurants are removed at the end.
+
+    python -m benchmarks.account_deletion --save-events 200000 --saved 50000
+    python -m benchmarks.account_deletion --batch 5000 --pause 0
+"""
+
+import argparse
+import threading
+import time
+import uuid
+
+from sqlalchemy import event, text
+
+from app.core import account_deletion
+from app.core.config import settings
+from benchmarks._common import get_engine
+
+
+def seed_account(engine, save_events: int, saved: int, lists: int) -> tuple[str, list[str]]:
+    user_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+            {"id": user_id, "email": f"bench-{user_id}@example.com"},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO lists (id, user_id, name, created_at, updated_at) "
+                "SELECT gen_random_uuid(), :u, 'Bench list ' || g, now(), now() FROM generate_series(1, :n) g"
+            ),
+            {"u": user_id, "n": lists},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                "SELECT gen_random_uuid(), :u, 'instagram', 'https://instagram.com/p/' || g, 'complete', now() "
+                "FROM generate_series(1, :n) g"
+            ),
+            {"u": user_id, "n": save_events},
+        )
+        restaurant_ids = conn.execute(
+            text(
+                """
+                WITH events AS (
+                    SELECT id, row_number() OVER () AS n FROM save_events WHERE user_id = :u LIMIT :saved
+                ), r AS (
+                    INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                    SELECT gen_random_uuid(), 'Bench ' || n, 40.7, -74.0, 'New York', now() FROM events
+                    RETURNING id
+                ), numbered AS (
+                    SELECT id, row_number() OVER () AS n FROM r
+                ), saved AS (
+                    INSERT INTO user_restaurants (id, user_id, restaurant_id, list_id, source_event_id,
+                                                  is_favorite, is_visited, created_at, updated_at)
+                    SELECT gen_random_uuid(), :u, numbered.id,
+                           (SELECT id FROM lists WHERE user_id = :u ORDER BY id OFFSET numbered.n % :lists LIMIT 1),
+                           events.id, false, false, now(), now()
+                    FROM numbered JOIN events USING (n)
+                    RETURNING restaurant_id
+                )
+                SELECT restaurant_id FROM saved
+                """
+            ),
+            {"u": user_id, "saved": saved, "lists": lists},
+        ).scalars().all()
+        conn.execute(
+            text(
+                "INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at) "
+                "SELECT gen_random_uuid(), :u, restaurant_id, 'bench note', now(), now() "
+                "FROM user_restaurants WHERE user_id = :u AND random() < 0.3"
+            ),
+            {"u": user_id},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO sync_changes (user_id, seq, entity_type, entity_id, op, created_at) "
+                "SELECT :u, row_number() OVER (), 'user_restaurant', id, 'upsert', now() "
+                "FROM user_restaurants WHERE user_id = :u"
+            ),
+            {"u": user_id},
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("users", "lists", "save_events", "restaurants", "user_restaurants", "notes", "sync_changes"):
+            conn.execute(text(f"VACUUM ANALYZE {table}"))
+    return user_id, [str(rid) for rid in restaurant_ids]
+
+
+class FKProbe(threading.Thread):
+    """Repeatedly take the lock a child-row INSERT takes on the user row; record the longest wait."""
+
+    def __init__(self, engine, user_id: str):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.user_id = user_id
+        self.stop = threading.Event()
+        self.max_wait_ms = 0.0
+
+    def run(self):
+        while not self.stop.is_set():
+            start = time.perf_counter()
+            with self.engine.begin() as conn:
+                conn.execute(text("SELECT 1 FROM users WHERE id = :u FOR KEY SHARE"), {"u": self.user_id})
+            self.max_wait_ms = max(self.max_wait_ms, (time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+
+def measure(engine, user_id: str, delete) -> dict:
+    """Run delete() while timing every transaction on engine and probing the user row lock."""
+    transactions, started = [], {}
+    on_begin = lambda conn: started.__setitem__(id(conn), time.perf_counter())
+    on_commit = lambda conn: transactions.append((time.perf_counter() - started.pop(id(conn))) * 1000)
+
+    with engine.connect() as conn:
+        wal_start = conn.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+    # Its own engine, so its transactions aren't counted below
+    probe = FKProbe(get_engine(), user_id)
+    probe.start()
+    time.sleep(0.05)
+
+    event.listen(engine, "begin", on_begin)
+    event.listen(engine, "commit", on_commit)
+    start = time.perf_counter()
+    try:
+        delete()
+    finally:
+        event.remove(engine, "begin", on_begin)
+        event.remove(engine, "commit", on_commit)
+    total_ms = (time.perf_counter() - start) * 1000
+    probe.stop.set()
+    probe.join()
+
+    with engine.connect() as conn:
+        wal_bytes = conn.execute(
+            text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :start)"), {"start": wal_start}
+        ).scalar()
+    return {
+        "total_ms": total_ms,
+        "transactions": len(transactions),
+        "longest_ms": max(transactions),
+        "wal_mb": float(wal_bytes) / 1e6,
+        "blocked_ms": probe.max_wait_ms,
+    }
+
+
+def cascade(engine, user_id: str) -> int:
+    with engine.begin() as conn:
+        return conn.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id}).rowcount
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-events", type=int, default=200000)
+    parser.add_argument("--saved", type=int, default=50000)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=settings.ACCOUNT_DELETE_BATCH_ROWS)
+    parser.add_argument("--pause", type=float, default=settings.ACCOUNT_DELETE_PAUSE_SECONDS)
+    args = parser.parse_args()
+    settings.ACCOUNT_DELETE_BATCH_ROWS = args.batch
+    settings.ACCOUNT_DELETE_PAUSE_SECONDS = args.pause
+
+    engine = get_engine()
+    print(f"{args.save_events} save events, {args.saved} saved restaurants, {args.lists} lists per account")
+    print(f"batched: {args.batch} rows per transaction, {args.pause}s pause\n")
+
+    results, restaurant_ids = {}, []
+    for label in ("single cascade", "batched"):
+        start = time.perf_counter()
+        user_id, seeded = seed_account(engine, args.save_events, args.saved, args.lists)
+        restaurant_ids += seeded
+        print(f"seeded {label} account in {time.perf_counter() - start:.1f}s")
+        if label == "single cascade":
+            results[label] = measure(engine, user_id, lambda: cascade(engine, user_id))
+        else:
+            results[label] = measure(engine, user_id, lambda: account_deletion.run_deletion(engine, uuid.UUID(user_id)))
+
+    print(f"\n{'':<16} {'total':>10} {'txns':>6} {'longest txn':>12} {'WAL':>9} {'blocked FK check':>17}")
+    for label, r in results.items():
+        print(
+            f"{label:<16} {r['total_ms']:>8.0f}ms {r['transactions']:>6} {r['longest_ms']:>10.0f}ms "
+            f"{r['wal_mb']:>7.1f}MB {r['blocked_ms']:>15.0f}ms"
+        )
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM restaurants WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": restaurant_ids})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+GET /search/autocomplete latency, replaying keystroke traces.
+
+Seeds a library the way benchmarks/search.py does (one user with --rows saved
+restaurants and --lists lists, next to --other-rows restaurants saved by another
+user), then replays --traces typing sessions against it. Each trace picks one of
+the user's restaurant or list names and types it a character at a time up to its
+first two words, sometimes mistyping a letter and backspacing over it; every
+keystroke is one autocomplete lookup.
+
+Every keystroke is timed on both paths the endpoint can take:
+- index: the per-user PrefixIndex (the common case once it is built); the build,
+  paid once per data version, is timed separately
+- sql:   the text_pattern_ops prefix range scans used without Redis or for
+  libraries above AUTOCOMPLETE_INDEX_MAX_NAMES
+
+The Redis GET that validates the index (one round trip, ~0.2ms on a LAN) is not
+included. Everything runs in one transaction that is rolled back at the end.
+
+    python -m benchmarks.autocomplete --rows 10000
+    python -m benchmarks.autocomplete --rows 20000 --traces 500
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from app.api.v1.endpoints.search import list_names_stmt, restaurant_names_stmt
+from app.core.prefix_index import PrefixIndex, normalize_prefix
+from benchmarks._common import get_engine, summarize, timed
+from benchmarks.search import seed
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def keystroke_traces(names: list[str], count: int, rng: random.Random) -> list[list[str]]:
+    """The successive contents of the search box while typing each of `count` names."""
+    traces = []
+    for _ in range(count):
+        target = " ".join(rng.choice(names).split()[:2])
+        typed, trace = "", []
+        for ch in target:
+            if ch.isalpha() and rng.random() < 0.05:
+                trace.append(typed + rng.choice(LETTERS))  # typo ...
+                trace.append(typed)                         # ... and backspace
+            # Keep the case the name uses about half the time, like real typing
+            typed += ch if rng.random() < 0.5 else ch.lower()
+            trace.append(typed)
+        traces.append(trace)
+    return traces
+
+
+def build_index(conn, user_id: uuid.UUID) -> tuple[PrefixIndex, PrefixIndex]:
+    restaurants = PrefixIndex(
+        (row.key, (row.id, row.restaurant_id, row.name)) for row in conn.execute(restaurant_names_stmt(user_id)).all()
+    )
+    lists = PrefixIndex((row.key, (row.id, row.name)) for row in conn.execute(list_names_stmt(user_id)).all())
+    return restaurants, lists
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--other-rows", type=int, default=100000)
+    parser.add_argument("--traces", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=10, help="index builds to time")
+    parser.add_argument("--seed", type=int, default=40)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        try:
+            user_id = uuid.UUID(seed(conn, args.rows, args.lists, args.other_rows))
+            names = [row.name for row in conn.execute(restaurant_names_stmt(user_id)).all()]
+            names += [row.name for row in conn.execute(list_names_stmt(user_id)).all()]
+            traces = keystroke_traces(names, args.traces, random.Random(args.seed))
+            # A blank box is answered without a lookup
+            keystrokes = [prefix for trace in traces for prefix in map(normalize_prefix, trace) if prefix]
+            print(f"user {user_id}: {args.rows} saved, {args.lists} lists; other user: {args.other_rows} saved")
+            print(f"{len(traces)} traces, {len(keystrokes)} keystrokes\n")
+
+            print(summarize("index build (once per data version)", timed(lambda: build_index(conn, user_id), args.repeat)))
+            restaurants, lists = build_index(conn, user_id)
+
+            index_samples, sql_samples, hits = [], [], 0
+            for prefix in keystrokes:
+                start = time.perf_counter()
+                found = restaurants.match(prefix, args.limit), lists.match(prefix, args.limit)
+                index_samples.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                sql_found = (
+                    [(row.id, row.restaurant_id, row.name)
+                     for row in conn.execute(restaurant_names_stmt(user_id, prefix, args.limit)).all()],
+                    [(row.id, row.name) for row in conn.execute(list_names_stmt(user_id, prefix, args.limit)).all()],
+                )
+                sql_samples.append((time.perf_counter() - start) * 1000)
+
+                assert list(found[0]) == sql_found[0] and list(found[1]) == sql_found[1], prefix
+                hits += bool(found[0] or found[1])
+
+            print(summarize("keystroke, index", index_samples))
+            print(summarize("keystroke, sql", sql_samples))
+            print(f"{'worst keystroke, sql':<40} {max(sql_samples):8.2f}ms  ({hits}/{len(keystrokes)} with results)")
+
+            by_length: dict[int, list[float]] = {}
+            for prefix, ms in zip(keystrokes, sql_samples):
+                by_length.setdefault(min(len(prefix), 5), []).append(ms)
+            for length, samples in sorted(by_length.items()):
+                label = f"  sql, {length}{'+' if length == 5 else ''} chars typed"
+                print(summarize(label, samples))
+        finally:
+            conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+"""
+Synthetic dataset generator for scale testing indexes, pagination and the worker.
+
+Writes users, restaurants, lists, save_events and user_restaurants with Postgres
+COPY, streaming each table in batches: users are generated in chunks of
+--chunk-users, and --jobs processes each COPY a chunk's rows in one transaction
+on their own connection, so memory stays flat however many rows are generated.
+With the defaults it writes ~9M rows.
+
+The data is shaped like production rather than uniform:
+
+    restaurants       clustered: each of CITIES has --hotspots neighbourhoods, and
+                      restaurants scatter ~--hotspot-km around one of them; names
+                      come from a small vocabulary, so they collide, and
+                      --chain-share of them are chain branches sharing one name
+    popularity        restaurants are picked with Zipf weights (--zipf), so a few
+                      are saved by many users and most by few; --home-share of a
+                      user's saves come from their home city
+    user activity     saves per user are lognormal (--saves-mean, --saves-sigma),
+                      so most users save a little and a few save thousands
+    lists             Poisson(--lists-mean) per user; --unsorted-share of saves
+                      are in no list
+    save_events       one per saved restaurant (complete, with a caption), plus
+                      --failed-share failed and --pending-share pending events
+
+Generation is seeded (--seed) and every user draws from its own seeded stream,
+so a run is reproducible row for row, whatever --jobs and --chunk-users are.
+Timestamps spread over --days before --end-date. Generated rows are
+recognisable (emails @synthetic.invalid, place ids synthetic:...), and --clear
+removes them; loading refuses to start while any are left from an earlier run.
+
+Triggers stay enabled, so search vectors are maintained as the app expects;
+with them, the generated geohash column and the FK checks, loading runs at
+roughly 15k rows/s per job. On a large load into an empty or scratch database,
+--defer-indexes drops the secondary indexes first and rebuilds each with one sort
+at the end (primary key and unique indexes stay, so FK and unique checks still
+run).
+
+    python -m benchmarks.generate_dataset --users 100000 --restaurants 200000 --defer-indexes
+    python -m benchmarks.generate_dataset --users 1000 --saves-mean 500 --zipf 1.2 --seed 7
+    python -m benchmarks.generate_dataset --clear
+"""
+
+import argparse
+import bisect
+import itertools
+import math
+import multiprocessing
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+from sqlalchemy import text
+
+from benchmarks._common import get_engine
+
+EMAIL_DOMAIN = "synthetic.invalid"
+PLACE_ID_PREFIX = "synthetic:"
+
+# name, latitude, longitude, share of restaurants and users
+CITIES = [
+    ("New York", 40.7306, -73.9866, 0.22),
+    ("Los Angeles", 34.0522, -118.2437, 0.14),
+    ("Chicago", 41.8781, -87.6298, 0.09),
+    ("San Francisco", 37.7749, -122.4194, 0.08),
+    ("Austin", 30.2672, -97.7431, 0.05),
+    ("Miami", 25.7617, -80.1918, 0.05),
+    ("Seattle", 47.6062, -122.3321, 0.05),
+    ("Boston", 42.3601, -71.0589, 0.05),
+    ("London", 51.5072, -0.1276, 0.08),
+    ("Paris", 48.8566, 2.3522, 0.06),
+    ("Tokyo", 35.6762, 139.6503, 0.07),
+    ("Mexico City", 19.4326, -99.1332, 0.03),
+    ("Toronto", 43.6532, -79.3832, 0.03),
+]
+
+NAME_FIRST = [
+    "Golden", "Little", "Blue", "Red", "Old", "Lucky", "Happy", "Royal", "Green", "Silver",
+    "Sunny", "Urban", "Wild", "Smoky", "Corner", "Village", "Harbor", "Garden", "Night", "Salt",
+]
+NAME_LAST = [
+    "Ramen", "Taqueria", "Bistro", "Kitchen", "Pizza", "Sushi", "Noodle Bar", "Cafe", "Grill",
+    "Dumpling House", "Trattoria", "Bakery", "Diner", "Pho", "Izakaya", "BBQ", "Oyster Bar", "Curry House",
+]
+CHAINS = [
+    "Joe's Pizza", "Shake Shack", "Sweetgreen", "Ippudo", "Blue Bottle Coffee", "Din Tai Fung",
+    "Los Tacos No. 1", "Katz's", "Dishoom", "Pret A Manger",
+]
+LIST_NAMES = [
+    "Date night", "Brunch", "Want to try", "Favorites", "Cheap eats", "Coffee", "Late night",
+    "Birthday ideas", "Tokyo trip", "Paris trip", "Work lunch", "Pizza", "Ramen", "With the family",
+]
+CAPTION_OPENERS = [
+    "Best {dish} in {city}", "Still dreaming about this {dish}", "Hidden gem for {dish}",
+    "This {dish} is worth the line", "{city} spot you need to know", "Finally tried the {dish} here",
+]
+DISHES = ["ramen", "tacos", "pizza", "omakase", "dumplings", "croissants", "smash burgers", "pho", "khachapuri"]
+HASHTAGS = ["#foodie", "#eeeeeats", "#foodstagram", "#nomnom", "#restaurant", "#hiddengem", "#datenight"]
+ERRORS = ["No restaurant found in caption", "Instagram post is private", "Place lookup timed out"]
+
+
+# ----------------------------------------------------------------------------
+# COPY streaming
+# ----------------------------------------------------------------------------
+
+# Rows are tuples of COPY text-format fields, written ready to send: generated
+# values never contain tabs or backslashes, and free text escapes its own newlines
+NULL = "\\N"
+
+
+def copy_lines(rows: Iterable[tuple]) -> Iterator[bytes]:
+    """COPY text-format lines for rows, joined 1000 rows at a time."""
+    it = iter(rows)
+    while True:
+        batch = list(itertools.islice(it, 1000))
+        if not batch:
+            return
+        yield "".join("\t".join(row) + "\n" for row in batch).encode()
+
+
+class CopyStream:
+    """A read()-able file over an iterator of byte chunks, for cursor.copy_expert."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = memoryview(b"")
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._buffer:
+            self._buffer = memoryview(next(self._chunks, b""))
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return bytes(data)
+
+
+class _Counter:
+    def __init__(self, rows: Iterable[tuple]):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def copy_rows(cursor, table: str, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    """Stream rows into table with COPY; returns the number of rows written."""
+    counted = _Counter(rows)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", CopyStream(copy_lines(counted)), size=65536)
+    return counted.count
+
+
+# ----------------------------------------------------------------------------
+# Generation
+# ----------------------------------------------------------------------------
+
+def new_id(rng: random.Random) -> str:
+    """A random version 4 UUID (formatted directly; uuid.UUID is several times slower)."""
+    h = f"{rng.getrandbits(128):032x}"
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+
+def stream(seed: int, name: str, index: int = 0) -> random.Random:
+    """An independent, reproducible random stream per (table, user)."""
+    return random.Random(f"{seed}:{name}:{index}")
+
+
+def timestamp(end: datetime, days: float, rng: random.Random) -> datetime:
+    # Skewed towards recent activity
+    return end - timedelta(days=days * rng.random() ** 2)
+
+
+def fmt(ts: datetime) -> str:
+    return ts.isoformat(" ", "seconds")
+
+
+class Restaurants:
+    """Generated restaurants, with Zipf popularity weights overall and per city."""
+
+    def __init__(self, count: int, args: argparse.Namespace):
+        rng = stream(args.seed, "restaurants")
+        self.ids: list[str] = []
+        self.city_of: list[int] = []
+        self.rows: list[tuple] = []
+        city_weights = [c[3] for c in CITIES]
+        hotspots = [
+            [(lat + rng.gauss(0, 0.06), lng + rng.gauss(0, 0.06)) for _ in range(args.hotspots)]
+            for _, lat, lng, _ in CITIES
+        ]
+        sigma = args.hotspot_km / 111.32
+        for _ in range(count):
+            city = rng.choices(range(len(CITIES)), city_weights)[0]
+            lat, lng = rng.choice(hotspots[city])
+            lat += rng.gauss(0, sigma)
+            lng += rng.gauss(0, sigma / max(0.2, math.cos(math.radians(lat))))
+            if rng.random() < args.chain_share:
+                name = rng.choice(CHAINS)
+            else:
+                name = f"{rng.choice(NAME_FIRST)} {rng.choice(NAME_LAST)}"
+            restaurant_id = new_id(rng)
+            self.ids.append(restaurant_id)
+            self.city_of.append(city)
+            self.rows.append((
+                restaurant_id, name, f"{lat:.6f}", f"{lng:.6f}", CITIES[city][0],
+                rng.choice(("$", "$$", "$$$", "$$$$", NULL)),
+                f"{PLACE_ID_PREFIX}{restaurant_id}", fmt(timestamp(args.end, args.days, rng)),
+            ))
+
+        # Popularity rank is independent of position, city and name
+        ranks = list(range(1, count + 1))
+        rng.shuffle(ranks)
+        weights = [1 / rank ** args.zipf for rank in ranks]
+        self.cum_weights = list(itertools.accumulate(weights))
+        self.by_city: list[tuple[list[int], list[float]]] = []
+        for city in range(len(CITIES)):
+            members = [i for i in range(count) if self.city_of[i] == city]
+            self.by_city.append((members, list(itertools.accumulate(weights[i] for i in members))))
+
+    def pick(self, rng: random.Random, home_city: int, home_share: float) -> int:
+        members, cum = self.by_city[home_city]
+        if members and rng.random() < home_share:
+            return members[bisect.bisect(cum, rng.random() * cum[-1])]
+        return bisect.bisect(self.cum_weights, rng.random() * self.cum_weights[-1])
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    # Knuth; means here are small
+    limit, k, p = math.exp(-mean), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def caption(rng: random.Random, city: str) -> str:
+    opener = rng.choice(CAPTION_OPENERS).format(dish=rng.choice(DISHES), city=city)
+    tags = " ".join(rng.sample(HASHTAGS, rng.randint(1, 4)))
+    # \\n: an escaped newline in COPY text format
+    return f"{opener} 🍜\\n\\n{tags}" if rng.random() < 0.5 else f"{opener}. {tags}"
+
+
+def user_chunk(first: int, count: int, restaurants: Restaurants, args: argparse.Namespace) -> dict[str, list[tuple]]:
+    """Rows for users first..first+count, per table."""
+    mu = math.log(args.saves_mean) - args.saves_sigma ** 2 / 2
+    city_weights = [c[3] for c in CITIES]
+    tables = {"users": [], "lists": [], "save_events": [], "user_restaurants": []}
+    for n in range(first, first + count):
+        rng = stream(args.seed, "user", n)
+        user_id = new_id(rng)
+        joined = timestamp(args.end, args.days, rng)
+        tables["users"].append(
+            (user_id, f"user{n}@{EMAIL_DOMAIN}", f"user_synthetic_{args.seed}_{n}", f"User {n}", fmt(joined))
+        )
+        list_ids = []
+        for i, name in enumerate(rng.sample(LIST_NAMES, min(len(LIST_NAMES), poisson(rng, args.lists_mean)))):
+            list_ids.append(new_id(rng))
+            created = fmt(joined + timedelta(minutes=i))
+            tables["lists"].append((list_ids[-1], user_id, name, created, created))
+
+        home_city = rng.choices(range(len(CITIES)), city_weights)[0]
+        saves = min(args.saves_max, len(restaurants.ids), int(rng.lognormvariate(mu, args.saves_sigma)))
+        picked: set[int] = set()
+        span_days = max(0.0, (args.end - joined).total_seconds() / 86400)
+        for _ in range(saves * 4):
+            if len(picked) >= saves:
+                break
+            index = restaurants.pick(rng, home_city, args.home_share)
+            if index in picked:
+                continue
+            picked.add(index)
+            event_id = new_id(rng)
+            saved_at = args.end - timedelta(days=span_days * rng.random())
+            tables["save_events"].append((
+                event_id, user_id, "instagram", f"https://www.instagram.com/p/{event_id[:11]}/",
+                caption(rng, CITIES[restaurants.city_of[index]][0]), NULL, "complete", NULL, fmt(saved_at),
+            ))
+            list_id = rng.choice(list_ids) if list_ids and rng.random() >= args.unsorted_share else NULL
+            tables["user_restaurants"].append((
+                new_id(rng), user_id, restaurants.ids[index], list_id, event_id,
+                fmt(saved_at + timedelta(seconds=rng.randint(3, 90))),
+                "t" if rng.random() < 0.1 else "f", "t" if rng.random() < 0.3 else "f",
+                fmt(saved_at + timedelta(seconds=90)),
+            ))
+        for status, share in (("failed", args.failed_share), ("pending", args.pending_share)):
+            for _ in range(sum(rng.random() < share for _ in range(max(1, len(picked))))):
+                event_id = new_id(rng)
+                tables["save_events"].append((
+                    event_id, user_id, "instagram", f"https://www.instagram.com/p/{event_id[:11]}/",
+                    caption(rng, CITIES[home_city][0]), NULL, status,
+                    rng.choice(ERRORS) if status == "failed" else NULL,
+                    fmt(args.end - timedelta(days=span_days * rng.random())),
+                ))
+    return tables
+
+
+COLUMNS = {
+    "restaurants": ("id", "name", "latitude", "longitude", "city", "price_range", "google_place_id", "created_at"),
+    "users": ("id", "email", "clerk_user_id", "name", "created_at"),
+    "lists": ("id", "user_id", "name", "created_at", "updated_at"),
+    "save_events": ("id", "user_id", "source", "source_url", "raw_caption", "target_list_id", "status",
+                    "error_message", "created_at"),
+    "user_restaurants": ("id", "user_id", "restaurant_id", "list_id", "source_event_id", "created_at",
+                         "is_favorite", "is_visited", "updated_at"),
+}
+# FK order
+USER_TABLES = ("users", "lists", "save_events", "user_restaurants")
+
+
+@contextmanager
+def deferred_indexes(engine, tables: Iterable[str]) -> Iterator[None]:
+    """
+    Drop the tables' secondary indexes for the duration, then rebuild them. Unique
+    indexes stay, whether they back a constraint (primary keys) or were created as
+    plain unique indexes (users.email, ...), so FKs and conflicts are still checked.
+    """
+    with engine.begin() as conn:
+        indexes = conn.execute(
+            text(
+                """
+                SELECT ic.relname AS indexname, pg_get_indexdef(x.indexrelid) AS indexdef
+                FROM pg_index x
+                JOIN pg_class ic ON ic.oid = x.indexrelid
+                JOIN pg_class tc ON tc.oid = x.indrelid
+                WHERE tc.relnamespace = current_schema()::regnamespace AND tc.relname = ANY(:tables)
+                  AND NOT x.indisunique
+                  -- nor indexes backing exclusion constraints
+                  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+                """
+            ),
+            {"tables": list(tables)},
+        ).all()
+        for index in indexes:
+            conn.execute(text(f'DROP INDEX "{index.indexname}"'))
+    print(f"dropped {len(indexes)} secondary indexes")
+    try:
+        yield
+    finally:
+        start = time.perf_counter()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SET maintenance_work_mem = '512MB'"))
+            for index in indexes:
+                try:
+                    conn.execute(text(index.indexdef))
+                except Exception:
+                    print(f"could not rebuild {index.indexname}; recreate it with:\n  {index.indexdef};")
+                    raise
+        print(f"rebuilt {len(indexes)} indexes in {time.perf_counter() - start:.1f}s")
+
+
+# Per worker process: the restaurants (inherited through fork) and a connection
+_restaurants = None
+_connection = None
+
+
+def _start_worker() -> None:
+    global _connection
+    _connection = get_engine().raw_connection()
+    with _connection.cursor() as cursor:
+        # A crash loses at most the chunks in flight, which a rerun regenerates anyway
+        cursor.execute("SET synchronous_commit = off")
+    _connection.commit()
+
+
+def _load_chunk(job: tuple[int, int, argparse.Namespace]) -> dict[str, int]:
+    first, count, args = job
+    tables = user_chunk(first, count, _restaurants, args)
+    counts = {}
+    with _connection.cursor() as cursor:
+        for table in USER_TABLES:
+            counts[table] = copy_rows(cursor, table, COLUMNS[table], tables[table])
+    _connection.commit()
+    return counts
+
+
+def load(args: argparse.Namespace, totals: dict[str, int], start: float) -> None:
+    global _restaurants
+    _restaurants = Restaurants(args.restaurants, args)
+    _start_worker()
+    with _connection.cursor() as cursor:
+        totals["restaurants"] = copy_rows(cursor, "restaurants", COLUMNS["restaurants"], _restaurants.rows)
+    _connection.commit()
+    _restaurants.rows = []
+    print(f"restaurants: {totals['restaurants']} in {time.perf_counter() - start:.1f}s")
+
+    jobs = [
+        (first, min(args.chunk_users, args.users - first), args)
+        for first in range(0, args.users, args.chunk_users)
+    ]
+    # Chunks are independent (every user has their own random stream), so the output
+    # does not depend on --jobs or on the order chunks finish in
+    with multiprocessing.get_context("fork").Pool(args.jobs, initializer=_start_worker) as pool:
+        for done, counts in enumerate(pool.imap_unordered(_load_chunk, jobs), 1):
+            for table, count in counts.items():
+                totals[table] += count
+            rows = sum(totals.values())
+            print(f"chunk {done}/{len(jobs)}: {rows} rows, {rows / (time.perf_counter() - start):.0f} rows/s")
+
+
+# Foreign keys whose referencing column leads no index: without one, each deleted
+# list or restaurant would scan these tables for rows to update or check
+CLEAR_INDEXES = {
+    "user_restaurants": ["list_id", "restaurant_id"],
+    "save_events": ["target_list_id"],
+    "notes": ["restaurant_id"],
+}
+
+
+def generated_rows_left(engine) -> bool:
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM users WHERE email LIKE '%@{EMAIL_DOMAIN}') "
+                f"OR EXISTS (SELECT 1 FROM restaurants WHERE google_place_id LIKE '{PLACE_ID_PREFIX}%')"
+            )
+        ).scalar()
+
+
+def clear(engine) -> None:
+    with engine.begin() as conn:
+        names = []
+        for table, columns in CLEAR_INDEXES.items():
+            for column in columns:
+                names.append(f"tmp_clear_{table}_{column}")
+                conn.execute(text(f"CREATE INDEX {names[-1]} ON {table} ({column})"))
+        users = conn.execute(text(f"DELETE FROM users WHERE email LIKE '%@{EMAIL_DOMAIN}'")).rowcount
+        restaurants = conn.execute(
+            text(f"DELETE FROM restaurants WHERE google_place_id LIKE '{PLACE_ID_PREFIX}%'")
+        ).rowcount
+        for name in names:
+            conn.execute(text(f"DROP INDEX {name}"))
+    print(f"removed {users} users (and their rows) and {restaurants} restaurants")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--restaurants", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--chunk-users", type=int, default=5000, help="users per COPY transaction")
+    parser.add_argument("--jobs", type=int, default=4, help="parallel loading processes (connections)")
+    parser.add_argument("--saves-mean", type=float, default=40)
+    parser.add_argument("--saves-sigma", type=float, default=1.2, help="lognormal sigma of saves per user")
+    parser.add_argument("--saves-max", type=int, default=5000)
+    parser.add_argument("--zipf", type=float, default=1.0, help="restaurant popularity exponent")
+    parser.add_argument("--home-share", type=float, default=0.8, help="share of saves in the user's home city")
+    parser.add_argument("--lists-mean", type=float, default=4)
+    parser.add_argument("--unsorted-share", type=float, default=0.25)
+    parser.add_argument("--failed-share", type=float, default=0.03)
+    parser.add_argument("--pending-share", type=float, default=0.005)
+    parser.add_argument("--hotspots", type=int, default=25, help="neighbourhood clusters per city")
+    parser.add_argument("--hotspot-km", type=float, default=0.8)
+    parser.add_argument("--chain-share", type=float, default=0.05)
+    parser.add_argument("--days", type=float, default=730, help="history length")
+    parser.add_argument("--end-date", type=datetime.fromisoformat, default=datetime(2026, 1, 1), dest="end")
+    parser.add_argument(
+        "--defer-indexes", action="store_true",
+        help="drop secondary indexes during the load and rebuild them afterwards (much faster for large loads)",
+    )
+    parser.add_argument("--clear", action="store_true", help="remove previously generated rows and exit")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if args.clear:
+        clear(engine)
+        return
+    if generated_rows_left(engine):
+        # A rerun would load the same rows again
+        sys.exit("generated rows from an earlier run are still there; remove them with --clear first")
+
+    start = time.perf_counter()
+    totals = dict.fromkeys(COLUMNS, 0)
+    if args.defer_indexes:
+        with deferred_indexes(engine, COLUMNS):
+            load(args, totals, start)
+    else:
+        load(args, totals, start)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in COLUMNS:
+            conn.execute(text(f"ANALYZE {table}"))
+    elapsed = time.perf_counter() - start
+    print(f"\n{sum(totals.values())} rows in {elapsed:.1f}s")
+    for table, count in totals.items():
+        print(f"  {table:<18} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
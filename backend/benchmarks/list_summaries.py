@@ -0,0 +1,67 @@
+"""
+List summaries: one aggregate query vs. one query per list.
+
+Seeds a user with --lists lists holding --per-list restaurants each, then times
+    - list_summaries_stmt (what GET /lists and /home run)
+    - the N+1 pattern the app used before: list rows, then every list's restaurants
+
+    python -m benchmarks.list_summaries --lists 500 --per-list 40
+"""
+
+import argparse
+import uuid
+
+from sqlalchemy import text
+
+from benchmarks._common import bench_user, get_engine, seed_saved_restaurants, summarize, timed
+
+from app.api.v1.endpoints.lists import list_summaries_stmt
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lists", type=int, default=300)
+    parser.add_argument("--per-list", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn, bench_user(conn) as user_id:
+        list_ids = [str(uuid.uuid4()) for _ in range(args.lists)]
+        conn.execute(
+            text(
+                "INSERT INTO lists (id, user_id, name, created_at, updated_at) "
+                "SELECT id, :user_id, 'List ' || n, now(), now() "
+                "FROM unnest(CAST(:ids AS uuid[])) WITH ORDINALITY AS t(id, n)"
+            ),
+            {"user_id": user_id, "ids": list_ids},
+        )
+        seed_saved_restaurants(conn, user_id, args.lists * args.per_list, list_ids)
+        print(f"user {user_id}: {args.lists} lists x {args.per_list} restaurants")
+
+        stmt = list_summaries_stmt(uuid.UUID(user_id))
+
+        def aggregate():
+            return conn.execute(stmt).all()
+
+        def n_plus_one():
+            ids = conn.execute(text("SELECT id FROM lists WHERE user_id = :u"), {"u": user_id}).scalars().all()
+            for list_id in ids:
+                conn.execute(
+                    text(
+                        "SELECT ur.*, r.* FROM user_restaurants ur JOIN restaurants r ON r.id = ur.restaurant_id "
+                        "WHERE ur.user_id = :u AND ur.list_id = :l"
+                    ),
+                    {"u": user_id, "l": list_id},
+                ).all()
+
+        rows = aggregate()
+        assert len(rows) == args.lists
+        assert sum(row.restaurant_count for row in rows) == args.lists * args.per_list
+
+        print(summarize("aggregate (1 query)", timed(aggregate, args.repeat)))
+        print(summarize(f"N+1 ({args.lists + 1} queries)", timed(n_plus_one, max(3, args.repeat // 10))))
+
+
+if __name__ == "__main__":
+    main()
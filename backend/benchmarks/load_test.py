@@ -0,0 +1,527 @@
+"""
+HTTP load test: the API under mixed traffic, with p95 regression gates.
+
+Boots the app with uvicorn against BENCH_DATABASE_URL, with Clerk stubbed out: a
+local HTTP server publishes the JWKS of a freshly generated RSA key and every
+seeded user gets a token signed with it, so requests take the production auth
+path (JWKS lookup, RS256 verification, user cache).
+
+Seeds --users accounts (--lists lists, --saved saved restaurants each with its
+save event, ~20% unsorted, notes on ~20%), then --concurrency virtual users, each
+acting as one seeded user, run this mix for --duration seconds:
+
+    home polling   GET /home, conditional on the last ETag            50%
+    list reads     GET /lists, then one list's restaurants            25%
+    toggles        POST /restaurants/{id}/favorite or /visited        15%
+    save bursts    3-8 POST /save-events back to back                 10%
+
+and it reports throughput plus p50 / p95 / p99 per route. With --save-baseline
+the results are written to --baseline; otherwise, if that file exists, the run
+fails (exit 1) when a route's p95 exceeds its baseline p95 by more than
+--tolerance (and --min-delta-ms), or when any request fails (4xx other than 429,
+or 5xx other than 503). Either way, more than --max-shed of a route's requests
+answered 429/503 ("shed" by admission control) fails the run, since its
+latencies would then measure the rejection path; no baseline is written.
+
+The server inherits this environment, so settings can be overridden as usual.
+SERVER_DEFAULTS apply unless set: the per-user rate limit is lifted (virtual
+users are faster than people) and so is the queue-depth limit. It needs Redis at
+--redis-url (default REDIS_URL) for its caches and the Celery broker. No worker
+runs: the harness empties the Celery queue before the run, every
+--drain-interval seconds during it and after it, so queued extraction jobs are
+never replayed against the removed rows. Use a scratch Redis if a real worker
+shares the broker. Save events stay pending and are removed with the seeded
+users.
+
+    python -m benchmarks.load_test --users 100 --concurrency 32 --duration 60
+    python -m benchmarks.load_test --save-baseline
+    python -m benchmarks.load_test --workers 4 --tolerance 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+
+import httpx
+import jwt
+import redis
+from cryptography.hazmat.primitives.asymmetric import rsa
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from benchmarks._common import BENCH_DATABASE_URL, get_engine
+from app.core import admission
+from app.core.config import settings
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "load_test_baseline.json")
+ISSUER = "https://clerk.load-test.invalid"
+KEY_ID = "load-test"
+
+# Server settings, unless set in the environment
+SERVER_DEFAULTS = {
+    "RATE_LIMIT_PER_SECOND": "1000000",
+    "RATE_LIMIT_BURST": "1000000",
+    # Backstop for the drain below, which keeps the queue near empty
+    "ADMISSION_MAX_QUEUE_DEPTH": "1000000",
+}
+
+
+# ----------------------------------------------------------------------------
+# Clerk stub
+# ----------------------------------------------------------------------------
+
+class StubClerk:
+    """Signs session tokens with a local key and serves its JWKS over HTTP."""
+
+    def __init__(self):
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(self.key.public_key(), as_dict=True)
+        body = json.dumps({"keys": [{**jwk, "kid": KEY_ID, "use": "sig", "alg": "RS256"}]}).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.jwks_url = f"http://127.0.0.1:{self.server.server_port}/.well-known/jwks.json"
+
+    def token(self, clerk_user_id: str, email: str, ttl_seconds: int) -> str:
+        now = int(time.time())
+        claims = {"sub": clerk_user_id, "email": email, "iss": ISSUER, "iat": now, "exp": now + ttl_seconds}
+        return jwt.encode(claims, self.key, algorithm="RS256", headers={"kid": KEY_ID})
+
+    def close(self) -> None:
+        self.server.shutdown()
+
+
+# ----------------------------------------------------------------------------
+# Dataset
+# ----------------------------------------------------------------------------
+
+@dataclass
+class Account:
+    user_id: str
+    clerk_user_id: str
+    email: str
+    list_ids: list[str]
+    restaurant_ids: list[str]
+    token: str = ""
+
+
+def seed_accounts(engine: Engine, users: int, lists: int, saved: int) -> list[Account]:
+    run = uuid.uuid4().hex[:8]
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                "INSERT INTO users (id, email, clerk_user_id, created_at) "
+                "SELECT gen_random_uuid(), 'load-' || :run || '-' || g || '@example.com', "
+                "'user_load_' || :run || '_' || g, now() FROM generate_series(1, :users) g "
+                "RETURNING id, clerk_user_id, email"
+            ),
+            {"run": run, "users": users},
+        ).all()
+        ids = [str(row.id) for row in rows]
+        conn.execute(
+            text(
+                "INSERT INTO lists (id, user_id, name, created_at, updated_at) "
+                "SELECT gen_random_uuid(), u.id, 'List ' || g, now(), now() "
+                "FROM unnest(CAST(:ids AS uuid[])) AS u(id), generate_series(1, :lists) g"
+            ),
+            {"ids": ids, "lists": lists},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                "SELECT gen_random_uuid(), u.id, 'instagram', 'https://www.instagram.com/p/load' || g || '/', "
+                "'complete', now() - g * interval '1 minute' "
+                "FROM unnest(CAST(:ids AS uuid[])) AS u(id), generate_series(1, :saved) g"
+            ),
+            {"ids": ids, "saved": saved},
+        )
+        conn.execute(
+            text(
+                """
+                WITH events AS (
+                    SELECT id, user_id, row_number() OVER () AS n
+                    FROM save_events WHERE user_id = ANY(CAST(:ids AS uuid[]))
+                ), r AS (
+                    INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                    SELECT gen_random_uuid(), 'Load ' || n, 40.70 + random() * 0.1, -74.02 + random() * 0.1,
+                           'New York', now()
+                    FROM events
+                    RETURNING id
+                ), numbered AS (
+                    SELECT id, row_number() OVER () AS n FROM r
+                )
+                INSERT INTO user_restaurants (id, user_id, restaurant_id, list_id, source_event_id,
+                                              is_favorite, is_visited, created_at, updated_at)
+                SELECT gen_random_uuid(), events.user_id, numbered.id,
+                       CASE WHEN events.n % 5 = 0 THEN NULL ELSE
+                           (SELECT id FROM lists WHERE user_id = events.user_id
+                            ORDER BY id OFFSET events.n % :lists LIMIT 1)
+                       END,
+                       events.id, random() < 0.1, random() < 0.3,
+                       now() - (events.n || ' seconds')::interval, now()
+                FROM numbered JOIN events USING (n)
+                """
+            ),
+            {"ids": ids, "lists": lists},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at) "
+                "SELECT gen_random_uuid(), user_id, restaurant_id, 'Loved the tasting menu', now(), now() "
+                "FROM user_restaurants WHERE user_id = ANY(CAST(:ids AS uuid[])) AND random() < 0.2"
+            ),
+            {"ids": ids},
+        )
+        list_rows = conn.execute(
+            text("SELECT user_id, id FROM lists WHERE user_id = ANY(CAST(:ids AS uuid[]))"), {"ids": ids}
+        ).all()
+        saved_rows = conn.execute(
+            text("SELECT user_id, restaurant_id FROM user_restaurants WHERE user_id = ANY(CAST(:ids AS uuid[]))"),
+            {"ids": ids},
+        ).all()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("users", "lists", "save_events", "restaurants", "user_restaurants", "notes"):
+            conn.execute(text(f"ANALYZE {table}"))
+
+    lists_by_user, saved_by_user = defaultdict(list), defaultdict(list)
+    for row in list_rows:
+        lists_by_user[str(row.user_id)].append(str(row.id))
+    for row in saved_rows:
+        saved_by_user[str(row.user_id)].append(str(row.restaurant_id))
+    return [
+        Account(str(row.id), row.clerk_user_id, row.email, lists_by_user[str(row.id)], saved_by_user[str(row.id)])
+        for row in rows
+    ]
+
+
+def remove_accounts(engine: Engine, accounts: list[Account]) -> None:
+    ids = [account.user_id for account in accounts]
+    with engine.begin() as conn:
+        restaurant_ids = conn.execute(
+            text("SELECT restaurant_id FROM user_restaurants WHERE user_id = ANY(CAST(:ids AS uuid[]))"),
+            {"ids": ids},
+        ).scalars().all()
+        conn.execute(text("DELETE FROM users WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": ids})
+    # As in benchmarks._common.bench_user: clear the cascade's dead rows before the
+    # restaurant deletes' FK checks scan user_restaurants
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM user_restaurants"))
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM restaurants WHERE id = ANY(CAST(:ids AS uuid[]))"),
+            {"ids": [str(rid) for rid in restaurant_ids]},
+        )
+
+
+# ----------------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def run_server(jwks_url: str, redis_url: str, workers: int) -> Iterator[str]:
+    """Start uvicorn serving app.main:app and yield its base URL once /health answers."""
+    port = free_port()
+    env = {
+        **SERVER_DEFAULTS,
+        **os.environ,
+        "DATABASE_URL": BENCH_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+        "REDIS_URL": redis_url,
+        "CLERK_JWKS_URL": jwks_url,
+        "CLERK_JWT_ISSUER": ISSUER,
+    }
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if server.poll() is not None or time.monotonic() > deadline:
+                log.seek(0)
+                sys.exit(f"server did not start:\n{log.read().decode(errors='replace')[-2000:]}")
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        log.close()
+
+
+@contextmanager
+def drained_queue(redis_url: str, interval: float) -> Iterator[None]:
+    """Stand in for the Celery worker: discard queued extraction jobs before, during and after."""
+    client = redis.Redis.from_url(redis_url)
+    queue = admission.extraction_queue.queue
+    client.delete(queue)
+    stop = threading.Event()
+
+    def drain():
+        while not stop.wait(interval):
+            client.delete(queue)
+
+    thread = threading.Thread(target=drain, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+        client.delete(queue)
+        client.close()
+
+
+# ----------------------------------------------------------------------------
+# Traffic
+# ----------------------------------------------------------------------------
+
+@dataclass
+class Results:
+    latencies: dict = field(default_factory=lambda: defaultdict(list))
+    statuses: dict = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+
+    def record(self, route: str, ms: float, status: int) -> None:
+        self.latencies[route].append(ms)
+        self.statuses[route][status] += 1
+
+
+async def request(client: httpx.AsyncClient, results: Results, route: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.TransportError:
+        results.record(route, (time.perf_counter() - start) * 1000, 599)
+        return None
+    results.record(route, (time.perf_counter() - start) * 1000, response.status_code)
+    return response
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, account: Account, results: Results, rng: random.Random):
+        self.client = client
+        self.account = account
+        self.results = results
+        self.rng = rng
+        self.headers = {"Authorization": f"Bearer {account.token}"}
+        self.home_etag: Optional[str] = None
+
+    async def home(self):
+        headers = dict(self.headers)
+        if self.home_etag:
+            headers["If-None-Match"] = self.home_etag
+        response = await request(self.client, self.results, "GET /home", "GET", "/api/v1/home", headers=headers)
+        if response is not None and response.status_code == 200:
+            self.home_etag = response.headers.get("ETag")
+
+    async def list_reads(self):
+        await request(self.client, self.results, "GET /lists", "GET", "/api/v1/lists/", headers=self.headers)
+        if self.account.list_ids:
+            list_id = self.rng.choice(self.account.list_ids)
+            await request(
+                self.client, self.results, "GET /lists/{list_id}/restaurants", "GET",
+                f"/api/v1/lists/{list_id}/restaurants", headers=self.headers,
+            )
+
+    async def toggle(self):
+        if not self.account.restaurant_ids:
+            return
+        flag = self.rng.choice(("favorite", "visited"))
+        await request(
+            self.client, self.results, f"POST /restaurants/{{restaurant_id}}/{flag}", "POST",
+            f"/api/v1/restaurants/{self.rng.choice(self.account.restaurant_ids)}/{flag}", headers=self.headers,
+        )
+
+    async def save_burst(self):
+        for _ in range(self.rng.randint(3, 8)):
+            body = {
+                "source_url": f"https://www.instagram.com/p/{uuid.uuid4().hex[:11]}/",
+                "raw_caption": "Best ramen in the East Village",
+            }
+            await request(self.client, self.results, "POST /save-events", "POST", "/api/v1/save-events/",
+                          headers=self.headers, json=body)
+
+    async def run(self, deadline: float, think_seconds: float):
+        scenarios = (self.home, self.list_reads, self.toggle, self.save_burst)
+        weights = (50, 25, 15, 10)
+        while time.monotonic() < deadline:
+            await self.rng.choices(scenarios, weights)[0]()
+            if think_seconds:
+                await asyncio.sleep(self.rng.expovariate(1 / think_seconds))
+
+
+async def drive(base_url: str, accounts: list[Account], concurrency: int, duration: float,
+                think_seconds: float, seed: int) -> tuple[Results, float]:
+    results = Results()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        users = [
+            VirtualUser(client, accounts[i % len(accounts)], results, random.Random(seed + i))
+            for i in range(concurrency)
+        ]
+        start = time.perf_counter()
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(user.run(deadline, think_seconds) for user in users))
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+# ----------------------------------------------------------------------------
+# Report
+# ----------------------------------------------------------------------------
+
+def summarize_routes(results: Results, elapsed: float) -> dict:
+    summary = {}
+    for route, samples in sorted(results.latencies.items()):
+        cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else [samples[0]] * 99
+        statuses = results.statuses[route]
+        summary[route] = {
+            "requests": len(samples),
+            "rps": len(samples) / elapsed,
+            "p50": cuts[49],
+            "p95": cuts[94],
+            "p99": cuts[98],
+            "shed": statuses.get(429, 0) + statuses.get(503, 0),
+            # Every request the harness sends is valid, so any other 4xx is a failure too
+            "errors": sum(count for status, count in statuses.items() if status >= 400 and status not in (429, 503)),
+        }
+    return summary
+
+
+def overloaded(summary: dict, max_shed: float) -> list[str]:
+    """Routes that shed more than max_shed of their requests, so their latencies don't count."""
+    return [
+        f"{route}: {stats['shed']} of {stats['requests']} requests shed (> {max_shed:.0%})"
+        for route, stats in summary.items()
+        if stats["shed"] > max_shed * stats["requests"]
+    ]
+
+
+def regressions(summary: dict, baseline: dict, tolerance: float, min_delta_ms: float, max_shed: float) -> list[str]:
+    failures = overloaded(summary, max_shed)
+    for route, stats in summary.items():
+        if stats["errors"]:
+            failures.append(f"{route}: {stats['errors']} failed requests")
+        before = baseline.get(route)
+        if before is None:
+            continue
+        limit = before["p95"] * (1 + tolerance)
+        if stats["p95"] > limit and stats["p95"] - before["p95"] > min_delta_ms:
+            failures.append(f"{route}: p95 {stats['p95']:.1f}ms > {limit:.1f}ms (baseline {before['p95']:.1f}ms)")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--lists", type=int, default=8)
+    parser.add_argument("--saved", type=int, default=200, help="saved restaurants per user")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of traffic before measuring")
+    parser.add_argument("--think", type=float, default=0.05, help="mean seconds between a user's scenarios")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth over the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=5, help="ignore p95 growth smaller than this")
+    parser.add_argument("--max-shed", type=float, default=0.01, help="allowed share of a route's requests shed")
+    parser.add_argument("--redis-url", default=settings.REDIS_URL, help="Redis for the server's caches and broker")
+    parser.add_argument("--drain-interval", type=float, default=0.5, help="seconds between Celery queue purges")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    clerk = StubClerk()
+    start = time.perf_counter()
+    accounts = seed_accounts(engine, args.users, args.lists, args.saved)
+    print(f"seeded {args.users} users x {args.lists} lists x {args.saved} saved in {time.perf_counter() - start:.1f}s")
+    try:
+        ttl = int(args.warmup + args.duration) + 3600
+        for account in accounts:
+            account.token = clerk.token(account.clerk_user_id, account.email, ttl)
+        with drained_queue(args.redis_url, args.drain_interval), \
+                run_server(clerk.jwks_url, args.redis_url, args.workers) as base_url:
+            if args.warmup:
+                asyncio.run(drive(base_url, accounts, args.concurrency, args.warmup, args.think, args.seed))
+            results, elapsed = asyncio.run(
+                drive(base_url, accounts, args.concurrency, args.duration, args.think, args.seed + 1)
+            )
+    finally:
+        remove_accounts(engine, accounts)
+        clerk.close()
+
+    summary = summarize_routes(results, elapsed)
+    total = sum(stats["requests"] for stats in summary.values())
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.0f} req/s, "
+          f"{args.concurrency} virtual users, {args.workers} worker(s)\n")
+    print(f"{'route':<44} {'reqs':>7} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'shed':>6} {'errors':>6}")
+    for route, stats in summary.items():
+        print(
+            f"{route:<44} {stats['requests']:>7} {stats['rps']:>7.1f} {stats['p50']:>6.1f}ms "
+            f"{stats['p95']:>6.1f}ms {stats['p99']:>6.1f}ms {stats['shed']:>6} {stats['errors']:>6}"
+        )
+
+    if args.save_baseline:
+        failures = overloaded(summary, args.max_shed)
+        if failures:
+            print("\nFAILED, baseline not written:\n" + "\n".join(f"  {failure}" for failure in failures))
+            sys.exit(1)
+        with open(args.baseline, "w") as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    with open(args.baseline) as f:
+        failures = regressions(summary, json.load(f), args.tolerance, args.min_delta_ms, args.max_shed)
+    if failures:
+        print("\nFAILED:\n" + "\n".join(f"  {failure}" for failure in failures))
+        sys.exit(1)
+    print(f"\nno route regressed more than {args.tolerance:.0%} past {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+GET /user-restaurants/nearby: geohash + bounding box pruning vs. scanning distances.
+
+Seeds --restaurants restaurants (default 1M; ~70% clustered around US metro areas,
+the rest spread over the continental US) and saves --saved of them for one user,
+then times the nearby query for several radii around a metro center three ways:
+    - geohash: the endpoint's statement (prefix ranges on ix_restaurants_geohash,
+      then the bounding box, then haversine)
+    - bbox: bounding box + haversine, no geohash ranges
+    - scan: haversine over every saved restaurant
+
+Everything runs in one transaction that is rolled back at the end, so nothing is
+left behind. Seeding 1M rows takes a minute or two (geohash_encode runs per row).
+
+    python -m benchmarks.nearby --restaurants 1000000 --saved 100000
+"""
+
+import argparse
+import re
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints.user_restaurants import nearby_stmt
+from app.core import geohash
+from benchmarks._common import get_engine, summarize, timed
+
+# (latitude, longitude) of metro areas the clustered restaurants gather around
+METROS = [
+    (40.7128, -74.0060), (34.0522, -118.2437), (41.8781, -87.6298), (29.7604, -95.3698),
+    (33.4484, -112.0740), (39.9526, -75.1652), (29.4241, -98.4936), (32.7157, -117.1611),
+    (32.7767, -96.7970), (37.7749, -122.4194), (47.6062, -122.3321), (25.7617, -80.1918),
+    (42.3601, -71.0589), (39.7392, -104.9903), (36.1627, -86.7816), (45.5152, -122.6784),
+]
+
+RADII_METERS = [500, 2000, 10000, 50000]
+LIMIT = 50
+
+DISTANCE_SQL = (
+    "2 * :earth_radius * asin(sqrt(least("
+    "power(sin(radians(r.latitude - :lat) * 0.5), 2) "
+    "+ cos(radians(:lat)) * cos(radians(r.latitude)) * power(sin(radians(r.longitude - :lng) * 0.5), 2), 1.0)))"
+)
+SCAN_SQL = f"""
+    SELECT ur.id, r.id, r.name, {DISTANCE_SQL} AS distance_m
+    FROM user_restaurants ur JOIN restaurants r ON r.id = ur.restaurant_id
+    WHERE ur.user_id = :u AND {DISTANCE_SQL} <= :radius
+    ORDER BY distance_m, ur.id LIMIT :limit
+"""
+BBOX_SQL = f"""
+    SELECT ur.id, r.id, r.name, {DISTANCE_SQL} AS distance_m
+    FROM user_restaurants ur JOIN restaurants r ON r.id = ur.restaurant_id
+    WHERE ur.user_id = :u
+      AND r.latitude BETWEEN :min_lat AND :max_lat AND r.longitude BETWEEN :min_lng AND :max_lng
+      AND {DISTANCE_SQL} <= :radius
+    ORDER BY distance_m, ur.id LIMIT :limit
+"""
+
+EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+def seed(conn, restaurants: int, saved: int) -> str:
+    user_id = str(uuid.uuid4())
+    conn.execute(
+        text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+        {"id": user_id, "email": f"bench-{user_id}@example.com"},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+            "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/bench', 'complete', now())"
+        ),
+        {"id": user_id},
+    )
+    # Box-Muller for a normal spread (sigma ~0.15 degrees) around metro g % len(METROS)
+    # for 70% of rows; the rest are spread uniformly
+    conn.execute(
+        text(
+            """
+            INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+            SELECT gen_random_uuid(), 'Nearby ' || g,
+                   CASE WHEN g % 10 < 7
+                        THEN (CAST(:lats AS float8[]))[1 + g % :metros]
+                             + 0.15 * sqrt(-2 * ln(1 - random())) * cos(2 * pi() * random())
+                        ELSE 25 + random() * 24 END,
+                   CASE WHEN g % 10 < 7
+                        THEN (CAST(:lngs AS float8[]))[1 + g % :metros]
+                             + 0.15 * sqrt(-2 * ln(1 - random())) * cos(2 * pi() * random())
+                        ELSE -124 + random() * 57 END,
+                   'Bench', now()
+            FROM generate_series(1, :count) g
+            """
+        ),
+        {
+            "count": restaurants,
+            "metros": len(METROS),
+            "lats": [lat for lat, _ in METROS],
+            "lngs": [lng for _, lng in METROS],
+        },
+    )
+    conn.execute(
+        text(
+            """
+            INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id,
+                                          is_favorite, is_visited, created_at, updated_at)
+            SELECT gen_random_uuid(), :u, r.id, :u, false, false, now(), now()
+            FROM restaurants r WHERE r.name LIKE 'Nearby %'
+            ORDER BY random() LIMIT :saved
+            """
+        ),
+        {"u": user_id, "saved": saved},
+    )
+    conn.execute(text("ANALYZE restaurants"))
+    conn.execute(text("ANALYZE user_restaurants"))
+    return user_id
+
+
+def queries(user_id: str, lat: float, lng: float, radius: int) -> dict[str, tuple[str, dict]]:
+    compiled = nearby_stmt(uuid.UUID(user_id), lat, lng, radius, LIMIT).compile(dialect=postgresql.dialect())
+    min_lat, max_lat, min_lng, max_lng = geohash.bounding_box(lat, lng, radius)
+    params = {
+        "u": user_id, "lat": lat, "lng": lng, "radius": radius, "limit": LIMIT,
+        "earth_radius": geohash.EARTH_RADIUS_METERS,
+        "min_lat": min_lat, "max_lat": max_lat, "min_lng": min_lng, "max_lng": max_lng,
+    }
+    # The endpoint statement uses pyformat binds; run it through psycopg2 as is
+    return {
+        "geohash": (compiled.string, dict(compiled.params)),
+        "bbox": (BBOX_SQL, params),
+        "scan": (SCAN_SQL, params),
+    }
+
+
+def execute(conn, sql: str, params: dict, prefix: str = ""):
+    if ":" in sql and "%(" not in sql:
+        return conn.execute(text(prefix + sql), params)
+    return conn.exec_driver_sql(prefix + sql, params)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=1_000_000)
+    parser.add_argument("--saved", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--plans", action="store_true", help="print EXPLAIN ANALYZE for every query")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        try:
+            user_id = seed(conn, args.restaurants, args.saved)
+            print(f"{args.restaurants} restaurants, {args.saved} saved by user {user_id}")
+
+            lat, lng = METROS[0]
+            for radius in RADII_METERS:
+                print(f"\n--- radius {radius} m around {lat}, {lng}")
+                counts = set()
+                for label, (sql, params) in queries(user_id, lat, lng, radius).items():
+                    counts.add(len(execute(conn, sql, params).all()))
+                    print(summarize(label, timed(lambda: execute(conn, sql, params).all(), args.repeat)))
+                    if args.plans:
+                        plan = execute(conn, sql, params, "EXPLAIN (ANALYZE, BUFFERS) ").scalars().all()
+                        print("\n".join(plan))
+                # All three strategies must agree
+                print(f"{'rows returned':<40} {', '.join(map(str, sorted(counts)))}")
+        finally:
+            conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
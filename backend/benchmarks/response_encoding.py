@@ -0,0 +1,89 @@
+"""
+Response encodings: payload size and encode time for a /home body.
+
+Builds a HomeResponse-shaped body in memory (no database needed) with --sizes
+unsorted restaurants and --lists list summaries, then encodes it with every
+encoding in app.api.encoding. Sizes are reported raw and gzipped, since most
+clients negotiate gzip in front of any of these.
+
+    python -m benchmarks.response_encoding --sizes 100 1000 10000
+"""
+
+import argparse
+import gzip
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks._common import summarize, timed
+
+from app.api.encoding import COLUMNAR_JSON, COLUMNAR_MSGPACK, JSON, MSGPACK, Encoding, encoded_response
+
+CITIES = ["New York", "Brooklyn", "Los Angeles", "San Francisco", "Chicago"]
+
+
+def home_body(size: int, lists: int) -> dict:
+    rng = random.Random(size)
+    now = datetime(2026, 10, 18, 12, 0, 0)
+    restaurants = [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128)),
+            "restaurant": {
+                "name": f"Restaurant {i}",
+                "latitude": 40.7 + rng.random() / 10,
+                "longitude": -74.0 + rng.random() / 10,
+                "city": rng.choice(CITIES),
+                "price_range": rng.choice([None, "$", "$$", "$$$"]),
+                "google_place_id": f"ChIJ{uuid.UUID(int=rng.getrandbits(128)).hex[:23]}",
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+            },
+            "is_favorite": rng.random() < 0.1,
+            "is_visited": rng.random() < 0.3,
+            "created_at": now - timedelta(seconds=i, microseconds=rng.randrange(1_000_000)),
+        }
+        for i in range(size)
+    ]
+    summaries = [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128)),
+            "name": f"List {i}",
+            "created_at": now - timedelta(days=i),
+            "restaurant_count": 40,
+            "favorite_count": 4,
+            "visited_count": 12,
+            "previews": [
+                {"id": str(r["restaurant"]["id"]), "name": r["restaurant"]["name"], "city": r["restaurant"]["city"]}
+                for r in restaurants[i * 3:i * 3 + 3]
+            ],
+        }
+        for i in range(lists)
+    ]
+    return {"lists": summaries, "unsorted_restaurants": restaurants, "next_cursor": None}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        body = home_body(size, args.lists)
+        baseline = None
+        print(f"\n{size} restaurants, {args.lists} lists")
+        for media_type in (JSON, MSGPACK, COLUMNAR_JSON, COLUMNAR_MSGPACK):
+            encoding = Encoding(media_type)
+            payload = encoded_response(body, encoding).body
+            zipped = len(gzip.compress(payload))
+            baseline = baseline or (len(payload), zipped)
+            label = media_type.removeprefix("application/").removeprefix("vnd.reelmapper.")
+            sizes = (
+                f"  {len(payload) / 1024:8.1f}KB ({len(payload) / baseline[0]:4.0%})"
+                f"  gzip {zipped / 1024:7.1f}KB ({zipped / baseline[1]:4.0%})"
+            )
+            print(summarize(label, timed(lambda: encoded_response(body, encoding), args.repeat)) + sizes)
+
+
+if __name__ == "__main__":
+    main()
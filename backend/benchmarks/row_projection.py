@@ -0,0 +1,89 @@
+"""
+Row projection fast path vs. ORM objects for saved-restaurant collections.
+
+Seeds a user with the largest --sizes value of Unsorted restaurants, then for each
+size times the newest-first page both ways, end to end from query to JSON bytes:
+    - orm:        select(UserRestaurant) + selectinload(restaurant), validated
+                  through schemas.ListRestaurantsResponse and dumped by Pydantic
+                  (what FastAPI does with response_model)
+    - projection: user_restaurant_rows_stmt() with one JOIN, plain dicts, orjson
+                  (what /home and /lists/{id}/restaurants now do)
+
+Peak Python memory is measured with tracemalloc in a separate run so it does not
+skew the timings.
+
+    python -m benchmarks.row_projection --sizes 1000 10000 100000
+"""
+
+import argparse
+import tracemalloc
+import uuid
+from typing import Callable
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from benchmarks._common import bench_user, get_engine, seed_saved_restaurants, summarize, timed
+
+from app import schemas
+from app.api.encoding import FastJSONResponse
+from app.api.projection import user_restaurant_dicts, user_restaurant_rows_stmt
+from app.models.save_event import UserRestaurant
+
+
+def peak_memory_mb(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn, bench_user(conn) as user_id:
+        seed_saved_restaurants(conn, user_id, max(args.sizes))
+        user_uuid = uuid.UUID(user_id)
+        session = Session(bind=conn)
+
+        for size in args.sizes:
+            def orm():
+                stmt = (
+                    select(UserRestaurant)
+                    .where(UserRestaurant.user_id == user_uuid)
+                    .where(UserRestaurant.list_id == None)
+                    .options(selectinload(UserRestaurant.restaurant))
+                    .order_by(UserRestaurant.created_at.desc(), UserRestaurant.id.desc())
+                    .limit(size)
+                )
+                rows = session.exec(stmt).all()
+                body = schemas.ListRestaurantsResponse.model_validate(
+                    {"restaurants": rows, "next_cursor": None}
+                ).model_dump_json()
+                session.expunge_all()
+                return body
+
+            def projection():
+                stmt = (
+                    user_restaurant_rows_stmt(user_uuid)
+                    .where(UserRestaurant.list_id == None)
+                    .order_by(UserRestaurant.created_at.desc(), UserRestaurant.id.desc())
+                    .limit(size)
+                )
+                rows = conn.execute(stmt).all()
+                return FastJSONResponse({"restaurants": user_restaurant_dicts(rows), "next_cursor": None}).body
+
+            print(f"\n{size} rows")
+            print(summarize("orm + response_model", timed(orm, args.repeat)) + f"  peak={peak_memory_mb(orm):7.1f}MB")
+            print(summarize("projection + orjson", timed(projection, args.repeat)) + f"  peak={peak_memory_mb(projection):7.1f}MB")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+GET /search latency on large per-user libraries.
+
+Seeds one user with --rows saved restaurants (names and cities drawn from word
+lists, spread over --lists lists, notes on ~30% of them) next to --other-rows
+restaurants saved by another user, then times the endpoint's query for common,
+rare, prefix, multi-word and list/note-only searches.
+
+Everything runs in one transaction that is rolled back at the end.
+
+    python -m benchmarks.search --rows 10000
+    python -m benchmarks.search --rows 100000 --plans
+"""
+
+import argparse
+import uuid
+
+from sqlalchemy import text
+
+from app.api.v1.endpoints.search import search_stmt
+from benchmarks._common import get_engine, summarize, timed
+
+ADJECTIVES = ["Golden", "Little", "Blue", "Royal", "Happy", "Lucky", "Old", "Green", "Silver", "Red",
+              "Wild", "Sunny", "Corner", "Secret", "Urban", "Rustic"]
+CUISINES = ["Dragon", "Taco", "Noodle", "Pizza", "Sushi", "Burger", "Curry", "Dumpling", "Ramen",
+            "Falafel", "Bagel", "Pho", "Kebab", "Tapas", "Bistro", "Crepe", "Katsu", "Arepa"]
+KINDS = ["House", "Bar", "Kitchen", "Cafe", "Grill", "Shack", "Diner", "Eatery", "Canteen", "Place"]
+CITIES = ["New York", "Brooklyn", "Los Angeles", "Chicago", "Austin", "Seattle", "Portland", "Miami",
+          "Boston", "Denver", "San Francisco", "Philadelphia", "Nashville", "Houston"]
+NOTE_WORDS = ["amazing", "tacos", "spicy", "brunch", "rooftop", "cheap", "date", "night", "crispy",
+              "patio", "cocktails", "queue", "worth", "friendly", "loud", "birthday", "dessert",
+              "margaritas", "vegan", "outdoor", "seating", "cash", "only", "reservations"]
+
+QUERIES = {
+    "common word": "taco",
+    "rare phrase": "secret arepa canteen",
+    "prefix (typing)": "dum",
+    "city": "san francisco",
+    "list name": "weekend",
+    "note text": "rooftop margaritas",
+    "no match": "xylophone",
+}
+
+
+def seed(conn, rows: int, lists: int, other_rows: int) -> str:
+    users = [str(uuid.uuid4()), str(uuid.uuid4())]
+    for user_id in users:
+        conn.execute(
+            text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+            {"id": user_id, "email": f"bench-{user_id}@example.com"},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/bench', 'complete', now())"
+            ),
+            {"id": user_id},
+        )
+    list_ids = [str(uuid.uuid4()) for _ in range(lists)]
+    conn.execute(
+        text(
+            "INSERT INTO lists (id, user_id, name, created_at, updated_at) "
+            "SELECT id, :u, (ARRAY['Weekend', 'Date night', 'Brunch', 'Work lunch', 'Visitors'])[1 + n % 5] "
+            "|| ' ' || n, now(), now() "
+            "FROM unnest(CAST(:ids AS uuid[])) WITH ORDINALITY AS t(id, n)"
+        ),
+        {"u": users[0], "ids": list_ids},
+    )
+    words = {"adj": ADJECTIVES, "cuisine": CUISINES, "kind": KINDS, "city": CITIES}
+    for user_id, count, user_lists in ((users[0], rows, list_ids), (users[1], other_rows, [])):
+        conn.execute(
+            text(
+                """
+                WITH new_restaurants AS (
+                    INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                    SELECT gen_random_uuid(),
+                           (CAST(:adj AS text[]))[1 + floor(random() * cardinality(CAST(:adj AS text[])))::int]
+                           || ' ' || (CAST(:cuisine AS text[]))[1 + floor(random() * cardinality(CAST(:cuisine AS text[])))::int]
+                           || ' ' || (CAST(:kind AS text[]))[1 + floor(random() * cardinality(CAST(:kind AS text[])))::int],
+                           40.7, -74.0,
+                           (CAST(:city AS text[]))[1 + floor(random() * cardinality(CAST(:city AS text[])))::int],
+                           now()
+                    FROM generate_series(1, :count) g
+                    RETURNING id
+                ), numbered AS (
+                    SELECT id, row_number() OVER () AS n FROM new_restaurants
+                )
+                INSERT INTO user_restaurants (id, user_id, restaurant_id, list_id, source_event_id,
+                                              is_favorite, is_visited, created_at, updated_at)
+                SELECT gen_random_uuid(), :u, numbered.id,
+                       CASE WHEN cardinality(CAST(:lists AS uuid[])) = 0 OR n % 3 = 0 THEN NULL
+                            ELSE (CAST(:lists AS uuid[]))[1 + n % cardinality(CAST(:lists AS uuid[]))] END,
+                       :u, false, false, now(), now()
+                FROM numbered
+                """
+            ),
+            {**words, "u": user_id, "count": count, "lists": user_lists},
+        )
+    conn.execute(
+        text(
+            """
+            INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at)
+            SELECT gen_random_uuid(), ur.user_id, ur.restaurant_id,
+                   (SELECT string_agg((CAST(:words AS text[]))[1 + floor(random() * cardinality(CAST(:words AS text[])))::int], ' ')
+                    FROM generate_series(1, 12) WHERE ur.id IS NOT NULL),
+                   now(), now()
+            FROM user_restaurants ur
+            WHERE ur.user_id = :u AND random() < 0.3
+            """
+        ),
+        {"u": users[0], "words": NOTE_WORDS},
+    )
+    # Rows inserted since the last vacuum sit in the GIN pending list, which every
+    # search scans linearly; merge them as autovacuum would have
+    conn.execute(text("SELECT gin_clean_pending_list('ix_user_restaurants_search_vector')"))
+    for table in ("restaurants", "user_restaurants", "lists", "notes"):
+        conn.execute(text(f"ANALYZE {table}"))
+    return users[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--other-rows", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--plans", action="store_true", help="print EXPLAIN ANALYZE for every query")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        try:
+            user_id = seed(conn, args.rows, args.lists, args.other_rows)
+            print(f"user {user_id}: {args.rows} saved, {args.lists} lists; other user: {args.other_rows} saved\n")
+
+            for label, q in QUERIES.items():
+                stmt = search_stmt(uuid.UUID(user_id), q, args.limit)
+                total = conn.execute(search_stmt(uuid.UUID(user_id), q, 10 ** 9)).all()
+                samples = timed(lambda: conn.execute(stmt).all(), args.repeat)
+                print(f"{summarize(f'{label} ({q!r})', samples)}  matches={len(total)}")
+                if args.plans:
+                    compiled = stmt.compile(dialect=conn.dialect)
+                    plan = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {compiled.string}", compiled.params)
+                    print("\n".join(plan.scalars().all()))
+        finally:
+            conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
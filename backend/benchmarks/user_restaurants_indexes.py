@@ -0,0 +1,122 @@
+"""
+user_restaurants access paths: query plans with and without the access-path indexes.
+
+Seeds a user with --rows saved restaurants (a third Unsorted, the rest over --lists
+lists; ~10% favorites, ~30% visited) next to --noise-users other users, then runs
+EXPLAIN (ANALYZE, BUFFERS) for the hot queries twice:
+    - before: inside a transaction that drops every access-path index
+      (leaving the primary key and the (user_id, restaurant_id) unique
+      constraint), rolled back afterwards
+    - after: with the indexes in place
+
+DROP INDEX holds an ACCESS EXCLUSIVE lock on user_restaurants until the rollback,
+so only point this at a benchmark database.
+
+    python -m benchmarks.user_restaurants_indexes --rows 50000 --summary
+"""
+
+import argparse
+import re
+import uuid
+from contextlib import ExitStack
+
+from sqlalchemy import text
+
+from benchmarks._common import bench_user, get_engine, seed_saved_restaurants
+
+ACCESS_PATH_INDEXES = [
+    "ix_user_restaurants_user_list_created_id",
+    "ix_user_restaurants_user_list_fav_created_id",
+    "ix_user_restaurants_unsorted_created_id",
+    "ix_user_restaurants_unsorted_fav_created_id",
+]
+
+PAGE = 50
+
+QUERIES = {
+    "unsorted page": (
+        "SELECT * FROM user_restaurants WHERE user_id = :u AND list_id IS NULL "
+        "ORDER BY created_at DESC, id DESC LIMIT :page"
+    ),
+    "list page": (
+        "SELECT * FROM user_restaurants WHERE user_id = :u AND list_id = :l "
+        "ORDER BY created_at DESC, id DESC LIMIT :page"
+    ),
+    "list page, favorites first": (
+        "SELECT * FROM user_restaurants WHERE user_id = :u AND list_id = :l "
+        "ORDER BY is_favorite DESC, created_at DESC, id DESC LIMIT :page"
+    ),
+}
+
+EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+def explain(conn, sql: str, params: dict) -> tuple[list[str], float]:
+    lines = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars().all()
+    match = next((EXECUTION_TIME.search(line) for line in lines if EXECUTION_TIME.search(line)), None)
+    return lines, float(match.group(1)) if match else float("nan")
+
+
+def run_queries(conn, params: dict, show_plans: bool) -> dict[str, float]:
+    timings = {}
+    for label, sql in QUERIES.items():
+        explain(conn, sql, params)  # warm the cache so both runs read from shared buffers
+        lines, ms = explain(conn, sql, params)
+        timings[label] = ms
+        if show_plans:
+            print(f"--- {label}")
+            print("\n".join(lines))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=30000)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--noise-users", type=int, default=20)
+    parser.add_argument("--noise-rows", type=int, default=2000)
+    parser.add_argument("--summary", action="store_true", help="print timings without the full plans")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.connect() as conn, ExitStack() as stack:
+        for _ in range(args.noise_users):
+            seed_saved_restaurants(conn, stack.enter_context(bench_user(conn)), args.noise_rows)
+
+        user_id = stack.enter_context(bench_user(conn))
+        list_ids = [str(uuid.uuid4()) for _ in range(args.lists)]
+        conn.execute(
+            text(
+                "INSERT INTO lists (id, user_id, name, created_at, updated_at) "
+                "SELECT id, :user_id, 'List ' || n, now(), now() "
+                "FROM unnest(CAST(:ids AS uuid[])) WITH ORDINALITY AS t(id, n)"
+            ),
+            {"user_id": user_id, "ids": list_ids},
+        )
+        unsorted = args.rows // 3
+        seed_saved_restaurants(conn, user_id, unsorted)
+        seed_saved_restaurants(conn, user_id, args.rows - unsorted, list_ids)
+        print(
+            f"user {user_id}: {args.rows} saved ({unsorted} unsorted, {args.lists} lists), "
+            f"plus {args.noise_users} users x {args.noise_rows}"
+        )
+
+        params = {"u": user_id, "l": list_ids[0], "page": PAGE}
+
+        print("\n=== before (access-path indexes dropped)")
+        for name in ACCESS_PATH_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        before = run_queries(conn, params, not args.summary)
+        conn.rollback()
+
+        print("\n=== after")
+        after = run_queries(conn, params, not args.summary)
+        conn.rollback()
+
+        print(f"\n{'query':<30} {'before':>10} {'after':>10}")
+        for label in QUERIES:
+            print(f"{label:<30} {before[label]:>8.2f}ms {after[label]:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+import sys
+import os
+import asyncio
+import uuid
+import pytest
+import redis
+from unittest.mock import AsyncMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints import data as data_endpoint
+from app import worker
+from app.core import account_deletion, account_export, user_invalidation
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+executed = []
+enqueued = []
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def hset(self, key, mapping):
+        self.calls.append((key, mapping))
+
+    def expire(self, key, seconds):
+        pass
+
+    def _apply(self):
+        for key, mapping in self.calls:
+            self.client.hashes.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def execute(self):
+        self._apply()
+
+
+class FakeSyncPipeline(FakePipeline):
+    def execute(self):
+        self._apply()
+
+
+class FakeRedis:
+    """Hashes and pub/sub, shared by the API (async) and worker (sync) sides."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.published = []
+
+    def pipeline(self):
+        return FakeAsyncPipeline(self)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class FakeSyncRedis:
+    def __init__(self, shared):
+        self.shared = shared
+
+    def pipeline(self):
+        return FakeSyncPipeline(self.shared)
+
+
+fake_redis = FakeRedis()
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        executed.append(stmt)
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides(monkeypatch):
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    app.dependency_overrides[deps.get_current_subject] = lambda: "clerk_123"
+    monkeypatch.setattr(data_endpoint.delete_account, "delay", lambda *args: enqueued.append(args))
+    monkeypatch.setattr(worker, "get_sync_redis", lambda: FakeSyncRedis(fake_redis))
+    executed.clear()
+    enqueued.clear()
+    fake_redis.hashes.clear()
+    fake_redis.published.clear()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def test_delete_account_detaches_and_enqueues():
+    deps.user_cache.set("clerk_123", get_dummy_user().model_dump())
+    response = client.delete("/api/v1/account")
+    assert response.status_code == 202
+    assert response.json() == {
+        "user_id": str(TEST_USER_ID), "status": "pending", "table": None, "rows": 0, "error": None,
+    }
+
+    assert len(executed) == 1
+    params = executed[0].compile().params
+    assert params["clerk_user_id"] is None
+    assert params["email"] == f"deleted-{TEST_USER_ID}@deleted.invalid"
+    assert deps.user_cache.get("clerk_123") is None
+    # ... and from every other process's cache
+    assert fake_redis.published == [(user_invalidation.CHANNEL, "clerk_123")]
+    assert enqueued == [(str(TEST_USER_ID),)]
+
+
+def test_deletion_progress_is_readable_by_its_owner_only():
+    client.delete("/api/v1/account")
+    response = client.get(f"/api/v1/account/deletion/{TEST_USER_ID}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+
+    # The worker's progress shows through
+    account_deletion.update_job(FakeSyncRedis(fake_redis), TEST_USER_ID, status="running", table="notes", rows=42)
+    response = client.get(f"/api/v1/account/deletion/{TEST_USER_ID}")
+    assert response.json() == {
+        "user_id": str(TEST_USER_ID), "status": "running", "table": "notes", "rows": 42, "error": None,
+    }
+
+    app.dependency_overrides[deps.get_current_subject] = lambda: "clerk_other"
+    response = client.get(f"/api/v1/account/deletion/{TEST_USER_ID}")
+    assert response.status_code == 404
+    response = client.get(f"/api/v1/account/deletion/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+def test_deletion_progress_does_not_resolve_a_user():
+    # Polling after the account is detached must not find-or-create a new one
+    def fail():
+        raise AssertionError("get_current_user called")
+
+    app.dependency_overrides[deps.get_current_user] = fail
+    account_deletion.update_job(FakeSyncRedis(fake_redis), TEST_USER_ID, clerk_user_id="clerk_123", status="complete")
+    response = client.get(f"/api/v1/account/deletion/{TEST_USER_ID}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "complete"
+
+
+class Retry(Exception):
+    pass
+
+
+def test_failed_deletion_is_retried_with_backoff(monkeypatch):
+    def fail(engine, user_id, progress):
+        raise RuntimeError("violates foreign key constraint")
+
+    retries = []
+
+    def retry(exc, countdown):
+        retries.append(countdown)
+        return Retry()
+
+    monkeypatch.setattr(account_deletion, "run_deletion", fail)
+    monkeypatch.setattr(worker.delete_account, "retry", retry)
+    worker.delete_account.push_request(retries=2)
+    try:
+        with pytest.raises(Retry):
+            worker.delete_account(str(TEST_USER_ID))
+    finally:
+        worker.delete_account.pop_request()
+    assert retries == [settings.ACCOUNT_DELETE_RETRY_SECONDS * 4]
+    job = fake_redis.hashes[f"account_deletion:{TEST_USER_ID}"]
+    assert (job["status"], job["error"]) == ("retrying", "violates foreign key constraint")
+
+    # Out of retries: failed for good
+    worker.delete_account.push_request(retries=worker.delete_account.max_retries)
+    try:
+        with pytest.raises(RuntimeError):
+            worker.delete_account(str(TEST_USER_ID))
+    finally:
+        worker.delete_account.pop_request()
+    assert fake_redis.hashes[f"account_deletion:{TEST_USER_ID}"]["status"] == "failed"
+
+
+class FakePubSub:
+    def __init__(self, cache, resolved, messages, error):
+        self.cache = cache
+        self.resolved = resolved
+        self.messages = messages
+        self.error = error
+        self.closed = False
+
+    async def subscribe(self, channel):
+        assert channel == user_invalidation.CHANNEL
+        self.at_subscribe = set(self.cache._data)
+
+    async def listen(self):
+        self.at_listen = set(self.cache._data)
+        # Users this process resolves while subscribed
+        for key in self.resolved:
+            self.cache.set(key, {})
+        for message in self.messages:
+            yield message
+        raise self.error
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_invalidation_listener_drops_users_and_resubscribes(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_USER_INVALIDATION_RETRY_SECONDS", 0)
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("clerk_stale", {})
+    first = FakePubSub(
+        cache, ["clerk_a", "clerk_b"],
+        [{"type": "subscribe", "data": 1}, {"type": "message", "data": "clerk_a"}],
+        redis.ConnectionError("lost"),
+    )
+    second = FakePubSub(cache, [], [], asyncio.CancelledError())
+    pubsubs = [first, second]
+
+    class Client:
+        def pubsub(self):
+            return pubsubs.pop(0)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(user_invalidation.listen(Client(), cache))
+
+    # Cleared on subscribe, then only the published user is dropped
+    assert first.at_listen == set()
+    assert second.at_subscribe == {"clerk_b"}
+    # Messages may have been missed while disconnected
+    assert second.at_listen == set()
+    assert first.closed and second.closed
+
+
+def test_deletion_order():
+    tables = [model.__tablename__ for model, _ in account_deletion.STEPS]
+    # user_restaurants reference save_events (RESTRICT) and lists (SET NULL), and a
+    # note delete refreshes its user_restaurant's search document
+    assert tables.index("user_restaurants") < min(tables.index(t) for t in ("notes", "save_events", "lists"))
+    # ... and again right before save_events, for saves made by extract_info jobs since
+    assert tables[tables.index("save_events") - 1] == "user_restaurants"
+
+
+def test_batch_delete_stmt_is_bounded():
+    model, owner = account_deletion.STEPS[0]
+    sql = str(account_deletion.batch_delete_stmt(model, owner, TEST_USER_ID, 500))
+    assert sql.startswith("DELETE FROM user_restaurants")
+    assert "LIMIT" in sql
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+def test_run_deletion_against_postgres(monkeypatch, tmp_path):
+    if not PG_BENCH_DATABASE_URL:
+        pytest.skip("PG_BENCH_DATABASE_URL not set")
+    from sqlalchemy import create_engine, text
+
+    monkeypatch.setattr(settings, "ACCOUNT_DELETE_BATCH_ROWS", 3)
+    monkeypatch.setattr(settings, "ACCOUNT_DELETE_PAUSE_SECONDS", 0)
+    monkeypatch.setattr(settings, "ACCOUNT_EXPORT_DIR", str(tmp_path))
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+    restaurant_ids = [uuid.uuid4() for _ in range(7)]
+    with engine.begin() as conn:
+        for uid in (user_id, other_id):
+            conn.execute(
+                text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+                {"id": uid, "email": f"delete-{uid}@example.com"},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                    "SELECT gen_random_uuid(), :u, 'instagram', 'https://instagram.com/p/' || g, 'complete', now() "
+                    "FROM generate_series(1, 10) AS g"
+                ),
+                {"u": uid},
+            )
+        conn.execute(
+            text(
+                "INSERT INTO restaurants (id, name, latitude, longitude, city, created_at) "
+                "SELECT id, 'Delete me not', 40.7, -74.0, 'Test', now() FROM unnest(CAST(:ids AS uuid[])) AS id"
+            ),
+            {"ids": restaurant_ids},
+        )
+        conn.execute(
+            text("INSERT INTO lists (id, user_id, name, created_at, updated_at) VALUES (gen_random_uuid(), :u, 'L', now(), now())"),
+            {"u": user_id},
+        )
+        for uid in (user_id, other_id):
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO user_restaurants (id, user_id, restaurant_id, list_id, source_event_id,
+                                                  is_favorite, is_visited, created_at, updated_at)
+                    SELECT gen_random_uuid(), :u, r.id, (SELECT id FROM lists WHERE user_id = :u),
+                           (SELECT id FROM save_events WHERE user_id = :u LIMIT 1), false, false, now(), now()
+                    FROM unnest(CAST(:ids AS uuid[])) AS r(id)
+                    """
+                ),
+                {"u": uid, "ids": restaurant_ids},
+            )
+        conn.execute(
+            text(
+                "INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at) "
+                "SELECT gen_random_uuid(), :u, id, 'note', now(), now() FROM unnest(CAST(:ids AS uuid[])) AS id"
+            ),
+            {"u": user_id, "ids": restaurant_ids},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO sync_changes (user_id, seq, entity_type, entity_id, op, created_at) "
+                "SELECT :u, g, 'note', gen_random_uuid(), 'upsert', now() FROM generate_series(1, 4) AS g"
+            ),
+            {"u": user_id},
+        )
+        conn.execute(text("INSERT INTO sync_sequences (user_id, seq) VALUES (:u, 4)"), {"u": user_id})
+    export_key = account_export.object_key(user_id, uuid.uuid4(), account_export.ExportFormat.NDJSON)
+    with account_export.get_store().open_write(export_key) as out:
+        out.write(b"{}\n")
+    try:
+        progress = []
+
+        def record(table, rows):
+            if table == "notes" and not progress[-1][0] == "notes":
+                # An extract_info job in flight saves a restaurant after user_restaurants were emptied
+                with engine.begin() as conn:
+                    conn.execute(
+                        text(
+                            "INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id, "
+                            "is_favorite, is_visited, created_at, updated_at) "
+                            "SELECT gen_random_uuid(), :u, :r, id, false, false, now(), now() "
+                            "FROM save_events WHERE user_id = :u LIMIT 1"
+                        ),
+                        {"u": user_id, "r": restaurant_ids[0]},
+                    )
+            progress.append((table, rows))
+
+        deleted = account_deletion.run_deletion(engine, user_id, record)
+        # 7 + 1 saves, 7 notes, 10 events, 1 list, 4 changes, the user (and its sync_sequences row)
+        assert deleted == 8 + 7 + 10 + 1 + 4 + 1
+        assert [rows for _, rows in progress] == sorted(rows for _, rows in progress)
+        assert sum(1 for table, _ in progress if table == "save_events") == 4  # 3 + 3 + 3 + 1
+        assert progress[-1] == ("users", deleted)
+        assert not account_export.get_store().exists(export_key)
+
+        with engine.connect() as conn:
+            for table in ("user_restaurants", "notes", "save_events", "lists", "sync_changes", "sync_sequences"):
+                count = conn.execute(text(f"SELECT count(*) FROM {table} WHERE user_id = :u"), {"u": user_id}).scalar()
+                assert count == 0, table
+            assert conn.execute(text("SELECT count(*) FROM users WHERE id = :u"), {"u": user_id}).scalar() == 0
+            # Other users and shared restaurants are untouched
+            assert conn.execute(
+                text("SELECT count(*) FROM user_restaurants WHERE user_id = :u"), {"u": other_id}
+            ).scalar() == 7
+    finally:
+        with engine.begin() as conn:
+            for uid in (user_id, other_id):
+                conn.execute(text("DELETE FROM user_restaurants WHERE user_id = :u"), {"u": uid})
+                conn.execute(text("DELETE FROM users WHERE id = :u"), {"u": uid})
+            conn.execute(text("DELETE FROM restaurants WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": restaurant_ids})
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    test_deletion_order()
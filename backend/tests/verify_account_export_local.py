@@ -0,0 +1,264 @@
+import sys
+import os
+import io
+import json
+import time
+import uuid
+import zipfile
+import pytest
+from unittest.mock import AsyncMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints import data as data_endpoint
+from app.core import account_export
+from app.core.config import settings
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.ops = []
+
+    def hset(self, key, mapping):
+        self.ops.append((key, mapping))
+
+    def expire(self, key, seconds):
+        pass
+
+    def _apply(self):
+        for key, mapping in self.ops:
+            self.redis_client.store.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+        return [True] * len(self.ops)
+
+    async def execute(self):
+        return self._apply()
+
+
+class SyncFakeRedis(FakeRedis):
+    """The worker's blocking client, sharing the API's store."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def pipeline(self):
+        pipe = FakePipeline(self)
+        pipe.execute = pipe._apply
+        return pipe
+
+
+fake_redis = FakeRedis()
+enqueued = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+@pytest.fixture(autouse=True)
+def overrides(monkeypatch, tmp_path):
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = lambda: AsyncMock()
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    monkeypatch.setattr(data_endpoint.export_account, "delay", lambda *args: enqueued.append(args))
+    monkeypatch.setattr(settings, "ACCOUNT_EXPORT_DIR", str(tmp_path))
+    fake_redis.store.clear()
+    enqueued.clear()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def test_export_job_lifecycle():
+    response = client.post("/api/v1/account/export", params={"format": "zip"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending" and job["format"] == "zip"
+    export_id = job["id"]
+    assert enqueued == [(export_id, str(TEST_USER_ID), "zip")]
+
+    url = f"/api/v1/account/export/{export_id}"
+    assert client.get(url).json()["status"] == "pending"
+    assert client.get(f"{url}/download").status_code == 409
+
+    # The worker reports progress, then writes the file and completes
+    worker_redis = SyncFakeRedis(fake_redis.store)
+    account_export.update_job(worker_redis, export_id, status=account_export.ExportStatus.RUNNING, table="lists", rows=10)
+    progress = client.get(url).json()
+    assert (progress["status"], progress["table"], progress["rows"]) == ("running", "lists", 10)
+
+    key = account_export.object_key(TEST_USER_ID, export_id, account_export.ExportFormat.ZIP)
+    with account_export.get_store().open_write(key) as out:
+        out.write(b"PK...")
+    account_export.update_job(worker_redis, export_id, status=account_export.ExportStatus.COMPLETE, table="", rows=12)
+    assert client.get(url).json() == {
+        "id": export_id, "format": "zip", "status": "complete", "table": None, "rows": 12, "error": None,
+    }
+    download = client.get(f"{url}/download")
+    assert download.status_code == 200
+    assert download.content == b"PK..."
+    assert download.headers["content-type"] == "application/zip"
+
+
+def test_export_job_of_another_user():
+    export_id = client.post("/api/v1/account/export").json()["id"]
+    fake_redis.store[f"account_export:{export_id}"]["user_id"] = str(uuid.uuid4())
+    assert client.get(f"/api/v1/account/export/{export_id}").status_code == 404
+    assert client.get(f"/api/v1/account/export/{export_id}/download").status_code == 404
+    assert client.get(f"/api/v1/account/export/{uuid.uuid4()}").status_code == 404
+
+
+def test_store_publishes_atomically():
+    store = account_export.get_store()
+    with pytest.raises(RuntimeError):
+        with store.open_write("u/partial.ndjson") as out:
+            out.write(b"half")
+            raise RuntimeError("worker died")
+    assert not store.exists("u/partial.ndjson")
+    assert os.listdir(store.path("u")) == []
+
+
+def test_sweep_removes_expired_exports():
+    store = account_export.get_store()
+    for key in ("old/a.zip", "old/b.ndjson.part", "new/c.zip"):
+        os.makedirs(os.path.dirname(store.path(key)), exist_ok=True)
+        with open(store.path(key), "wb") as f:
+            f.write(b"x")
+    expired = time.time() - settings.ACCOUNT_EXPORT_TTL_SECONDS - 60
+    for key in ("old/a.zip", "old/b.ndjson.part"):
+        os.utime(store.path(key), (expired, expired))
+
+    assert store.sweep(settings.ACCOUNT_EXPORT_TTL_SECONDS) == 2
+    assert not os.path.exists(store.path("old"))
+    assert store.exists("new/c.zip")
+
+
+def test_delete_user_removes_their_exports():
+    store = account_export.get_store()
+    mine = account_export.object_key(TEST_USER_ID, uuid.uuid4(), account_export.ExportFormat.ZIP)
+    theirs = account_export.object_key(uuid.uuid4(), uuid.uuid4(), account_export.ExportFormat.ZIP)
+    for key in (mine, theirs):
+        with store.open_write(key) as out:
+            out.write(b"PK...")
+
+    store.delete_user(TEST_USER_ID)
+    assert not store.exists(mine)
+    assert store.exists(theirs)
+    store.delete_user(TEST_USER_ID)  # nothing left: no error
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+def test_run_export_against_postgres(monkeypatch):
+    if not PG_BENCH_DATABASE_URL:
+        pytest.skip("PG_BENCH_DATABASE_URL not set")
+    from sqlalchemy import create_engine, text
+
+    # Several keyset pages per table, several batches per page
+    monkeypatch.setattr(settings, "ACCOUNT_EXPORT_PAGE_ROWS", 4)
+    monkeypatch.setattr(settings, "EXPORT_BATCH_ROWS", 3)
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id, restaurant_id = uuid.uuid4(), uuid.uuid4()
+    events = 10
+    # run_export reads in its own transactions, so the data must be committed
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, email, hashed_password, created_at) VALUES (:id, :email, 'secret', now())"),
+            {"id": user_id, "email": f"export-{user_id}@example.com"},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                "SELECT gen_random_uuid(), :u, 'instagram', 'https://instagram.com/p/' || g, 'complete', now() "
+                "FROM generate_series(1, :n) AS g"
+            ),
+            {"u": user_id, "n": events},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO restaurants (id, name, latitude, longitude, city, created_at) "
+                "VALUES (:r, 'Lucali', 40.68, -73.99, 'Brooklyn', now())"
+            ),
+            {"r": restaurant_id},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id, is_favorite, is_visited, "
+                "created_at, updated_at) SELECT gen_random_uuid(), :u, :r, id, true, false, now(), now() "
+                "FROM save_events WHERE user_id = :u LIMIT 1"
+            ),
+            {"u": user_id, "r": restaurant_id},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at) "
+                "VALUES (gen_random_uuid(), :u, :r, 'Cash only', now(), now())"
+            ),
+            {"u": user_id, "r": restaurant_id},
+        )
+    try:
+        progress = []
+        out = io.BytesIO()
+        written = account_export.run_export(
+            engine, user_id, account_export.ExportFormat.NDJSON, out, lambda table, rows: progress.append(rows)
+        )
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert written == len(lines) == 1 + 1 + 1 + events
+        assert progress == sorted(progress) and progress[-1] == written
+        by_table = {}
+        for line in lines:
+            by_table.setdefault(line["table"], []).append(line["row"])
+        assert "hashed_password" not in by_table["users"][0]
+        assert by_table["user_restaurants"][0]["restaurant_name"] == "Lucali"
+        assert by_table["notes"][0]["content"] == "Cash only"
+        event_ids = [row["id"] for row in by_table["save_events"]]
+        assert len(set(event_ids)) == events
+
+        out = io.BytesIO()
+        account_export.run_export(engine, user_id, account_export.ExportFormat.ZIP, out)
+        archive = zipfile.ZipFile(out)
+        assert archive.namelist() == [f"{table.name}.ndjson" for table in account_export.TABLES]
+        assert [json.loads(line)["id"] for line in archive.open("save_events.ndjson")] == event_ids
+        assert archive.read("lists.ndjson") == b""
+    finally:
+        with engine.begin() as conn:
+            for table in ("user_restaurants", "notes", "save_events"):
+                conn.execute(text(f"DELETE FROM {table} WHERE user_id = :u"), {"u": user_id})
+            conn.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+            conn.execute(text("DELETE FROM restaurants WHERE id = :r"), {"r": restaurant_id})
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    test_store_publishes_atomically()
@@ -0,0 +1,229 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+import jwt
+import redis
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.admission import AdmissionMiddleware, route_class
+from app.core import admission
+from app.core.config import settings
+from app.models.user import User
+
+# Tokens the stand-in verifier accepts, by token -> sub
+VALID_TOKENS = {"token-u1": "u1", "token-u2": "u2"}
+
+
+def fake_verify(token):
+    if token not in VALID_TOKENS:
+        raise jwt.InvalidSignatureError("Signature verification failed")
+    return {"sub": VALID_TOKENS[token]}
+
+
+def authenticate(token):
+    """Run deps.get_current_user for a bearer token; the user's row is found in the database."""
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    db.execute.return_value.scalar_one_or_none.return_value = User(email="u@example.com", clerk_user_id="u")
+    return asyncio.run(deps.get_current_user(db=db, credentials=MagicMock(credentials=token)))
+
+
+class FakeRedis:
+    def __init__(self, depth=0, fail=False):
+        self.depth = depth
+        self.fail = fail
+        self.calls = 0
+
+    async def llen(self, queue):
+        self.calls += 1
+        if self.fail:
+            raise redis.ConnectionError("down")
+        return self.depth
+
+
+inner = FastAPI()
+
+
+@inner.get("/api/v1/lists/")
+async def read_lists():
+    return {"ok": True}
+
+
+@inner.post("/api/v1/save-events/")
+async def create_save_event():
+    return {"ok": True}
+
+
+@inner.get("/health")
+async def health():
+    return {"ok": True}
+
+
+@pytest.fixture(autouse=True)
+def admission_state(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(admission, "pool_wait", admission.WaitTracker(window_seconds=5))
+    monkeypatch.setattr(admission, "extraction_queue", admission.QueueDepth("celery", max_age_seconds=0))
+    fake = FakeRedis()
+    monkeypatch.setattr("app.api.admission.get_async_redis", lambda: fake)
+    yield fake
+
+
+def make_client(**overrides):
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    return TestClient(AdmissionMiddleware(inner))
+
+
+@pytest.fixture
+def restore_settings():
+    saved = settings.model_dump()
+    yield
+    for name, value in saved.items():
+        setattr(settings, name, value)
+
+
+def test_route_class():
+    assert route_class("GET", "/health") is None
+    assert route_class("GET", "/") is None
+    assert route_class("GET", "/api/v1/lists/") == "read"
+    assert route_class("PATCH", "/api/v1/lists/abc") == "write"
+    assert route_class("POST", "/api/v1/save-events/") == "save"
+    assert route_class("GET", "/api/v1/save-events/abc/status") == "read"
+    assert route_class("GET", "/api/v1/lists/abc/export") == "export"
+    assert route_class("POST", "/api/v1/account/export") == "export"
+
+
+def test_in_memory_bucket_refills():
+    bucket = admission.InMemoryTokenBucket(rate=10, burst=3)
+    results = [asyncio.run(bucket.take("u1")) for _ in range(4)]
+    assert results[:3] == [None, None, None]
+    assert 0 < results[3] <= 0.1
+    # Buckets are per key
+    assert asyncio.run(bucket.take("u2")) is None
+
+    state = bucket._buckets.get("u1")
+    bucket._buckets.set("u1", (state[0], state[1] - 0.2))
+    assert asyncio.run(bucket.take("u1")) is None
+
+
+def test_rate_limited_user_gets_429(monkeypatch):
+    monkeypatch.setattr(deps, "verify_clerk_token", fake_verify)
+    monkeypatch.setattr(deps, "rate_limit", admission.InMemoryTokenBucket(rate=1, burst=2))
+    authenticate("token-u1")
+    authenticate("token-u1")
+
+    with pytest.raises(HTTPException) as excinfo:
+        authenticate("token-u1")
+    assert excinfo.value.status_code == 429
+    assert int(excinfo.value.headers["Retry-After"]) >= 1
+
+    # Other users are unaffected
+    authenticate("token-u2")
+
+
+def test_forged_tokens_do_not_spend_the_users_bucket(monkeypatch):
+    monkeypatch.setattr(deps, "verify_clerk_token", fake_verify)
+    monkeypatch.setattr(deps, "rate_limit", admission.InMemoryTokenBucket(rate=1, burst=2))
+    forged = jwt.encode({"sub": "u1"}, "not-the-clerk-signing-key-for-admission-tests", algorithm="HS256")
+    for _ in range(5):
+        with pytest.raises(HTTPException) as excinfo:
+            authenticate(forged)
+        assert excinfo.value.status_code == 401
+
+    authenticate("token-u1")
+    authenticate("token-u1")
+
+
+def test_middleware_does_not_rate_limit(restore_settings):
+    # Rate limiting needs a verified identity, which only authentication has
+    client = make_client(RATE_LIMIT_PER_SECOND=1, RATE_LIMIT_BURST=1)
+    headers = {"Authorization": "Bearer token-u1"}
+    assert [client.get("/api/v1/lists/", headers=headers).status_code for _ in range(3)] == [200] * 3
+
+
+def test_concurrency_cap_returns_503(restore_settings):
+    middleware = AdmissionMiddleware(inner)
+    client = TestClient(middleware)
+    limiter = middleware.limiters["read"]
+    limiter.in_flight = limiter.limit
+
+    response = client.get("/api/v1/lists/")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+    # Other route classes have their own limits
+    assert client.post("/api/v1/save-events/").status_code == 200
+
+    limiter.in_flight = 0
+    assert client.get("/api/v1/lists/").status_code == 200
+    assert limiter.in_flight == 0
+
+
+def test_deep_extraction_queue_sheds_saves_only(admission_state, restore_settings):
+    client = make_client(ADMISSION_MAX_QUEUE_DEPTH=100)
+    admission_state.depth = 101
+    assert client.post("/api/v1/save-events/").status_code == 503
+    assert client.get("/api/v1/lists/").status_code == 200
+
+    admission_state.depth = 100
+    assert client.post("/api/v1/save-events/").status_code == 200
+
+
+def test_queue_depth_is_cached_and_fails_open():
+    depth = admission.QueueDepth("celery", max_age_seconds=60)
+    fake = FakeRedis(depth=7)
+    assert asyncio.run(depth.get(fake)) == 7
+    fake.depth = 9
+    assert asyncio.run(depth.get(fake)) == 7
+    assert fake.calls == 1
+
+    failing = admission.QueueDepth("celery", max_age_seconds=0)
+    assert asyncio.run(failing.get(FakeRedis(fail=True))) == 0
+
+
+def test_slow_pool_checkouts_shed_requests(restore_settings):
+    client = make_client(ADMISSION_MAX_POOL_WAIT_MS=100)
+    admission.pool_wait.observe(50)
+    assert client.get("/api/v1/lists/").status_code == 200
+
+    admission.pool_wait.observe(400)
+    response = client.get("/api/v1/lists/")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert client.get("/health").status_code == 200
+
+
+def test_pool_wait_window_expires():
+    tracker = admission.WaitTracker(window_seconds=5)
+    tracker.observe(300)
+    assert tracker.mean_ms() == 300
+    tracker._samples[0] = (tracker._samples[0][0] - 10, 300)
+    assert tracker.mean_ms() == 0.0
+
+
+def test_engine_pool_reports_waits():
+    from app.db.base import TimedQueuePool, engine
+    assert isinstance(engine.pool, TimedQueuePool)
+
+
+def test_disabled(restore_settings):
+    middleware = AdmissionMiddleware(inner)
+    client = TestClient(middleware)
+    middleware.limiters["read"].in_flight = 10**6
+    settings.ADMISSION_ENABLED = False
+    assert client.get("/api/v1/lists/").status_code == 200
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
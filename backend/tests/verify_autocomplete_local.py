@@ -0,0 +1,270 @@
+import sys
+import os
+import uuid
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints import search as search_endpoint
+from app.api.v1.endpoints.search import list_names_stmt, restaurant_names_stmt
+from app.core.cache import TTLCache
+from app.core.prefix_index import PrefixIndex, normalize_prefix
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+
+
+def restaurant_row(name):
+    return SimpleNamespace(id=uuid.uuid4(), restaurant_id=uuid.uuid4(), name=name, key=name.lower())
+
+
+def list_row(name):
+    return SimpleNamespace(id=uuid.uuid4(), name=name, key=name.lower())
+
+
+# In key order, as restaurant_names_stmt() / list_names_stmt() return them
+RESTAURANT_ROWS = [restaurant_row(name) for name in ["Taco Bell", "Tacos El Gordo", "Tartine", "Zuni Cafe"]]
+LIST_ROWS = [list_row(name) for name in ["Date night", "Tacos to try"]]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = str(value)
+        return True
+
+
+class BrokenRedis:
+    async def get(self, key):
+        import redis
+        raise redis.ConnectionError("down")
+
+
+fake_redis = FakeRedis()
+executed = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        sql = str(stmt)
+        executed.append(sql)
+        result = MagicMock()
+        result.all.return_value = LIST_ROWS if "FROM lists" in sql else RESTAURANT_ROWS
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    executed.clear()
+    fake_redis.store.clear()
+    search_endpoint.name_index_cache.clear()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def autocomplete(q, **params):
+    response = client.get("/api/v1/search/autocomplete", params={"q": q, **params})
+    assert response.status_code == 200
+    data = response.json()
+    return [r["name"] for r in data["restaurants"]], [l["name"] for l in data["lists"]]
+
+
+# ----------------------------------------------------------------------------
+# PrefixIndex
+# ----------------------------------------------------------------------------
+
+def test_prefix_index_match():
+    index = PrefixIndex([("tacos", 2), ("taco", 1), ("tartine", 3), ("zuni", 4), ("ta", 0)])
+    assert index.match("ta", 10) == [0, 1, 2, 3]
+    assert index.match("taco", 10) == [1, 2]
+    assert index.match("tac", 1) == [1]
+    assert index.match("tb", 10) == []
+    assert index.match("", 2) == [0, 1]
+    assert PrefixIndex([("café", 1), ("cafe", 2)]).match("caf", 10) == [2, 1]
+
+
+def test_cache_is_bounded_by_names_held():
+    cache = TTLCache(maxsize=100, ttl_seconds=60, max_weight=10, weigher=len)
+    cache.set("a", "x" * 4)
+    cache.set("b", "x" * 4)
+    assert cache.get("a") is not None  # now most recently used
+    cache.set("c", "x" * 4)
+    # Over 10: the least recently used goes
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("xxxx", None, "xxxx")
+    assert cache.weight == 8
+
+    cache.set("a", "x")  # replacing reweighs
+    assert cache.weight == 5
+    cache.set("huge", "x" * 11)  # never held
+    assert cache.get("huge") is None and cache.weight == 5
+    cache.delete("c")
+    assert cache.weight == 1
+
+
+def test_normalize_prefix():
+    assert normalize_prefix("  Tac") == "tac"
+    assert normalize_prefix("Taco ") == "taco "
+    assert normalize_prefix("   ") == ""
+
+
+# ----------------------------------------------------------------------------
+# Endpoint
+# ----------------------------------------------------------------------------
+
+def test_autocomplete_builds_index_once_per_version():
+    assert autocomplete("Ta") == (["Taco Bell", "Tacos El Gordo", "Tartine"], ["Tacos to try"])
+    assert len(executed) == 2
+
+    # Later keystrokes are answered from memory
+    executed.clear()
+    assert autocomplete("tac") == (["Taco Bell", "Tacos El Gordo"], ["Tacos to try"])
+    assert autocomplete("taco", limit=1) == (["Taco Bell"], ["Tacos to try"])
+    assert autocomplete("tacos t") == ([], ["Tacos to try"])
+    assert executed == []
+
+    # A write bumps the data version; the next keystroke rebuilds
+    key = f"user_data_version:{TEST_USER_ID}"
+    fake_redis.store[key] = str(int(fake_redis.store[key]) + 1)
+    autocomplete("tac")
+    assert len(executed) == 2
+
+
+def test_autocomplete_without_redis_queries_prefix_indexes():
+    app.dependency_overrides[deps.get_redis] = lambda: BrokenRedis()
+    autocomplete("Tac")
+    assert len(executed) == 2
+    assert "lower(restaurants.name) ~>=~" in executed[0]
+    assert "lower(lists.name) ~<~" in executed[1]
+    assert len(search_endpoint.name_index_cache) == 0
+
+
+def test_autocomplete_large_library_not_cached(monkeypatch):
+    monkeypatch.setattr(search_endpoint.settings, "AUTOCOMPLETE_INDEX_MAX_NAMES", 3)
+    autocomplete("tac")
+    # Build attempt, then the prefix queries
+    assert len(executed) == 4
+
+    # Too big is remembered for this version: no more build attempts
+    executed.clear()
+    autocomplete("taco")
+    assert len(executed) == 2
+    assert all("~>=~" in sql for sql in executed)
+    assert search_endpoint.name_index_cache.weight == 1
+
+
+def test_autocomplete_cache_weighs_names():
+    autocomplete("ta")
+    index = search_endpoint.name_index_cache.get(TEST_USER_ID)[1]
+    assert search_endpoint.name_index_cache.weight == len(RESTAURANT_ROWS) + len(LIST_ROWS) == len(index)
+
+
+def test_autocomplete_blank_query():
+    assert autocomplete("  ") == ([], [])
+    assert executed == []
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+def test_prefix_queries_match_prefix_index():
+    if not PG_BENCH_DATABASE_URL:
+        pytest.skip("PG_BENCH_DATABASE_URL not set")
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id = uuid.uuid4()
+    names = ["Tacos El Gordo", "taco bell", "TACO TIME", "Tartine", "Café Mogador", "Cafe Gratitude",
+             "100% Taqueria", "Under_score", "Zuni Cafe", "Ça Va", "Étoile"]
+    with engine.connect() as conn:
+        try:
+            conn.execute(
+                text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+                {"id": user_id, "email": f"autocomplete-{user_id}@example.com"},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                    "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/autocomplete', 'complete', now())"
+                ),
+                {"id": user_id},
+            )
+            conn.execute(
+                text(
+                    """
+                    WITH r AS (
+                        INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                        SELECT gen_random_uuid(), name, 40.7, -74.0, 'Test', now() FROM unnest(CAST(:names AS text[])) AS name
+                        RETURNING id
+                    )
+                    INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id,
+                                                  is_favorite, is_visited, created_at, updated_at)
+                    SELECT gen_random_uuid(), :u, r.id, :u, false, false, now(), now() FROM r
+                    """
+                ),
+                {"names": names, "u": user_id},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO lists (id, user_id, name, created_at, updated_at) "
+                    "SELECT gen_random_uuid(), :u, name, now(), now() FROM unnest(CAST(:names AS text[])) AS name"
+                ),
+                {"names": ["Tacos to try", "Date night", "taquerias"], "u": user_id},
+            )
+
+            rows = conn.execute(restaurant_names_stmt(user_id)).all()
+            index = PrefixIndex((row.key, row.name) for row in rows)
+            list_index = PrefixIndex((row.key, row.name) for row in conn.execute(list_names_stmt(user_id)).all())
+            for q in ["t", "Ta", "taco", "taco ", "caf", "café", "100%", "under_", "ç", "é", "x", "tacos to"]:
+                prefix = normalize_prefix(q)
+                sql_names = [row.name for row in conn.execute(restaurant_names_stmt(user_id, prefix, 5)).all()]
+                assert sql_names == index.match(prefix, 5), q
+                sql_lists = [row.name for row in conn.execute(list_names_stmt(user_id, prefix, 5)).all()]
+                assert sql_lists == list_index.match(prefix, 5), q
+            assert index.match("taco", 5) == ["taco bell", "TACO TIME", "Tacos El Gordo"]
+            assert index.match("100%", 5) == ["100% Taqueria"]
+        finally:
+            conn.rollback()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    test_prefix_index_match()
+    test_autocomplete_builds_index_once_per_version()
@@ -0,0 +1,150 @@
+import sys
+import os
+import uuid
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+import redis
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.core.config import settings
+from app.main import app
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+TEST_LIST_ID = uuid.uuid4()
+SAVED = [uuid.uuid4() for _ in range(3)]
+NOT_SAVED = uuid.uuid4()
+REQUEST_IDS = [str(rid) for rid in SAVED + [NOT_SAVED, SAVED[0]]]
+
+
+class NullRedis:
+    def pipeline(self):
+        raise redis.ConnectionError("no redis in tests")
+
+
+class BulkSession:
+    """Mock AsyncSession: the bulk statement 'changes' every id in SAVED."""
+
+    def __init__(self, list_owned=True):
+        self.list_owned = list_owned
+        self.statements = []
+        self.commits = 0
+        self.session = AsyncMock()
+        self.session.execute.side_effect = self.execute
+        self.session.commit.side_effect = self.commit
+
+    async def execute(self, stmt, *args, **kwargs):
+        sql = str(stmt)
+        self.statements.append(sql)
+        result = MagicMock()
+        result.scalar_one.return_value = 1
+        rows = [SimpleNamespace(owned_list_id=TEST_LIST_ID, id=uuid.uuid4(), restaurant_id=rid) for rid in SAVED]
+        if sql.startswith("WITH") and not self.list_owned:
+            rows = []
+        result.all.return_value = rows
+        return result
+
+    async def commit(self):
+        self.commits += 1
+
+
+session = BulkSession()
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    global session
+    session = BulkSession()
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = lambda: session.session
+    app.dependency_overrides[deps.get_redis] = lambda: NullRedis()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def expected_results():
+    return [{"restaurant_id": str(rid), "status": "ok"} for rid in SAVED] + [
+        {"restaurant_id": str(NOT_SAVED), "status": "not_saved"}
+    ]
+
+
+def test_bulk_move_to_list():
+    response = client.post("/api/v1/user-restaurants/bulk/move", json={"restaurant_ids": REQUEST_IDS, "list_id": str(TEST_LIST_ID)})
+    assert response.status_code == 200
+    assert response.json()["results"] == expected_results()
+    # One UPDATE (ownership folded in) + the sync log, one commit
+    assert len(session.statements) == 3
+    assert "UPDATE user_restaurants" in session.statements[0]
+    assert "lists.user_id" in session.statements[0]
+    assert session.commits == 1
+
+
+def test_bulk_move_to_foreign_list():
+    global session
+    session = BulkSession(list_owned=False)
+    response = client.post("/api/v1/user-restaurants/bulk/move", json={"restaurant_ids": REQUEST_IDS, "list_id": str(TEST_LIST_ID)})
+    assert response.status_code == 404
+    assert session.commits == 0
+
+
+def test_bulk_move_to_unsorted():
+    response = client.post("/api/v1/user-restaurants/bulk/move", json={"restaurant_ids": REQUEST_IDS, "list_id": None})
+    assert response.status_code == 200
+    assert response.json()["results"] == expected_results()
+    assert "list_id=:list_id" in session.statements[0]
+
+
+def test_bulk_flags():
+    response = client.post("/api/v1/user-restaurants/bulk/flags", json={"restaurant_ids": REQUEST_IDS, "is_visited": True})
+    assert response.status_code == 200
+    assert response.json()["results"] == expected_results()
+    assert "is_visited=:is_visited" in session.statements[0]
+    assert "is_favorite" not in session.statements[0].split("WHERE")[0]
+
+    response = client.post("/api/v1/user-restaurants/bulk/flags", json={"restaurant_ids": REQUEST_IDS})
+    assert response.status_code == 400
+
+
+def test_bulk_delete():
+    response = client.post("/api/v1/user-restaurants/bulk/delete", json={"restaurant_ids": REQUEST_IDS})
+    assert response.status_code == 200
+    assert response.json()["results"] == expected_results()
+    assert session.statements[0].startswith("DELETE FROM user_restaurants")
+    assert session.commits == 1
+
+
+def test_bulk_limits():
+    too_many = [str(uuid.uuid4()) for _ in range(settings.BULK_MAX_IDS + 1)]
+    response = client.post("/api/v1/user-restaurants/bulk/delete", json={"restaurant_ids": too_many})
+    assert response.status_code == 400
+    assert session.statements == []
+
+    response = client.post("/api/v1/user-restaurants/bulk/delete", json={"restaurant_ids": []})
+    assert response.json() == {"results": []}
+    assert session.statements == []
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = lambda: session.session
+    app.dependency_overrides[deps.get_redis] = lambda: NullRedis()
+    test_bulk_move_to_list()
+    test_bulk_flags()
+    test_bulk_delete()
+    test_bulk_limits()
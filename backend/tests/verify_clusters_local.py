@@ -0,0 +1,200 @@
+import sys
+import os
+import random
+import uuid
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints.user_restaurants import clusters_stmt
+from app.core import geohash
+from app.core.config import settings
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+
+ROWS = [
+    SimpleNamespace(geohash="dr5re", count=12, latitude=40.71, longitude=-74.0),
+    SimpleNamespace(geohash="dr5rs", count=1, latitude=40.73, longitude=-73.99),
+]
+
+executed = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        executed.append(stmt)
+        result = MagicMock()
+        result.all.return_value = ROWS
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+# ----------------------------------------------------------------------------
+# Geohash grid helpers
+# ----------------------------------------------------------------------------
+
+def test_precision_grows_with_zoom():
+    precisions = [geohash.precision_for_zoom(zoom, settings.CLUSTER_CELL_PIXELS) for zoom in range(23)]
+    assert precisions == sorted(precisions)
+    assert precisions[0] == 1
+    assert precisions[-1] >= 8
+
+
+@pytest.mark.parametrize("box", [
+    (40.68, 40.75, [(-74.05, -73.95)]),
+    (-10.0, 10.0, [(170.0, 180.0), (-180.0, -170.0)]),
+    (24.0, 50.0, [(-125.0, -66.0)]),
+])
+def test_box_prefixes_cover_box(box):
+    min_lat, max_lat, lng_ranges = box
+    prefixes = geohash.box_prefixes(min_lat, max_lat, lng_ranges, 16)
+    assert 0 < len(prefixes) <= 16
+    rng = random.Random(38)
+    for _ in range(500):
+        lo, hi = rng.choice(lng_ranges)
+        cell = geohash.encode(rng.uniform(min_lat, max_lat), rng.uniform(lo, hi))
+        assert any(cell.startswith(prefix) for prefix in prefixes)
+
+
+# ----------------------------------------------------------------------------
+# Endpoint
+# ----------------------------------------------------------------------------
+
+def test_clusters():
+    executed.clear()
+    response = client.get(
+        "/api/v1/user-restaurants/clusters",
+        params={"bbox": "-74.05,40.68,-73.95,40.75", "zoom": 13},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["clusters"][0] == {"geohash": "dr5re", "count": 12, "latitude": 40.71, "longitude": -74.0}
+    assert len(executed) == 1
+    sql = str(executed[0])
+    assert "GROUP BY substr(restaurants.geohash" in sql
+    assert "restaurants.geohash >=" in sql
+
+
+def test_clusters_precision_bounded_by_viewport():
+    # A continent-sized box at street zoom is coarsened to fit CLUSTER_MAX_CELLS
+    response = client.get("/api/v1/user-restaurants/clusters", params={"bbox": "-125,24,-66,50", "zoom": 18})
+    assert response.status_code == 200
+    precision = response.json()["precision"]
+    assert geohash.cells_in_box(26, 59, precision) <= settings.CLUSTER_MAX_CELLS
+    assert geohash.cells_in_box(26, 59, precision + 1) > settings.CLUSTER_MAX_CELLS
+
+
+def test_clusters_across_antimeridian():
+    executed.clear()
+    response = client.get("/api/v1/user-restaurants/clusters", params={"bbox": "170,-10,-170,10", "zoom": 5})
+    assert response.status_code == 200
+    assert "restaurants.longitude BETWEEN" in str(executed[0])
+    assert " OR restaurants.longitude BETWEEN" in str(executed[0])
+
+
+@pytest.mark.parametrize("bbox", ["1,2,3", "a,b,c,d", "-74,41,-73,40", "-200,40,-73,41"])
+def test_clusters_invalid_bbox(bbox):
+    response = client.get("/api/v1/user-restaurants/clusters", params={"bbox": bbox, "zoom": 10})
+    assert response.status_code == 400
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+def test_clusters_stmt_counts_match_postgres():
+    if not PG_BENCH_DATABASE_URL:
+        pytest.skip("PG_BENCH_DATABASE_URL not set")
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id = uuid.uuid4()
+    box = (-74.05, 40.68, -73.95, 40.75)
+    with engine.connect() as conn:
+        try:
+            conn.execute(
+                text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+                {"id": user_id, "email": f"clusters-{user_id}@example.com"},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                    "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/clusters', 'complete', now())"
+                ),
+                {"id": user_id},
+            )
+            conn.execute(
+                text(
+                    """
+                    WITH r AS (
+                        INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                        SELECT gen_random_uuid(), 'Cluster ' || g, 40.6 + random() * 0.2, -74.1 + random() * 0.2,
+                               'Test', now()
+                        FROM generate_series(1, 500) g
+                        RETURNING id
+                    )
+                    INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id,
+                                                  is_favorite, is_visited, created_at, updated_at)
+                    SELECT gen_random_uuid(), :user_id, r.id, :user_id, false, false, now(), now() FROM r
+                    """
+                ),
+                {"user_id": user_id},
+            )
+            rows = conn.execute(clusters_stmt(user_id, box, 6)).all()
+            expected = dict(conn.execute(
+                text(
+                    """
+                    SELECT substr(r.geohash, 1, 6), count(*)
+                    FROM user_restaurants ur JOIN restaurants r ON r.id = ur.restaurant_id
+                    WHERE ur.user_id = :user_id
+                      AND r.latitude BETWEEN 40.68 AND 40.75 AND r.longitude BETWEEN -74.05 AND -73.95
+                    GROUP BY 1
+                    """
+                ),
+                {"user_id": user_id},
+            ).all())
+            assert {row.geohash: row.count for row in rows} == expected
+            assert sum(expected.values()) > 0
+        finally:
+            conn.rollback()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    test_precision_grows_with_zoom()
+    test_clusters()
+    test_clusters_precision_bounded_by_viewport()
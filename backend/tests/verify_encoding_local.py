@@ -0,0 +1,133 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import msgpack
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.encoding import (
+    JSON,
+    MSGPACK,
+    COLUMNAR_JSON,
+    COLUMNAR_MSGPACK,
+    negotiate,
+    to_columnar,
+)
+from app.main import app
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+LIST_ID = uuid.uuid4()
+
+
+def make_row(i):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        is_favorite=i % 2 == 0,
+        is_visited=False,
+        created_at=datetime(2026, 10, 18, 12, i),
+        restaurant_id=uuid.uuid4(),
+        restaurant_name=f"Restaurant {i}",
+        latitude=40.7 + i / 100,
+        longitude=-74.0,
+        city="New York",
+        price_range=None,
+        google_place_id=None,
+    )
+
+
+ROWS = [make_row(i) for i in range(3)]
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = MagicMock()
+    mock_result.all.return_value = ROWS
+    mock_session.execute.return_value = mock_result
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def test_negotiate():
+    assert negotiate(None).media_type == JSON
+    assert negotiate("*/*").media_type == JSON
+    assert negotiate("text/html, application/msgpack").media_type == MSGPACK
+    assert negotiate("application/x-msgpack").media_type == MSGPACK
+    assert negotiate("application/json;q=0.5, application/vnd.reelmapper.columnar+json").media_type == COLUMNAR_JSON
+    assert negotiate("application/msgpack;q=0, application/json").media_type == JSON
+    assert negotiate(f"{COLUMNAR_MSGPACK};q=0.9, {MSGPACK};q=0.9").media_type == COLUMNAR_MSGPACK
+
+
+def test_columnar_dedupes_restaurants():
+    shared = {"id": "r1", "name": "Joe's"}
+    content = {
+        "items": [
+            {"id": "a", "restaurant": shared, "is_favorite": True},
+            {"id": "b", "restaurant": {"id": "r2", "name": "Katz's"}, "is_favorite": False},
+            {"id": "c", "restaurant": shared, "is_favorite": False},
+        ],
+        "empty": [],
+        "next_cursor": None,
+    }
+    columnar = to_columnar(content)
+    assert columnar["items"] == {"id": ["a", "b", "c"], "restaurant": [0, 1, 0], "is_favorite": [True, False, False]}
+    assert columnar["restaurant_table"] == {"id": ["r1", "r2"], "name": ["Joe's", "Katz's"]}
+    assert columnar["empty"] == {}
+    assert columnar["next_cursor"] is None
+
+
+def test_list_restaurants_encodings():
+    url = f"/api/v1/lists/{LIST_ID}/restaurants"
+    as_json = client.get(url)
+    assert as_json.status_code == 200
+    assert as_json.headers["content-type"] == JSON
+    assert as_json.headers["vary"] == "Accept"
+
+    as_msgpack = client.get(url, headers={"Accept": MSGPACK})
+    assert as_msgpack.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+    assert len(as_msgpack.content) < len(as_json.content)
+
+    columnar = client.get(url, headers={"Accept": COLUMNAR_JSON})
+    assert columnar.headers["content-type"] == COLUMNAR_JSON
+    data = columnar.json()
+    assert data["restaurants"]["id"] == [item["id"] for item in as_json.json()["restaurants"]]
+    assert data["restaurant_table"]["name"] == [f"Restaurant {i}" for i in range(3)]
+    assert len(columnar.content) < len(as_json.content)
+
+    columnar_msgpack = client.get(url, headers={"Accept": COLUMNAR_MSGPACK})
+    assert msgpack.unpackb(columnar_msgpack.content) == data
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    test_negotiate()
+    test_columnar_dedupes_restaurants()
+    test_list_restaurants_encodings()
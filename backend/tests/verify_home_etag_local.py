@@ -0,0 +1,142 @@
+import sys
+import os
+import uuid
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.main import app
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+TEST_RESTAURANT_ID = uuid.uuid4()
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def set(self, *args, **kwargs):
+        self.ops.append(("set", args, kwargs))
+
+    def incr(self, *args):
+        self.ops.append(("incr", args, {}))
+
+    def expire(self, *args):
+        self.ops.append(("expire", args, {}))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.ops]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = str(value)
+        return True
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    async def expire(self, key, seconds):
+        return True
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+fake_redis = FakeRedis()
+db_calls = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    # The favorite toggle's new flag value
+    mock_result.one_or_none.return_value = (True,)
+    mock_result.scalars.return_value.all.return_value = []
+
+    async def execute(stmt):
+        db_calls.append(stmt)
+        return mock_result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def test_home_conditional_get():
+    db_calls.clear()
+    first = client.get("/api/v1/home")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert len(db_calls) == 2
+
+    # Unchanged data: 304 without touching the database
+    db_calls.clear()
+    second = client.get("/api/v1/home", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert db_calls == []
+
+    # Different query string -> different representation
+    paged = client.get("/api/v1/home?limit=10", headers={"If-None-Match": etag})
+    assert paged.status_code == 200
+
+    # A mutation bumps the version
+    toggle = client.post(f"/api/v1/restaurants/{TEST_RESTAURANT_ID}/favorite")
+    assert toggle.status_code == 200
+    third = client.get("/api/v1/home", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["ETag"] != etag
+
+
+def test_home_without_redis_has_no_etag():
+    class BrokenRedis:
+        async def get(self, key):
+            import redis
+            raise redis.ConnectionError("down")
+
+    app.dependency_overrides[deps.get_redis] = lambda: BrokenRedis()
+    response = client.get("/api/v1/home", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    test_home_conditional_get()
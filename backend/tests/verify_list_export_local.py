@@ -0,0 +1,192 @@
+import sys
+import os
+import csv
+import io
+import json
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from types import SimpleNamespace
+from contextlib import asynccontextmanager
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.main import app
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+LIST_ID = uuid.uuid4()
+
+
+def export_row(n, **fields):
+    values = dict(
+        id=uuid.uuid4(),
+        is_favorite=n % 2 == 0,
+        is_visited=False,
+        created_at=datetime(2026, 5, 1, 12, n % 60),
+        restaurant_id=uuid.uuid4(),
+        restaurant_name=f"Restaurant {n}",
+        latitude=40.7 + n / 1000,
+        longitude=-74.0,
+        city="New York",
+        price_range="$$",
+        google_place_id=None,
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+ROWS = [
+    export_row(0, restaurant_name='Bar "Sepia" & <Grill>', google_place_id="ChIJ123"),
+    export_row(1, restaurant_name="Café, Olé", price_range=None),
+    export_row(2, restaurant_name='=HYPERLINK("http://evil.example","Pizza")', city="@SUM(A1)"),
+] + [export_row(n) for n in range(3, 7)]
+
+
+class FakeStreamResult:
+    """AsyncResult stand-in: yields ROWS in batches of `size`, like yield_per."""
+
+    def __init__(self, rows, size):
+        self.rows = rows
+        self.size = size
+        self.closed = False
+
+    async def partitions(self):
+        for start in range(0, len(self.rows), self.size):
+            yield self.rows[start:start + self.size]
+
+    async def close(self):
+        self.closed = True
+
+
+state = {"list_name": "Date night", "rows": ROWS, "streams": [], "sessions": []}
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = state["list_name"]
+        return result
+
+    mock_session.execute.side_effect = execute
+    mock_session.stream.side_effect = AssertionError("streamed on the request's session")
+    return mock_session
+
+
+@asynccontextmanager
+async def open_stream_session():
+    """The export's own session: only streams."""
+    session = SimpleNamespace(closed=False)
+
+    async def stream(stmt):
+        assert stmt.get_execution_options()["yield_per"] > 0
+        streamed = FakeStreamResult(state["rows"], 3)
+        state["streams"].append(streamed)
+        return streamed
+
+    session.stream = stream
+    state["sessions"].append(session)
+    try:
+        yield session
+    finally:
+        session.closed = True
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_session_factory] = lambda: open_stream_session
+    state.update(list_name="Date night", rows=ROWS, streams=[], sessions=[])
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+URL = f"/api/v1/lists/{LIST_ID}/export"
+
+
+def test_export_geojson():
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    assert response.headers["content-disposition"].startswith('attachment; filename="Date night.geojson"')
+    data = json.loads(response.text)
+    assert data["name"] == "Date night"
+    assert len(data["features"]) == len(ROWS)
+    first = data["features"][0]
+    assert first["geometry"] == {"type": "Point", "coordinates": [-74.0, 40.7]}
+    assert first["properties"]["name"] == 'Bar "Sepia" & <Grill>'
+    assert first["properties"]["google_maps_url"].endswith("query_place_id=ChIJ123")
+    assert state["streams"][0].closed
+    assert len(state["sessions"]) == 1 and state["sessions"][0].closed
+
+
+def test_export_kml():
+    response = client.get(URL, params={"format": "kml"})
+    assert response.headers["content-type"] == "application/vnd.google-earth.kml+xml"
+    ns = {"kml": "http://www.opengis.net/kml/2.2"}
+    placemarks = ET.fromstring(response.content).findall(".//kml:Placemark", ns)
+    assert [p.find("kml:name", ns).text for p in placemarks][:2] == ['Bar "Sepia" & <Grill>', "Café, Olé"]
+    assert placemarks[1].find(".//kml:coordinates", ns).text == "-74.0,40.701,0"
+    # Every placemark links to Google Maps
+    atom = "{http://www.w3.org/2005/Atom}link"
+    links = [p.find(atom).get("href") for p in placemarks]
+    assert len(links) == len(ROWS)
+    assert all(link.startswith("https://www.google.com/maps/search/?api=1") for link in links)
+    assert links[0].endswith("query_place_id=ChIJ123")
+    assert links[0] in placemarks[0].find("kml:description", ns).text
+
+
+def test_export_csv():
+    response = client.get(URL, params={"format": "csv"})
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == len(ROWS)
+    assert rows[1]["name"] == "Café, Olé"
+    assert rows[1]["price_range"] == ""
+    assert rows[0]["saved_at"] == "2026-05-01T12:00:00"
+    assert all(row["google_maps_url"].startswith("https://www.google.com/maps/search/") for row in rows)
+
+
+def test_export_csv_neutralises_formulas():
+    rows = list(csv.DictReader(io.StringIO(client.get(URL, params={"format": "csv"}).text)))
+    assert rows[2]["name"] == "'=HYPERLINK(\"http://evil.example\",\"Pizza\")"
+    assert rows[2]["city"] == "'@SUM(A1)"
+    # Numbers are written as numbers, negative or not
+    assert rows[2]["longitude"] == "-74.0"
+    assert rows[0]["name"] == 'Bar "Sepia" & <Grill>'
+
+
+def test_export_empty_list():
+    state["rows"] = []
+    assert json.loads(client.get(URL).text)["features"] == []
+    assert client.get(URL, params={"format": "csv"}).text.count("\n") == 1
+
+
+def test_export_not_owned_list():
+    state["list_name"] = None
+    assert client.get(URL).status_code == 404
+    assert state["streams"] == []
+    assert client.get(URL, params={"format": "gpx"}).status_code == 422
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    test_export_geojson()
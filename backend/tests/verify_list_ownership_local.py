@@ -0,0 +1,163 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+import redis
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.main import app
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+TEST_LIST_ID = uuid.uuid4()
+TEST_RESTAURANT_ID = uuid.uuid4()
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+EMPTY_PAGE_ROW = SimpleNamespace(owned_list_id=TEST_LIST_ID, id=None)
+
+
+def page_row(i):
+    return SimpleNamespace(
+        owned_list_id=TEST_LIST_ID, id=uuid.uuid4(), is_favorite=False, is_visited=False,
+        created_at=NOW, restaurant_id=uuid.uuid4(), restaurant_name=f"Restaurant {i}",
+        latitude=40.7, longitude=-74.0, city="New York", price_range=None, google_place_id=None,
+    )
+
+
+class NullRedis:
+    def pipeline(self):
+        raise redis.ConnectionError("no redis in tests")
+
+
+class ListSession:
+    """Mock AsyncSession answering the list queries with canned rows."""
+
+    def __init__(self, rows=None, deleted_id=None, moved_ids=()):
+        self.rows = rows or []
+        self.deleted_id = deleted_id
+        self.moved_ids = list(moved_ids)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.session = AsyncMock()
+        self.session.execute.side_effect = self.execute
+        self.session.commit.side_effect = self.commit
+        self.session.rollback.side_effect = self.rollback
+
+    async def execute(self, stmt, *args, **kwargs):
+        sql = str(stmt)
+        self.statements.append(sql)
+        result = MagicMock()
+        result.all.return_value = self.rows
+        result.scalar_one.return_value = 1
+        result.scalar_one_or_none.return_value = self.deleted_id
+        result.scalars.return_value.all.return_value = self.moved_ids
+        return result
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+session = ListSession()
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = lambda: session.session
+    app.dependency_overrides[deps.get_redis] = lambda: NullRedis()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def use(new_session):
+    global session
+    session = new_session
+    return new_session
+
+
+def test_list_restaurants_in_one_statement():
+    use(ListSession(rows=[page_row(i) for i in range(3)]))
+    response = client.get(f"/api/v1/lists/{TEST_LIST_ID}/restaurants?limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["restaurant"]["name"] for r in data["restaurants"]] == ["Restaurant 0", "Restaurant 1"]
+    assert data["next_cursor"] is not None
+    assert len(session.statements) == 1
+    assert "LEFT OUTER JOIN" in session.statements[0]
+    assert "lists.user_id" in session.statements[0]
+
+
+def test_empty_list_vs_missing_list():
+    use(ListSession(rows=[EMPTY_PAGE_ROW]))
+    response = client.get(f"/api/v1/lists/{TEST_LIST_ID}/restaurants")
+    assert response.status_code == 200
+    assert response.json() == {"restaurants": [], "next_cursor": None}
+
+    use(ListSession(rows=[]))
+    response = client.get(f"/api/v1/lists/{TEST_LIST_ID}/restaurants")
+    assert response.status_code == 404
+    assert len(session.statements) == 1
+
+
+def test_delete_list_enforces_ownership_in_delete():
+    moved = [uuid.uuid4(), uuid.uuid4()]
+    use(ListSession(deleted_id=TEST_LIST_ID, moved_ids=moved))
+    assert client.delete(f"/api/v1/lists/{TEST_LIST_ID}").status_code == 204
+    # Move members to Unsorted, DELETE ... RETURNING (no SELECT), then the sync log
+    assert len(session.statements) == 4
+    assert session.statements[0].startswith("UPDATE user_restaurants")
+    assert session.statements[1].startswith("DELETE FROM lists")
+    assert "lists.user_id" in session.statements[1]
+    assert session.commits == 1
+
+
+def test_delete_list_takes_sync_sequence_lock_last():
+    # Toggles lock the user_restaurants row, then the user's sync_sequences row;
+    # deleting a list must do the same, or the two can deadlock
+    use(ListSession(deleted_id=TEST_LIST_ID, moved_ids=[uuid.uuid4()]))
+    client.delete(f"/api/v1/lists/{TEST_LIST_ID}")
+    touches_rows = [i for i, sql in enumerate(session.statements) if "user_restaurants" in sql or "lists" in sql]
+    seq = next(i for i, sql in enumerate(session.statements) if "sync_sequences" in sql)
+    assert max(touches_rows) < seq
+    assert "INSERT INTO sync_changes" in session.statements[seq + 1]
+
+
+def test_delete_missing_list_logs_nothing():
+    use(ListSession(deleted_id=None))
+    assert client.delete(f"/api/v1/lists/{TEST_LIST_ID}").status_code == 404
+    assert not [sql for sql in session.statements if "sync_" in sql]
+    assert session.commits == 0
+    assert session.rollbacks == 1
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = lambda: session.session
+    app.dependency_overrides[deps.get_redis] = lambda: NullRedis()
+    test_list_restaurants_in_one_statement()
+    test_empty_list_vs_missing_list()
+    test_delete_list_enforces_ownership_in_delete()
+    test_delete_list_takes_sync_sequence_lock_last()
+    test_delete_missing_list_logs_nothing()
@@ -0,0 +1,195 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+import redis
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from app.api import deps
+from app.api.v1.endpoints.lists import list_summaries_stmt
+from app.core.config import settings
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+FULL_LIST_ID = uuid.uuid4()
+EMPTY_LIST_ID = uuid.uuid4()
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def preview(i):
+    return {"id": str(uuid.uuid4()), "name": f"Restaurant {i}", "city": "New York"}
+
+
+class Row:
+    """A result row of list_summaries_stmt: fetch_list_summaries reads its _mapping."""
+
+    def __init__(self, **values):
+        self._mapping = values
+
+
+SUMMARY_ROWS = [
+    Row(id=FULL_LIST_ID, name="Date night", created_at=NOW, restaurant_count=12, favorite_count=4,
+        visited_count=7, previews=[preview(i) for i in range(settings.LIST_PREVIEW_COUNT)]),
+    Row(id=EMPTY_LIST_ID, name="Someday", created_at=NOW, restaurant_count=0, favorite_count=0,
+        visited_count=0, previews=[]),
+]
+
+executed = []
+
+
+class NullRedis:
+    async def get(self, key):
+        raise redis.ConnectionError("no redis in tests")
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        sql = str(stmt)
+        executed.append(sql)
+        result = MagicMock()
+        # The summaries query reads lists; /home's unsorted page is empty
+        result.all.return_value = SUMMARY_ROWS if sql.lstrip().startswith("SELECT lists.id") else []
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: NullRedis()
+    executed.clear()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def check_summaries(lists):
+    full, empty = lists
+    assert full["id"] == str(FULL_LIST_ID)
+    assert (full["restaurant_count"], full["favorite_count"], full["visited_count"]) == (12, 4, 7)
+    assert [p["name"] for p in full["previews"]] == [f"Restaurant {i}" for i in range(settings.LIST_PREVIEW_COUNT)]
+    assert empty["id"] == str(EMPTY_LIST_ID)
+    assert (empty["restaurant_count"], empty["favorite_count"], empty["visited_count"]) == (0, 0, 0)
+    assert empty["previews"] == []
+
+
+def test_get_lists_in_one_statement():
+    response = client.get("/api/v1/lists/")
+    assert response.status_code == 200
+    check_summaries(response.json()["lists"])
+    assert len(executed) == 1
+
+
+def test_home_embeds_list_summaries():
+    response = client.get("/api/v1/home")
+    assert response.status_code == 200
+    data = response.json()
+    check_summaries(data["lists"])
+    assert data["unsorted_restaurants"] == []
+    # Summaries, then the unsorted page
+    assert len(executed) == 2
+
+
+def test_statement_compiles_for_postgres():
+    stmt = list_summaries_stmt(TEST_USER_ID)
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.count("LATERAL") == 2
+    assert "json_agg(" in sql and "ORDER BY" in sql
+    assert "count(user_restaurants.id) FILTER (WHERE user_restaurants.is_favorite)" in sql
+    assert "LIMIT" in sql
+    assert settings.LIST_PREVIEW_COUNT in compiled.params.values()
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+@pytest.mark.skipif(not PG_BENCH_DATABASE_URL, reason="needs PG_BENCH_DATABASE_URL")
+def test_list_summaries_against_postgres():
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id = uuid.uuid4()
+    saved = settings.LIST_PREVIEW_COUNT + 2
+    with engine.connect() as conn:
+        try:
+            conn.execute(
+                text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+                {"id": user_id, "email": f"summaries-{user_id}@example.com"},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                    "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/summaries', 'complete', now())"
+                ),
+                {"id": user_id},
+            )
+            for list_id, name, created in [(FULL_LIST_ID, "Full", "2026-01-01"), (EMPTY_LIST_ID, "Empty", "2026-01-02")]:
+                conn.execute(
+                    text(
+                        "INSERT INTO lists (id, user_id, name, created_at, updated_at) "
+                        "VALUES (:id, :user_id, :name, :created, :created)"
+                    ),
+                    {"id": list_id, "user_id": user_id, "name": name, "created": created},
+                )
+            for i in range(saved):
+                conn.execute(
+                    text(
+                        """
+                        WITH r AS (
+                            INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                            VALUES (gen_random_uuid(), :name, 40.7, -74.0, 'New York', now())
+                            RETURNING id
+                        )
+                        INSERT INTO user_restaurants (id, user_id, restaurant_id, list_id, source_event_id,
+                                                      is_favorite, is_visited, created_at, updated_at)
+                        SELECT gen_random_uuid(), :user_id, r.id, :list_id, :user_id, :favorite, false,
+                               now() + make_interval(secs => :i), now()
+                        FROM r
+                        """
+                    ),
+                    {"name": f"Restaurant {i}", "user_id": user_id, "list_id": FULL_LIST_ID,
+                     "favorite": i % 2 == 0, "i": i},
+                )
+
+            full, empty = [row._mapping for row in conn.execute(list_summaries_stmt(user_id)).all()]
+            assert (full["restaurant_count"], full["favorite_count"], full["visited_count"]) == (
+                saved, (saved + 1) // 2, 0
+            )
+            # Newest first, capped at LIST_PREVIEW_COUNT
+            assert [p["name"] for p in full["previews"]] == [
+                f"Restaurant {i}" for i in range(saved - 1, saved - 1 - settings.LIST_PREVIEW_COUNT, -1)
+            ]
+            assert (empty["restaurant_count"], empty["previews"]) == (0, [])
+        finally:
+            conn.rollback()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
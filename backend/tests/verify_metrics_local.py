@@ -0,0 +1,236 @@
+import sys
+import os
+import asyncio
+import re
+import uuid
+import pytest
+import redis
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+from app.api import deps
+from app.core import admission, metrics
+from app.core.config import settings
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+status_queries = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        status_queries.append(stmt)
+        result = MagicMock()
+        result.all.return_value = [("complete", 40), ("failed", 2)]
+        result.scalar_one_or_none.return_value = None
+        result.first.return_value = None
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def hset(self, key, mapping):
+        self.calls.append((key, mapping))
+
+    def expire(self, key, seconds):
+        self.client.ttls[key] = seconds
+
+    async def execute(self):
+        for key, mapping in self.calls:
+            self.client.hashes[key] = {k: str(v) for k, v in mapping.items()}
+
+
+class FakeRedis:
+    """One Redis shared by every (simulated) worker."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    async def llen(self, queue):
+        return 17
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+fake_redis = FakeRedis()
+
+
+@pytest.fixture(autouse=True)
+def overrides(monkeypatch):
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    monkeypatch.setattr("app.main.get_async_redis", lambda: fake_redis)
+    monkeypatch.setattr(admission, "extraction_queue", admission.QueueDepth("celery", max_age_seconds=0))
+    fake_redis.hashes.clear()
+    status_queries.clear()
+    yield
+    app.dependency_overrides.clear()
+
+# Scraped from inside the network
+client = TestClient(app, client=("10.0.0.7", 50000))
+
+
+def scrape():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return {family.name: family for family in text_string_to_metric_families(response.text)}
+
+
+def samples(family, name, **labels):
+    return [s.value for s in family.samples if s.name == name and all(s.labels.get(k) == v for k, v in labels.items())]
+
+
+def test_request_latency_is_labelled_by_route_template():
+    client.get("/health")
+    client.get(f"/api/v1/lists/{uuid.uuid4()}/export")
+
+    family = scrape()["http_request_duration_seconds"]
+    assert samples(family, "http_request_duration_seconds_count", route="/health", status="200", method="GET")
+    assert samples(family, "http_request_duration_seconds_bucket", route="/health", le="0.3")
+    # Template, not the raw path
+    assert samples(family, "http_request_duration_seconds_count", route="/api/v1/lists/{list_id}/export")
+    assert not [s for s in family.samples if re.search(r"[0-9a-f]{8}-", s.labels.get("route", ""))]
+
+
+def test_unmatched_routes_share_one_label():
+    client.get(f"/no-such-route/{uuid.uuid4()}")
+    family = scrape()["http_request_duration_seconds"]
+    assert samples(family, "http_request_duration_seconds_count", route="unmatched", status="404")
+
+
+def test_pipeline_gauges():
+    families = scrape()
+    assert samples(families["celery_queue_depth"], "celery_queue_depth") == [17]
+
+    statuses = families["save_events"]
+    assert samples(statuses, "save_events", status="complete") == [40]
+    assert samples(statuses, "save_events", status="failed") == [2]
+    # Statuses with no rows are still reported
+    assert samples(statuses, "save_events", status="pending") == [0]
+
+
+def test_status_counts_are_cached():
+    scrape()
+    scrape()
+    assert len(status_queries) == 1
+    sql = str(status_queries[0])
+    assert "GROUP BY save_events.status" in sql
+    assert fake_redis.ttls[metrics.STATUS_COUNTS_KEY] == settings.METRICS_STATUS_COUNTS_TTL_SECONDS
+
+
+def test_status_counts_are_shared_across_workers():
+    # Another worker counted within the interval; this one reads its result
+    fake_redis.hashes[metrics.STATUS_COUNTS_KEY] = {"complete": "5", "pending": "1"}
+    statuses = scrape()["save_events"]
+    assert samples(statuses, "save_events", status="complete") == [5]
+    assert status_queries == []
+
+
+def test_status_counts_survive_redis_errors():
+    class DownRedis(FakeRedis):
+        async def hgetall(self, key):
+            raise redis.ConnectionError("down")
+
+        def pipeline(self):
+            raise redis.ConnectionError("down")
+
+    counts = asyncio.run(metrics.save_event_counts(get_mock_db(), DownRedis()))
+    assert counts["complete"] == 40
+    assert len(status_queries) == 1
+
+
+def test_metrics_are_refused_outside_the_internal_network():
+    outside = TestClient(app, client=("203.0.113.9", 50000))
+    assert outside.get("/metrics").status_code == 403
+    assert TestClient(app).get("/metrics").status_code == 403  # not an address at all
+    assert status_queries == []
+
+
+def test_metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    # The token does not open it to the outside
+    outside = TestClient(app, client=("203.0.113.9", 50000))
+    assert outside.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 403
+
+
+def test_auth_cache_hits_and_misses(monkeypatch):
+    monkeypatch.setattr(deps, "verify_clerk_token", lambda token: {"sub": "clerk_123"})
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    db.execute.return_value.scalar_one_or_none.return_value = get_dummy_user()
+    credentials = MagicMock(credentials="token")
+    before = {r: metrics.auth_cache_requests.labels(result=r)._value.get() for r in ("hit", "miss")}
+
+    deps.user_cache.delete("clerk_123")
+    asyncio.run(deps.get_current_user(db=db, credentials=credentials))
+    asyncio.run(deps.get_current_user(db=db, credentials=credentials))
+
+    after = {r: metrics.auth_cache_requests.labels(result=r)._value.get() for r in ("hit", "miss")}
+    assert after == {"hit": before["hit"] + 1, "miss": before["miss"] + 1}
+    assert samples(scrape()["auth_user_cache_requests"], "auth_user_cache_requests_total", result="hit")
+
+
+def test_metrics_endpoint_is_not_admission_controlled():
+    from app.api.admission import route_class
+    assert route_class("GET", "/metrics") is None
+
+
+@pytest.mark.skipif(not PG_BENCH_DATABASE_URL, reason="needs PG_BENCH_DATABASE_URL")
+def test_pool_in_use_gauge_against_postgres():
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db.base import TimedQueuePool
+
+    engine = create_async_engine(
+        PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1), poolclass=TimedQueuePool
+    )
+    waits = metrics.pool_wait._sum.get()
+
+    async def run():
+        start = metrics.pool_in_use._value.get()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert metrics.pool_in_use._value.get() == start + 1
+        assert metrics.pool_in_use._value.get() == start
+        await engine.dispose()
+
+    asyncio.run(run())
+    assert metrics.pool_wait._sum.get() >= waits
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
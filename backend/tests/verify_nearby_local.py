@@ -0,0 +1,276 @@
+import sys
+import os
+import math
+import random
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints.user_restaurants import nearby_stmt
+from app.core import geohash
+from app.core.config import settings
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+ROW = SimpleNamespace(
+    id=uuid.uuid4(),
+    is_favorite=True,
+    is_visited=False,
+    created_at=NOW,
+    restaurant_id=uuid.uuid4(),
+    restaurant_name="Katz's Delicatessen",
+    latitude=40.7223,
+    longitude=-73.9874,
+    city="New York",
+    price_range="$$",
+    google_place_id=None,
+    distance_m=812.5,
+)
+
+executed = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        executed.append(stmt)
+        result = MagicMock()
+        result.all.return_value = [ROW]
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def _offset(latitude, longitude, meters, bearing):
+    """Point `meters` from (latitude, longitude) along a bearing, on the haversine sphere."""
+    angle = meters / geohash.EARTH_RADIUS_METERS
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    lat2 = math.asin(math.sin(lat1) * math.cos(angle) + math.cos(lat1) * math.sin(angle) * math.cos(bearing))
+    lng2 = lng1 + math.atan2(
+        math.sin(bearing) * math.sin(angle) * math.cos(lat1), math.cos(angle) - math.sin(lat1) * math.sin(lat2)
+    )
+    return math.degrees(lat2), (math.degrees(lng2) + 180.0) % 360.0 - 180.0
+
+
+def _haversine(lat1, lng1, lat2, lng2):
+    """Python twin of user_restaurants._haversine_meters()."""
+    dlat = math.radians(lat2 - lat1) / 2
+    dlng = math.radians(lng2 - lng1) / 2
+    a = math.sin(dlat) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng) ** 2
+    return 2 * geohash.EARTH_RADIUS_METERS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+# ----------------------------------------------------------------------------
+# Geohash
+# ----------------------------------------------------------------------------
+
+def test_encode_known_values():
+    assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash.encode(42.605, -5.603, 5) == "ezs42"
+    assert geohash.encode(40.7128, -74.0060, 12).startswith("dr5r")
+
+
+@pytest.mark.parametrize("latitude, longitude", [
+    (40.7128, -74.0060),
+    (-33.8688, 151.2093),
+    (0.0, 179.9999),   # antimeridian
+    (0.0, 0.0),
+    (64.1466, -21.9426),
+])
+@pytest.mark.parametrize("radius_m", [50, 500, 5000, 50000])
+def test_covering_prefixes_contain_circle(latitude, longitude, radius_m):
+    prefixes = geohash.covering_prefixes(latitude, longitude, radius_m)
+    assert prefixes
+    for step in range(32):
+        point = _offset(latitude, longitude, radius_m * 0.999, step * math.pi / 16)
+        cell = geohash.encode(*point)
+        assert any(cell.startswith(prefix) for prefix in prefixes), (point, prefixes)
+
+
+@pytest.mark.parametrize("latitude, longitude", [
+    (40.7128, -74.0060),
+    (-33.8688, 151.2093),
+    (0.0, 179.9999),   # antimeridian
+    (64.1466, -21.9426),
+    (78.2232, 15.6267),  # high latitude: widest longitude is poleward of the center
+])
+@pytest.mark.parametrize("radius_m", [500, 10000, 50000])
+def test_bounding_box_contains_points_just_inside_radius(latitude, longitude, radius_m):
+    min_lat, max_lat, min_lng, max_lng = geohash.bounding_box(latitude, longitude, radius_m)
+    lng_ranges = geohash.longitude_ranges(min_lng, max_lng)
+    for step in range(72):
+        point_lat, point_lng = _offset(latitude, longitude, radius_m - 10, step * math.pi / 36)
+        assert _haversine(latitude, longitude, point_lat, point_lng) <= radius_m
+        assert min_lat <= point_lat <= max_lat, (step, point_lat)
+        assert any(lo <= point_lng <= hi for lo, hi in lng_ranges), (step, point_lng, lng_ranges)
+
+
+def test_bounding_box_is_tight():
+    # 10 m outside the radius due north and due east of the center falls outside the box
+    min_lat, max_lat, min_lng, max_lng = geohash.bounding_box(40.7128, -74.0060, 10000)
+    assert _offset(40.7128, -74.0060, 10010, 0)[0] > max_lat
+    assert max_lat - 40.7128 == pytest.approx(10000 / geohash.METERS_PER_DEGREE_LAT)
+    # The box's east edge is the longitude of the circle's tangent point
+    assert _haversine(40.7128, -74.0060, 40.7128, max_lng) > 10000
+
+
+def test_covering_prefixes_give_up_at_poles():
+    assert geohash.covering_prefixes(89.99, 10.0, 5000) == []
+
+
+def test_longitude_ranges_split_at_antimeridian():
+    assert geohash.longitude_ranges(-10.0, 10.0) == [(-10.0, 10.0)]
+    assert geohash.longitude_ranges(170.0, 190.0) == [(170.0, 180.0), (-180.0, -170.0)]
+    assert geohash.longitude_ranges(-190.0, -170.0) == [(170.0, 180.0), (-180.0, -170.0)]
+    assert geohash.longitude_ranges(-300.0, 300.0) == []
+
+
+# ----------------------------------------------------------------------------
+# Endpoint
+# ----------------------------------------------------------------------------
+
+def test_nearby_prunes_then_sorts_by_distance():
+    executed.clear()
+    response = client.get(
+        "/api/v1/user-restaurants/nearby",
+        params={"lat": 40.7128, "lng": -74.0060, "radius": 2000},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["restaurants"][0]["distance_m"] == 812.5
+    assert data["restaurants"][0]["restaurant"]["name"] == "Katz's Delicatessen"
+
+    assert len(executed) == 1
+    sql = str(executed[0])
+    assert "restaurants.geohash >=" in sql
+    assert "restaurants.latitude BETWEEN" in sql
+    assert "ORDER BY distance_m" in sql
+
+
+def test_nearby_validates_radius():
+    response = client.get(
+        "/api/v1/user-restaurants/nearby",
+        params={"lat": 40.7, "lng": -74.0, "radius": settings.NEARBY_MAX_RADIUS_METERS + 1},
+    )
+    assert response.status_code == 422
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def pg_engine():
+    if not PG_BENCH_DATABASE_URL:
+        pytest.skip("PG_BENCH_DATABASE_URL not set")
+    from sqlalchemy import create_engine
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    yield engine
+    engine.dispose()
+
+
+def test_sql_geohash_matches_python(pg_engine):
+    from sqlalchemy import text
+
+    rng = random.Random(37)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(500)]
+    points += [(0.0, 0.0), (90.0, 180.0), (-90.0, -180.0), (45.0, 0.0)]
+    with pg_engine.connect() as conn:
+        for latitude, longitude in points:
+            sql_hash = conn.execute(
+                text("SELECT geohash_encode(:lat, :lng, 12)"), {"lat": latitude, "lng": longitude}
+            ).scalar_one()
+            assert sql_hash == geohash.encode(latitude, longitude), (latitude, longitude)
+
+
+def test_nearby_stmt_against_postgres(pg_engine):
+    from sqlalchemy import text
+
+    user_id = uuid.uuid4()
+    # Distances from the center: 0 m, ~1.1 km north, ~3.3 km east, ~250 km away
+    places = [("Center", 40.7128, -74.0060), ("North", 40.7228, -74.0060),
+              ("East", 40.7128, -73.9666), ("Philadelphia", 39.9526, -75.1652)]
+    with pg_engine.connect() as conn:
+        try:
+            conn.execute(
+                text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+                {"id": user_id, "email": f"nearby-{user_id}@example.com"},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                    "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/nearby', 'complete', now())"
+                ),
+                {"id": user_id},
+            )
+            for name, latitude, longitude in places:
+                conn.execute(
+                    text(
+                        """
+                        WITH r AS (
+                            INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                            VALUES (gen_random_uuid(), :name, :lat, :lng, 'Test', now())
+                            RETURNING id
+                        )
+                        INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id,
+                                                      is_favorite, is_visited, created_at, updated_at)
+                        SELECT gen_random_uuid(), :user_id, r.id, :user_id, false, false, now(), now() FROM r
+                        """
+                    ),
+                    {"name": name, "lat": latitude, "lng": longitude, "user_id": user_id},
+                )
+
+            rows = conn.execute(nearby_stmt(user_id, 40.7128, -74.0060, 5000, 50)).all()
+            assert [row.restaurant_name for row in rows] == ["Center", "North", "East"]
+            assert rows[0].distance_m == pytest.approx(0, abs=0.01)
+            assert rows[1].distance_m == pytest.approx(1112, rel=0.01)
+
+            rows = conn.execute(nearby_stmt(user_id, 40.7128, -74.0060, 2000, 50)).all()
+            assert [row.restaurant_name for row in rows] == ["Center", "North"]
+
+            rows = conn.execute(nearby_stmt(user_id, 40.7128, -74.0060, 5000, 1)).all()
+            assert [row.restaurant_name for row in rows] == ["Center"]
+        finally:
+            conn.rollback()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    test_encode_known_values()
+    test_nearby_prunes_then_sorts_by_distance()
+    test_nearby_validates_radius()
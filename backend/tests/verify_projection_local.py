@@ -0,0 +1,53 @@
+import sys
+import os
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+
+from app import schemas
+from app.api.encoding import FastJSONResponse
+from app.api.projection import user_restaurant_dict, user_restaurant_rows_stmt
+
+
+def make_row(price_range=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        is_favorite=True,
+        is_visited=False,
+        created_at=datetime(2026, 10, 18, 12, 30, 0, 123456),
+        restaurant_id=uuid.uuid4(),
+        restaurant_name="Joe's Pizza",
+        latitude=40.7306,
+        longitude=-73.9866,
+        city="New York",
+        price_range=price_range,
+        google_place_id=None,
+    )
+
+
+def test_dict_matches_user_restaurant_read():
+    for row in (make_row(), make_row(price_range="$$")):
+        fast = json.loads(FastJSONResponse(user_restaurant_dict(row)).body)
+        validated = schemas.UserRestaurantRead.model_validate(user_restaurant_dict(row)).model_dump(mode="json")
+        assert fast == validated
+
+
+def test_statement_selects_one_join():
+    sql = str(user_restaurant_rows_stmt(uuid.uuid4()))
+    assert sql.count("JOIN restaurants") == 1
+    # Every column the dict builder reads is selected
+    row = make_row()
+    for name in vars(row):
+        assert f"AS {name}" in sql or f".{name}" in sql
+
+
+if __name__ == "__main__":
+    test_dict_matches_user_restaurant_read()
+    test_statement_selects_one_join()
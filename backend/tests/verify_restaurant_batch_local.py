@@ -0,0 +1,184 @@
+import sys
+import os
+import uuid
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.core import restaurant_cache
+from app.core.config import settings
+from app.main import app
+from app.models.restaurant import Restaurant
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+RESTAURANTS = {
+    r.id: r
+    for r in [
+        Restaurant(id=uuid.uuid4(), name=name, latitude=40.7, longitude=-74.0, city="New York")
+        for name in ["Katz's Delicatessen", "Lucali", "Di Fara"]
+    ]
+}
+IDS = list(RESTAURANTS)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.ops = []
+
+    def set(self, key, value, ex=None):
+        self.ops.append((key, value))
+
+    async def execute(self):
+        for key, value in self.ops:
+            self.redis_client.store[key] = value
+        return [True] * len(self.ops)
+
+
+class BrokenRedis:
+    async def mget(self, keys):
+        import redis
+        raise redis.ConnectionError("down")
+
+    def pipeline(self):
+        import redis
+        raise redis.ConnectionError("down")
+
+
+fake_redis = FakeRedis()
+queried = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        ids = stmt.compile().params["ids"]
+        queried.append((str(stmt), ids))
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [RESTAURANTS[i] for i in ids if i in RESTAURANTS]
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    queried.clear()
+    fake_redis.store.clear()
+    restaurant_cache.local_cache.clear()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def names(data):
+    return [r["name"] for r in data["restaurants"]]
+
+
+def test_batch_in_request_order_with_misses():
+    unknown = uuid.uuid4()
+    ids = [IDS[2], unknown, IDS[0], IDS[2]]
+    response = client.get("/api/v1/restaurants/", params={"ids": [str(i) for i in ids]})
+    assert response.status_code == 200
+    data = response.json()
+    assert names(data) == ["Di Fara", "Katz's Delicatessen"]
+    assert data["missing"] == [str(unknown)]
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+
+    # One ANY(...) query for the unique ids
+    assert len(queried) == 1
+    sql, params = queried[0]
+    assert "= ANY (" in sql
+    assert params == [IDS[2], unknown, IDS[0]]
+    assert f"restaurant:{IDS[0]}" in fake_redis.store
+
+
+def test_batch_reads_through_cache():
+    client.get("/api/v1/restaurants/", params={"ids": [str(IDS[0])]})
+    queried.clear()
+
+    # Another worker: empty LRU, Redis hit for IDS[0]; only IDS[1] is queried
+    restaurant_cache.local_cache.clear()
+    data = client.post("/api/v1/restaurants/batch", json={"ids": [str(IDS[1]), str(IDS[0])]}).json()
+    assert names(data) == ["Lucali", "Katz's Delicatessen"]
+    assert [params for _, params in queried] == [[IDS[1]]]
+
+    # Fully cached: no query
+    queried.clear()
+    data = client.post("/api/v1/restaurants/batch", json={"ids": [str(IDS[0]), str(IDS[1])]}).json()
+    assert names(data) == ["Katz's Delicatessen", "Lucali"]
+    assert queried == []
+
+    # Same JSON as the single-restaurant endpoint
+    single = client.get(f"/api/v1/restaurants/{IDS[1]}").json()
+    assert data["restaurants"][1] == single
+
+
+def test_batch_redis_down_falls_back_to_postgres():
+    app.dependency_overrides[deps.get_redis] = lambda: BrokenRedis()
+    data = client.post("/api/v1/restaurants/batch", json={"ids": [str(i) for i in IDS]}).json()
+    assert names(data) == ["Katz's Delicatessen", "Lucali", "Di Fara"]
+    assert data["missing"] == []
+
+
+def test_batch_too_many_ids(monkeypatch):
+    monkeypatch.setattr(settings, "RESTAURANT_BATCH_MAX_IDS", 2)
+    response = client.post("/api/v1/restaurants/batch", json={"ids": [str(i) for i in IDS]})
+    assert response.status_code == 400
+    # Repeats don't count
+    response = client.post("/api/v1/restaurants/batch", json={"ids": [str(IDS[0])] * 3})
+    assert response.status_code == 200
+    assert queried and len(queried[-1][1]) == 1
+
+
+def test_batch_request_is_bounded_by_schema():
+    ids = [str(uuid.uuid4()) for _ in range(settings.RESTAURANT_BATCH_MAX_IDS + 1)]
+    response = client.post("/api/v1/restaurants/batch", json={"ids": ids})
+    assert response.status_code == 422
+    response = client.get("/api/v1/restaurants", params={"ids": ids})
+    assert response.status_code == 422
+    assert queried == []
+
+
+def test_batch_without_trailing_slash_is_not_redirected():
+    response = client.get("/api/v1/restaurants", params={"ids": [str(IDS[0])]}, follow_redirects=False)
+    assert response.status_code == 200
+    assert names(response.json()) == ["Katz's Delicatessen"]
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    test_batch_in_request_order_with_misses()
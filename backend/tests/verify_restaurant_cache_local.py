@@ -0,0 +1,153 @@
+import sys
+import os
+import asyncio
+import uuid
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.core import restaurant_cache
+from app.main import app
+from app.models.restaurant import Restaurant
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+RESTAURANT = Restaurant(
+    id=uuid.uuid4(),
+    name="Katz's Delicatessen",
+    latitude=40.7223,
+    longitude=-73.9874,
+    city="New York",
+    price_range="$$",
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+
+class BrokenRedis:
+    async def get(self, key):
+        import redis
+        raise redis.ConnectionError("down")
+
+    async def set(self, key, value, ex=None):
+        import redis
+        raise redis.ConnectionError("down")
+
+
+fake_redis = FakeRedis()
+db_calls = []
+found = {"restaurant": RESTAURANT}
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        db_calls.append(stmt)
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = found["restaurant"]
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    db_calls.clear()
+    fake_redis.store.clear()
+    restaurant_cache.local_cache.clear()
+    found["restaurant"] = RESTAURANT
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+URL = f"/api/v1/restaurants/{RESTAURANT.id}"
+
+
+def test_read_through_and_conditional_get():
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first.json()["name"] == "Katz's Delicatessen"
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert len(db_calls) == 1
+    assert f"restaurant:{RESTAURANT.id}" in fake_redis.store
+
+    # Process LRU hit
+    second = client.get(URL)
+    assert second.content == first.content
+    assert second.headers["ETag"] == etag
+
+    # Another worker: empty LRU, Redis hit
+    restaurant_cache.local_cache.clear()
+    third = client.get(URL, headers={"If-None-Match": etag})
+    assert third.status_code == 304
+    assert third.headers["ETag"] == etag
+    assert len(db_calls) == 1
+
+
+def test_invalidate_after_update():
+    etag = client.get(URL).headers["ETag"]
+
+    found["restaurant"] = RESTAURANT.model_copy(update={"price_range": "$$$"})
+    asyncio.run(restaurant_cache.invalidate(fake_redis, RESTAURANT.id))
+
+    response = client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["price_range"] == "$$$"
+    assert response.headers["ETag"] != etag
+    assert len(db_calls) == 2
+
+
+def test_missing_restaurant_not_cached():
+    found["restaurant"] = None
+    assert client.get(URL).status_code == 404
+    assert client.get(URL).status_code == 404
+    assert len(db_calls) == 2
+    assert fake_redis.store == {}
+
+
+def test_redis_down_falls_back_to_postgres():
+    app.dependency_overrides[deps.get_redis] = lambda: BrokenRedis()
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.json()["id"] == str(RESTAURANT.id)
+    assert "ETag" in response.headers
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    test_read_through_and_conditional_get()
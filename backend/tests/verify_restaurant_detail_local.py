@@ -0,0 +1,218 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints.restaurants import restaurant_detail_stmt
+from app.core import restaurant_cache
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+RESTAURANT_ID = uuid.uuid4()
+NOW = datetime(2026, 5, 1, 12, 0, 0)
+
+
+def detail_row(saved=True, note=True):
+    return SimpleNamespace(
+        id=RESTAURANT_ID,
+        name="Katz's Delicatessen",
+        latitude=40.7223,
+        longitude=-73.9874,
+        city="New York",
+        price_range="$$",
+        google_place_id=None,
+        user_restaurant_id=uuid.uuid4() if saved else None,
+        is_favorite=True if saved else None,
+        is_visited=False if saved else None,
+        list_id=uuid.uuid4() if saved else None,
+        saved_at=NOW if saved else None,
+        list_name="NYC" if saved else None,
+        note_id=uuid.uuid4() if note else None,
+        note_content="Get the pastrami" if note else None,
+        note_created_at=NOW if note else None,
+        note_updated_at=NOW if note else None,
+    )
+
+
+class FakeRedis:
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, ex=None):
+        return True
+
+
+executed = []
+found = {"row": detail_row()}
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        executed.append(stmt)
+        result = MagicMock()
+        result.one_or_none.return_value = found["row"]
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: FakeRedis()
+    executed.clear()
+    restaurant_cache.local_cache.clear()
+    found["row"] = detail_row()
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+URL = f"/api/v1/restaurants/{RESTAURANT_ID}"
+
+
+def test_detail_in_one_query():
+    response = client.get(URL, params={"include": "user"})
+    assert response.status_code == 200
+    assert len(executed) == 1
+    data = response.json()
+    assert data["name"] == "Katz's Delicatessen"
+    user = data["user"]
+    assert user["saved"] is True
+    assert user["is_favorite"] is True and user["is_visited"] is False
+    assert user["list_name"] == "NYC"
+    assert user["note"]["content"] == "Get the pastrami"
+    assert user["note"]["restaurant_id"] == str(RESTAURANT_ID)
+    # Per-user: never stored in or served from the shared restaurant cache
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert "ETag" not in response.headers
+    assert len(restaurant_cache.local_cache) == 0
+
+    sql = str(executed[0])
+    assert "LEFT OUTER JOIN user_restaurants" in sql
+    assert "LEFT OUTER JOIN lists" in sql
+    assert "LEFT OUTER JOIN notes" in sql
+
+
+def test_detail_unsaved_with_and_without_note():
+    found["row"] = detail_row(saved=False, note=True)
+    user = client.get(URL, params={"include": "user"}).json()["user"]
+    assert user["saved"] is False
+    assert user["user_restaurant_id"] is None and user["list_id"] is None
+    assert user["is_favorite"] is False
+    # A note can outlive the save
+    assert user["note"]["content"] == "Get the pastrami"
+
+    found["row"] = detail_row(saved=False, note=False)
+    user = client.get(URL, params={"include": "user"}).json()["user"]
+    assert user["saved"] is False and user["note"] is None
+
+
+def test_detail_not_found_and_bad_include():
+    found["row"] = None
+    assert client.get(URL, params={"include": "user"}).status_code == 404
+    assert client.get(URL, params={"include": "friends"}).status_code == 422
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+def test_detail_stmt_against_postgres():
+    if not PG_BENCH_DATABASE_URL:
+        pytest.skip("PG_BENCH_DATABASE_URL not set")
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+    saved_id, noted_id = uuid.uuid4(), uuid.uuid4()
+    list_id = uuid.uuid4()
+    with engine.connect() as conn:
+        try:
+            for uid in (user_id, other_id):
+                conn.execute(
+                    text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+                    {"id": uid, "email": f"detail-{uid}@example.com"},
+                )
+                conn.execute(
+                    text(
+                        "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                        "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/detail', 'complete', now())"
+                    ),
+                    {"id": uid},
+                )
+            for rid, name in ((saved_id, "Saved"), (noted_id, "Noted")):
+                conn.execute(
+                    text(
+                        "INSERT INTO restaurants (id, name, latitude, longitude, city, created_at) "
+                        "VALUES (:id, :name, 40.7, -74.0, 'Test', now())"
+                    ),
+                    {"id": rid, "name": name},
+                )
+            conn.execute(
+                text("INSERT INTO lists (id, user_id, name, created_at, updated_at) VALUES (:id, :u, 'NYC', now(), now())"),
+                {"id": list_id, "u": user_id},
+            )
+            # Both users saved `saved_id`; only user_id has a list and notes
+            for uid, lid in ((user_id, list_id), (other_id, None)):
+                conn.execute(
+                    text(
+                        "INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id, list_id, "
+                        "is_favorite, is_visited, created_at, updated_at) "
+                        "VALUES (gen_random_uuid(), :u, :r, :u, :l, true, false, now(), now())"
+                    ),
+                    {"u": uid, "r": saved_id, "l": lid},
+                )
+            for rid in (saved_id, noted_id):
+                conn.execute(
+                    text(
+                        "INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at) "
+                        "VALUES (gen_random_uuid(), :u, :r, 'note', now(), now())"
+                    ),
+                    {"u": user_id, "r": rid},
+                )
+
+            rows = conn.execute(restaurant_detail_stmt(saved_id, user_id)).all()
+            assert len(rows) == 1
+            assert rows[0].list_name == "NYC" and rows[0].is_favorite and rows[0].note_content == "note"
+
+            row = conn.execute(restaurant_detail_stmt(noted_id, user_id)).one()
+            assert row.user_restaurant_id is None and row.note_content == "note"
+
+            row = conn.execute(restaurant_detail_stmt(saved_id, other_id)).one()
+            assert row.user_restaurant_id is not None and row.list_name is None and row.note_id is None
+
+            assert conn.execute(restaurant_detail_stmt(uuid.uuid4(), user_id)).one_or_none() is None
+        finally:
+            conn.rollback()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: FakeRedis()
+    test_detail_in_one_query()
@@ -0,0 +1,139 @@
+import sys
+import os
+import uuid
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.main import app
+from app.models.user import User
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+OTHER_USER_ID = uuid.uuid4()
+CACHED_ID = uuid.uuid4()
+FOREIGN_ID = uuid.uuid4()
+DB_ONLY_ID = uuid.uuid4()
+UNKNOWN_ID = uuid.uuid4()
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.keys = []
+
+    def hgetall(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        return [self.store.get(key, {}) for key in self.keys]
+
+
+class FakeRedis:
+    def __init__(self, store):
+        self.store = store
+
+    def pipeline(self):
+        return FakePipeline(self.store)
+
+
+fake_redis = FakeRedis({
+    f"save_event:{CACHED_ID}": {"user_id": str(TEST_USER_ID), "status": "processing", "error_message": ""},
+    f"save_event:{FOREIGN_ID}": {"user_id": str(OTHER_USER_ID), "status": "complete", "error_message": ""},
+})
+
+db_calls = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        db_calls.append(stmt)
+        row = MagicMock()
+        row.id = DB_ONLY_ID
+        row.status = "failed"
+        row.error_message = "boom"
+        params = stmt.compile().params
+        ids = next((v for v in params.values() if isinstance(v, list)), [])
+        mock_result = MagicMock()
+        mock_result.all.return_value = [row] if DB_ONLY_ID in ids else []
+        return mock_result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def test_single_status_served_from_cache():
+    db_calls.clear()
+    response = client.get(f"/api/v1/save-events/{CACHED_ID}")
+    assert response.status_code == 200
+    assert response.json() == {"id": str(CACHED_ID), "status": "processing", "error_message": None}
+    assert db_calls == []
+
+
+def test_single_status_falls_back_to_db():
+    db_calls.clear()
+    response = client.get(f"/api/v1/save-events/{DB_ONLY_ID}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "failed"
+    assert response.json()["error_message"] == "boom"
+    assert len(db_calls) == 1
+
+
+def test_cached_status_of_other_user_is_not_leaked():
+    response = client.get(f"/api/v1/save-events/{FOREIGN_ID}")
+    assert response.status_code == 404
+
+
+def test_batch_status():
+    db_calls.clear()
+    ids = [CACHED_ID, DB_ONLY_ID, UNKNOWN_ID, CACHED_ID]
+    response = client.get("/api/v1/save-events/status", params={"ids": [str(i) for i in ids]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["id"] for s in data["statuses"]] == [str(CACHED_ID), str(DB_ONLY_ID)]
+    assert data["missing"] == [str(UNKNOWN_ID)]
+    # Only the two cache misses go to Postgres, in a single query
+    assert len(db_calls) == 1
+
+
+def test_batch_status_all_cached_skips_db():
+    db_calls.clear()
+    response = client.get("/api/v1/save-events/status", params={"ids": [str(CACHED_ID)]})
+    assert response.status_code == 200
+    assert db_calls == []
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    app.dependency_overrides[deps.get_redis] = lambda: fake_redis
+    test_single_status_served_from_cache()
+    test_single_status_falls_back_to_db()
+    test_cached_status_of_other_user_is_not_leaked()
+    test_batch_status()
+    test_batch_status_all_cached_skips_db()
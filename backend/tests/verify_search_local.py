@@ -0,0 +1,280 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints import search as search_endpoint
+from app.api.v1.endpoints.search import decode_search_cursor, encode_search_cursor, prefix_tsquery_text, search_stmt
+from app.api.pagination import InvalidCursor
+from app.main import app
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def make_row(name, rank, list_name=None, restaurant=True, list_=False, note=False):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        is_favorite=False,
+        is_visited=False,
+        created_at=NOW,
+        restaurant_id=uuid.uuid4(),
+        restaurant_name=name,
+        latitude=40.7,
+        longitude=-74.0,
+        city="New York",
+        price_range=None,
+        google_place_id=None,
+        rank=rank,
+        list_name=list_name,
+        restaurant_matched=restaurant,
+        list_matched=list_,
+        note_matched=note,
+    )
+
+
+ROWS = [
+    make_row("Tacos El Gordo", 0.6),
+    make_row("Los Tacos No. 1", 0.3, list_name="Tacos to try", list_=True),
+    make_row("Corner Bistro", 0.1, restaurant=False, note=True),
+]
+
+executed = []
+search_rows = []
+fuzzy_rows = []
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        sql = str(stmt)
+        executed.append(sql)
+        result = MagicMock()
+        if "pg_extension" in sql:
+            result.scalar_one_or_none.return_value = 1
+        elif "word_similarity" in sql:
+            result.all.return_value = fuzzy_rows
+        else:
+            result.all.return_value = search_rows
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    executed.clear()
+    search_rows[:] = ROWS
+    fuzzy_rows[:] = []
+    search_endpoint._trigram_available = None
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def test_prefix_tsquery_text():
+    assert prefix_tsquery_text("Katz's Deli") == "katz:* & s:* & deli:*"
+    assert prefix_tsquery_text("date | night", "|") == "date:* | night:*"
+    assert prefix_tsquery_text("!!! & :*") is None
+    assert prefix_tsquery_text("Café São") == "café:* & são:*"
+
+
+def test_search_cursor_round_trip():
+    row_id = uuid.uuid4()
+    cursor = encode_search_cursor("tacos", 0.0607927, row_id)
+    assert decode_search_cursor(cursor, "tacos") == (0.0607927, row_id)
+    with pytest.raises(InvalidCursor):
+        decode_search_cursor(cursor, "pizza")
+    with pytest.raises(InvalidCursor):
+        decode_search_cursor("not-a-cursor", "tacos")
+
+
+def test_search_stmt_uses_search_document():
+    sql = str(search_stmt(TEST_USER_ID, "tacos", 20))
+    assert "user_restaurants.search_vector @@ to_tsquery" in sql
+    assert "ts_rank(user_restaurants.search_vector" in sql
+    assert "ORDER BY rank DESC, user_restaurants.id DESC" in sql
+
+
+def test_search_ranked_results():
+    response = client.get("/api/v1/search", params={"q": "tacos"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["restaurant"]["name"] for r in data["results"]] == ["Tacos El Gordo", "Los Tacos No. 1", "Corner Bistro"]
+    assert data["results"][1]["matched"] == ["restaurant", "list"]
+    assert data["results"][1]["list_name"] == "Tacos to try"
+    assert data["results"][2]["matched"] == ["note"]
+    assert data["next_cursor"] is None
+    assert data["fuzzy"] is False
+    # One query; the trigram check only happens when nothing matched
+    assert len(executed) == 1
+
+
+def test_search_pagination():
+    response = client.get("/api/v1/search", params={"q": "tacos", "limit": 2})
+    data = response.json()
+    assert len(data["results"]) == 2
+    assert decode_search_cursor(data["next_cursor"], "tacos") == (0.3, uuid.UUID(data["results"][1]["id"]))
+
+    response = client.get("/api/v1/search", params={"q": "tacos", "limit": 2, "cursor": data["next_cursor"]})
+    assert response.status_code == 200
+    assert "(ts_rank(user_restaurants.search_vector" in executed[-1]
+
+    response = client.get("/api/v1/search", params={"q": "pizza", "cursor": data["next_cursor"]})
+    assert response.status_code == 400
+
+
+def test_search_fuzzy_fallback():
+    search_rows[:] = []
+    fuzzy_rows[:] = [make_row("Katz's Delicatessen", 0.7)]
+    response = client.get("/api/v1/search", params={"q": "katz delikatessen"})
+    data = response.json()
+    assert data["fuzzy"] is True
+    assert [r["restaurant"]["name"] for r in data["results"]] == ["Katz's Delicatessen"]
+    assert data["next_cursor"] is None
+
+
+def test_search_without_words():
+    response = client.get("/api/v1/search", params={"q": "!!!"})
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+    assert executed == []
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+def test_search_document_maintained_by_triggers():
+    if not PG_BENCH_DATABASE_URL:
+        pytest.skip("PG_BENCH_DATABASE_URL not set")
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id, list_id, restaurant_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    def names(q):
+        return [row.restaurant_name for row in conn.execute(search_stmt(user_id, q, 20)).all()]
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(
+                text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+                {"id": user_id, "email": f"search-{user_id}@example.com"},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO save_events (id, user_id, source, source_url, status, created_at) "
+                    "VALUES (:id, :id, 'instagram', 'https://instagram.com/p/search', 'complete', now())"
+                ),
+                {"id": user_id},
+            )
+            conn.execute(
+                text("INSERT INTO lists (id, user_id, name, created_at, updated_at) VALUES (:id, :u, 'Date night', now(), now())"),
+                {"id": list_id, "u": user_id},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO restaurants (id, name, latitude, longitude, city, created_at) "
+                    "VALUES (:id, 'Tacos El Gordo', 36.1, -115.2, 'Las Vegas', now())"
+                ),
+                {"id": restaurant_id},
+            )
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO user_restaurants (id, user_id, restaurant_id, list_id, source_event_id,
+                                                  is_favorite, is_visited, created_at, updated_at)
+                    VALUES (gen_random_uuid(), :u, :r, :l, :u, false, false, now(), now())
+                    """
+                ),
+                {"u": user_id, "r": restaurant_id, "l": list_id},
+            )
+            assert names("gordo") == ["Tacos El Gordo"]
+            assert names("las veg") == ["Tacos El Gordo"]
+            assert names("date") == ["Tacos El Gordo"]
+            assert names("adobada") == []
+
+            # Note upsert, list rename and list removal all reach the document
+            conn.execute(
+                text(
+                    "INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at) "
+                    "VALUES (gen_random_uuid(), :u, :r, 'Get the adobada', now(), now())"
+                ),
+                {"u": user_id, "r": restaurant_id},
+            )
+            assert names("adobada") == ["Tacos El Gordo"]
+            row = conn.execute(search_stmt(user_id, "adobada", 20)).one()
+            assert (row.restaurant_matched, row.list_matched, row.note_matched) == (False, False, True)
+
+            conn.execute(text("UPDATE lists SET name = 'Vegas trip' WHERE id = :l"), {"l": list_id})
+            assert names("date") == []
+            assert names("vegas trip") == ["Tacos El Gordo"]
+
+            conn.execute(text("DELETE FROM lists WHERE id = :l"), {"l": list_id})
+            assert names("trip") == []
+
+            conn.execute(text("DELETE FROM notes WHERE user_id = :u"), {"u": user_id})
+            assert names("adobada") == []
+
+            # Ranking: a name hit beats a note hit
+            other_id = uuid.uuid4()
+            conn.execute(
+                text(
+                    """
+                    WITH r AS (
+                        INSERT INTO restaurants (id, name, latitude, longitude, city, created_at)
+                        VALUES (:id, 'Corner Bistro', 40.7, -74.0, 'New York', now()) RETURNING id
+                    )
+                    INSERT INTO user_restaurants (id, user_id, restaurant_id, source_event_id,
+                                                  is_favorite, is_visited, created_at, updated_at)
+                    SELECT gen_random_uuid(), :u, r.id, :u, false, false, now(), now() FROM r
+                    """
+                ),
+                {"id": other_id, "u": user_id},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO notes (id, user_id, restaurant_id, content, created_at, updated_at) "
+                    "VALUES (gen_random_uuid(), :u, :r, 'better tacos than anywhere', now(), now())"
+                ),
+                {"u": user_id, "r": other_id},
+            )
+            assert names("tacos") == ["Tacos El Gordo", "Corner Bistro"]
+        finally:
+            conn.rollback()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    search_rows[:] = ROWS
+    test_prefix_tsquery_text()
+    test_search_cursor_round_trip()
+    test_search_ranked_results()
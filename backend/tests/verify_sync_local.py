@@ -0,0 +1,176 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Set dummy env vars BEFORE importing app
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["SECRET_KEY"] = "dummy_secret_for_tests"
+os.environ["CLERK_SECRET_KEY"] = "dummy_clerk_key"
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from app.api import deps
+from app.core import sync_log
+from app.core.config import settings
+from app.main import app
+from app.models.list import List
+from app.models.user import User
+
+PG_BENCH_DATABASE_URL = os.environ.get("PG_BENCH_DATABASE_URL")
+
+# --- Mock Data ---
+TEST_USER_ID = uuid.uuid4()
+LIST_ID = uuid.uuid4()
+DELETED_UR_ID = uuid.uuid4()
+VANISHED_NOTE_ID = uuid.uuid4()
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+CHANGES = [
+    SimpleNamespace(entity_type="list", entity_id=LIST_ID, op="upsert", seq=7),
+    SimpleNamespace(entity_type="note", entity_id=VANISHED_NOTE_ID, op="upsert", seq=8),
+    SimpleNamespace(entity_type="user_restaurant", entity_id=DELETED_UR_ID, op="delete", seq=9),
+]
+
+executed = []
+sequence = {"seq": 9, "min_seq": 0}
+
+
+def get_dummy_user():
+    return User(id=TEST_USER_ID, email="test@example.com", clerk_user_id="clerk_123")
+
+
+def get_mock_db():
+    mock_session = AsyncMock()
+
+    async def execute(stmt):
+        sql = str(stmt)
+        executed.append(sql)
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = []
+        if "FROM sync_changes" in sql:
+            result.all.return_value = CHANGES
+        elif "FROM sync_sequences" in sql:
+            result.first.return_value = (sequence["seq"], sequence["min_seq"])
+        elif "FROM lists" in sql:
+            result.scalars.return_value.all.return_value = [
+                List(id=LIST_ID, user_id=TEST_USER_ID, name="Date night", created_at=NOW, updated_at=NOW)
+            ]
+        return result
+
+    mock_session.execute.side_effect = execute
+    return mock_session
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    sequence.update(seq=9, min_seq=0)
+    yield
+    app.dependency_overrides.clear()
+
+client = TestClient(app)
+
+
+def test_delta_sync():
+    executed.clear()
+    response = client.get("/api/v1/sync", params={"since": "6"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["full"] is False
+    assert data["next_token"] == "9"
+    assert [item["id"] for item in data["lists"]] == [str(LIST_ID)]
+    assert {(d["entity_type"], d["id"]) for d in data["deleted"]} == {
+        ("user_restaurant", str(DELETED_UR_ID)),
+        ("note", str(VANISHED_NOTE_ID)),
+    }
+    # Only entity types that changed are loaded: change log + sequence + lists + notes
+    assert len(executed) == 4
+
+
+def test_full_snapshot_without_token():
+    response = client.get("/api/v1/sync")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["full"] is True
+    assert data["next_token"] == "9"
+
+
+def test_invalid_token():
+    response = client.get("/api/v1/sync", params={"since": "abc"})
+    assert response.status_code == 400
+
+
+def test_token_older_than_retention_gets_full_snapshot():
+    sequence.update(min_seq=5)
+    response = client.get("/api/v1/sync", params={"since": "4"})
+    assert response.json()["full"] is True
+    # At min_seq the client has seen every pruned change
+    response = client.get("/api/v1/sync", params={"since": "5"})
+    assert response.json()["full"] is False
+
+
+def test_prune_stmt_advances_min_seq():
+    sql = str(sync_log.prune_stmt(datetime(2026, 9, 1), 1000).compile(dialect=postgresql.dialect()))
+    assert "DELETE FROM sync_changes" in sql
+    assert "ORDER BY sync_changes.id" in sql and "LIMIT" in sql
+    assert "UPDATE sync_sequences SET min_seq=greatest(sync_sequences.min_seq" in sql
+
+
+# ----------------------------------------------------------------------------
+# Against a real Postgres (skipped unless PG_BENCH_DATABASE_URL is set)
+# ----------------------------------------------------------------------------
+
+@pytest.mark.skipif(not PG_BENCH_DATABASE_URL, reason="needs PG_BENCH_DATABASE_URL")
+def test_prune_against_postgres(monkeypatch):
+    from sqlalchemy import create_engine, text
+
+    monkeypatch.setattr(settings, "SYNC_CHANGE_PRUNE_BATCH_ROWS", 3)
+    engine = create_engine(PG_BENCH_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1))
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now())"),
+            {"id": user_id, "email": f"prune-{user_id}@example.com"},
+        )
+        conn.execute(text("INSERT INTO sync_sequences (user_id, seq) VALUES (:u, 10)"), {"u": user_id})
+        # seq 1-7 are 60 days old, 8-10 recent
+        conn.execute(
+            text(
+                "INSERT INTO sync_changes (user_id, seq, entity_type, entity_id, op, created_at) "
+                "SELECT :u, g, 'note', gen_random_uuid(), 'upsert', "
+                "CASE WHEN g <= 7 THEN now() - interval '60 days' ELSE now() END "
+                "FROM generate_series(1, 10) AS g"
+            ),
+            {"u": user_id},
+        )
+    try:
+        with engine.connect() as conn:
+            cutoff = conn.execute(text("SELECT now() - interval '30 days'")).scalar()
+        assert sync_log.prune(engine, cutoff) >= 7
+        with engine.connect() as conn:
+            seqs = conn.execute(
+                text("SELECT seq FROM sync_changes WHERE user_id = :u ORDER BY seq"), {"u": user_id}
+            ).scalars().all()
+            assert seqs == [8, 9, 10]
+            assert conn.execute(
+                text("SELECT seq, min_seq FROM sync_sequences WHERE user_id = :u"), {"u": user_id}
+            ).one() == (10, 7)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    app.dependency_overrides[deps.get_current_user] = get_dummy_user
+    app.dependency_overrides[deps.get_db] = get_mock_db
+    test_delta_sync()
+    test_full_snapshot_without_token()
+    test_invalid_token()